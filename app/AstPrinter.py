@@ -1,12 +1,16 @@
-from app.tool.Expr import Visitor, Expr
+from app.tool import Expr, Stmt
 from app.TokensType import TokensType as tt
 from app.Token import Token
 
 
-class AstPrinter(Visitor):
+class AstPrinter(Expr.Visitor, Stmt.Visitor):
     def print(self, expr):
         return expr.accept(self)
 
+    def print_program(self, statements):
+        # One line per top-level statement.
+        return "\n".join(statement.accept(self) for statement in statements)
+
     def visit_binary_expr(self, expr):
         return self.parenthesize(expr.operator.lexeme, expr.left, expr.right)
 
@@ -16,7 +20,9 @@ class AstPrinter(Visitor):
     def visit_literal_expr(self, expr):
         if expr.value is None:
             return "nil"
-        return str(expr.value).lower()
+        if isinstance(expr.value, bool):
+            return str(expr.value).lower()
+        return str(expr.value)
 
     def visit_logical_expr(self, expr):
         return self.parenthesize(expr.operator.lexeme, expr.left, expr.right)
@@ -25,13 +31,67 @@ class AstPrinter(Visitor):
         return self.parenthesize(expr.operator.lexeme, expr.right)
 
     def visit_call_expr(self, expr):
-        return self.parenthesize("call", expr.callee, expr.paren, expr.arguments)
+        return self.parenthesize("call", expr.callee, *expr.arguments)
 
     def visit_variable_expr(self, expr):
         return expr.name.lexeme
 
     def visit_assign_expr(self, expr):
-        return super().visit_assign_expr(expr)
+        return self.parenthesize(f"= {expr.name.lexeme}", expr.value)
+
+    def visit_get_expr(self, expr):
+        return self.parenthesize(f". {expr.name.lexeme}", expr.object)
+
+    def visit_set_expr(self, expr):
+        return self.parenthesize(f"= .{expr.name.lexeme}", expr.object, expr.value)
+
+    def visit_super_expr(self, expr):
+        return f"(super {expr.method.lexeme})"
+
+    def visit_this_expr(self, expr):
+        return "this"
+
+    def visit_block_stmt(self, stmt):
+        return self.parenthesize("block", *stmt.statements)
+
+    def visit_class_stmt(self, stmt):
+        name = f"class {stmt.name.lexeme}"
+        if stmt.superclass is not None:
+            name += f" < {stmt.superclass.name.lexeme}"
+        return self.parenthesize(name, *stmt.methods)
+
+    def visit_expression_stmt(self, stmt):
+        return self.parenthesize(";", stmt.expression)
+
+    def visit_for_stmt(self, stmt):
+        parts = [stmt.initializer, stmt.condition, stmt.increment, stmt.body]
+        return "(for " + " ".join(
+            "nil" if part is None else part.accept(self) for part in parts) + ")"
+
+    def visit_function_stmt(self, stmt):
+        params = ", ".join(param.lexeme for param in stmt.params)
+        return self.parenthesize(f"fun {stmt.name.lexeme}({params})", *stmt.body)
+
+    def visit_if_stmt(self, stmt):
+        if stmt.else_branch is None:
+            return self.parenthesize("if", stmt.condition, stmt.then_branch)
+        return self.parenthesize("if", stmt.condition, stmt.then_branch, stmt.else_branch)
+
+    def visit_print_stmt(self, stmt):
+        return self.parenthesize("print", stmt.expression)
+
+    def visit_return_stmt(self, stmt):
+        if stmt.value is None:
+            return "(return)"
+        return self.parenthesize("return", stmt.value)
+
+    def visit_var_stmt(self, stmt):
+        if stmt.initializer is None:
+            return f"(var {stmt.name.lexeme})"
+        return self.parenthesize(f"var {stmt.name.lexeme}", stmt.initializer)
+
+    def visit_while_stmt(self, stmt):
+        return self.parenthesize("while", stmt.condition, stmt.body)
 
     def parenthesize(self, name, *exprs):
         builder = []
@@ -0,0 +1,8 @@
+class Cell:
+    __slots__ = ("value",)
+
+    # Box for a local that a nested function captures. The declaring scope
+    # and every closure over it share the one Cell, so an assignment on
+    # either side is seen by the other.
+    def __init__(self, value=None):
+        self.value = value
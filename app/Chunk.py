@@ -0,0 +1,35 @@
+import math
+from array import array
+
+
+class Chunk:
+    __slots__ = ("code", "lines", "constants", "constant_index")
+
+    # Instructions are stored as one word per opcode or operand, with the
+    # source line of every word kept in a parallel array for error reports.
+    def __init__(self):
+        self.code = array("I")
+        self.lines = array("I")
+        self.constants = []
+        self.constant_index = {}
+
+    def write(self, word, line):
+        self.code.append(word)
+        self.lines.append(line)
+        return len(self.code) - 1
+
+    def add_constant(self, value, key=None):
+        # Numbers, strings and names are pooled once per chunk; `key` keeps
+        # 1.0 and true (equal in Python) or two name tokens apart. -0.0 and
+        # 0.0 are equal too, so a number's sign is part of its key.
+        if key is None:
+            key = (type(value), value)
+            if type(value) is float:
+                key += (math.copysign(1.0, value),)
+        if key not in self.constant_index:
+            self.constant_index[key] = len(self.constants)
+            self.constants.append(value)
+        return self.constant_index[key]
+
+    def __len__(self):
+        return len(self.code)
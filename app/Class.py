@@ -1,36 +1,41 @@
 from app.Callable import Callable
 from app.Instance import Instance
+from app.Shape import Shape
 
 
 class Class(Instance, Callable):
     def __init__(self, name, superclass, methods, static_methods):
+        # Root of the hidden classes of this class's instances (and of the
+        # class itself, for its own fields).
+        self.root_shape = Shape({})
         super().__init__(self)
         self.methods = methods
         self.static_methods = static_methods
         self.superclass = superclass
         self.name = name
+        # Classes never change once declared, so the whole lookup order
+        # (own methods, own static methods, then the superclass's table) is
+        # flattened into one dict up front.
+        self.method_table = {} if superclass is None else dict(
+            superclass.method_table)
+        self.method_table.update(static_methods)
+        self.method_table.update(methods)
+        # The constructor plan: which initializer a call runs, if any, and
+        # how many arguments it takes.
+        self.initializer = self.method_table.get("init")
+        self.init_arity = 0 if self.initializer is None else self.initializer.arity()
 
     def __str__(self):
         return self.name
 
     def arity(self):
-        initializer = self.find_method("init")
-        if initializer is None:
-            return 0
-        return initializer.arity()
+        return self.init_arity
 
     def call(self, interpreter, arguments):
         instance = Instance(self)
-        initializer = self.find_method("init")
-        if initializer is not None:
-            initializer.bind(instance).call(interpreter, arguments)
+        if self.initializer is not None:
+            self.initializer.invoke(interpreter, instance, arguments)
         return instance
 
     def find_method(self, name):
-        if name in self.methods:
-            return self.methods[name]
-        if name in self.static_methods:
-            return self.static_methods[name]
-        if self.superclass is not None:
-            return self.superclass.find_method(name)
-        return None
+        return self.method_table.get(name)
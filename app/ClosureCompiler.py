@@ -0,0 +1,678 @@
+from app.tool import Expr, Stmt
+from app.TokensType import TokensType as tt
+from app.RuntimeError import RuntimeError
+from app.Environment import Environment
+from app.Cell import Cell
+from app.Globals import Globals
+from app.Callable import Callable
+from app.Function import Function
+from app.Class import Class
+from app.Instance import Instance
+from app.MemoizedFunction import MemoizedFunction
+from app.Rope import Rope
+
+
+class CompiledFunction(Function):
+    # A Lox function whose body has been turned into statement closures.
+    # It keeps the Function interface, so Class, Instance and bound methods
+    # work with it unchanged.
+    def __init__(self, declaration, closure, body, isInitializer=False, kind="function", receiver=None):
+        super().__init__(declaration, closure, isInitializer, kind, receiver)
+        self.body = body
+
+    def run(self, interpreter, environment):
+        # Function.invoke sets up the frame and follows tail calls.
+        for statement in self.body:
+            completion = statement(environment)
+            if completion is not None:
+                return completion
+        return None
+
+    def bind(self, instance):
+        return CompiledFunction(self.declaration, self.closure, self.body,
+                                self.isIntializer, self.kind, instance)
+
+
+class ClosureCompiler(Expr.Visitor, Stmt.Visitor):
+    # Turns a resolved tree into nested Python closures, one per node, with
+    # operators, resolved slots and child closures baked in. Expression
+    # closures take the current Environment and return a value; statement
+    # closures return None, or a 1-tuple holding the value of a `return`,
+    # or the (function, receiver, arguments) of a Lox call in tail position.
+    # Visitor dispatch happens once here instead of on every evaluation.
+
+    def __init__(self, interpreter):
+        self.interpreter = interpreter
+
+    def compile(self, statements):
+        return [self.compile_stmt(statement) for statement in statements]
+
+    def compile_stmt(self, stmt):
+        return stmt.accept(self)
+
+    def compile_expr(self, expr):
+        return expr.accept(self)
+
+    # Statements
+
+    def visit_block_stmt(self, stmt):
+        statements = self.compile(stmt.statements)
+        size = stmt.scope_size
+
+        if not size:
+            def inline_block(env):
+                for statement in statements:
+                    completion = statement(env)
+                    if completion is not None:
+                        return completion
+                return None
+            return inline_block
+
+        def block(env):
+            environment = Environment(env, size)
+            for statement in statements:
+                completion = statement(environment)
+                if completion is not None:
+                    return completion
+            return None
+        return block
+
+    def visit_class_stmt(self, stmt):
+        superclass_expr = None
+        if stmt.superclass is not None:
+            superclass_expr = self.compile_expr(stmt.superclass)
+        methods = [(method, self.compile(method.body))
+                   for method in stmt.methods]
+        name = stmt.name
+        define = self.define(stmt)
+        assign = self.assign_declared(stmt)
+
+        def class_stmt(env):
+            superclass = None
+            if superclass_expr is not None:
+                superclass = superclass_expr(env)
+                if not isinstance(superclass, Class):
+                    raise RuntimeError(stmt.superclass.name,
+                                       "Superclass must be a class.")
+            define(env, None)
+            environment = env
+            if superclass is not None:
+                environment = Environment(env, 1)
+                environment.values[0] = Cell(superclass)
+            instance_methods = {}
+            static_methods = {}
+            for method, body in methods:
+                function = CompiledFunction(method, environment.capture(method.upvalues), body,
+                                            method.name.lexeme == "init", method.kind)
+                if method.kind == "static":
+                    static_methods[method.name.lexeme] = function
+                else:
+                    instance_methods[method.name.lexeme] = function
+            assign(env, Class(name.lexeme, superclass,
+                              instance_methods, static_methods))
+            return None
+        return class_stmt
+
+    def visit_expression_stmt(self, stmt):
+        expression = self.compile_expr(stmt.expression)
+
+        def expression_stmt(env):
+            expression(env)
+        return expression_stmt
+
+    def visit_for_stmt(self, stmt):
+        initializer = None
+        if stmt.initializer is not None:
+            initializer = self.compile_stmt(stmt.initializer)
+        condition = None
+        if stmt.condition is not None:
+            condition = self.compile_expr(stmt.condition)
+        increment = None
+        if stmt.increment is not None:
+            increment = self.compile_expr(stmt.increment)
+        body = self.compile_stmt(stmt.body)
+        size = stmt.scope_size
+
+        def for_stmt(env):
+            if size:
+                env = Environment(env, size)
+            if initializer is not None:
+                initializer(env)
+            while True:
+                if condition is not None:
+                    value = condition(env)
+                    if value is None or value is False:
+                        return None
+                completion = body(env)
+                if completion is not None:
+                    return completion
+                if increment is not None:
+                    increment(env)
+        return for_stmt
+
+    def visit_function_stmt(self, stmt):
+        body = self.compile(stmt.body)
+        define = self.define(stmt)
+        memoize = self.interpreter.memoize
+        upvalues = stmt.upvalues
+
+        if stmt.cell:
+            # Its own closure may hold the Cell, so that comes first.
+            assign = self.assign_declared(stmt)
+
+            def captured_function_stmt(env):
+                define(env, None)
+                assign(env, memoize(stmt, CompiledFunction(
+                    stmt, env.capture(upvalues), body)))
+            return captured_function_stmt
+
+        def function_stmt(env):
+            define(env, memoize(stmt, CompiledFunction(
+                stmt, env.capture(upvalues), body)))
+        return function_stmt
+
+    def visit_if_stmt(self, stmt):
+        condition = self.compile_expr(stmt.condition)
+        then_branch = self.compile_stmt(stmt.then_branch)
+        if stmt.else_branch is None:
+            def if_stmt(env):
+                value = condition(env)
+                if value is not None and value is not False:
+                    return then_branch(env)
+                return None
+            return if_stmt
+
+        else_branch = self.compile_stmt(stmt.else_branch)
+
+        def if_else_stmt(env):
+            value = condition(env)
+            if value is not None and value is not False:
+                return then_branch(env)
+            return else_branch(env)
+        return if_else_stmt
+
+    def visit_print_stmt(self, stmt):
+        expression = self.compile_expr(stmt.expression)
+        stringify = self.interpreter.stringify
+        output = self.interpreter.output
+
+        def print_stmt(env):
+            output.print(stringify(expression(env)))
+        return print_stmt
+
+    def visit_return_stmt(self, stmt):
+        if stmt.value is None:
+            def return_nil(env):
+                return (None,)
+            return return_nil
+
+        if isinstance(stmt.value, Expr.Call):
+            # The call closure itself produces the completion.
+            return self.compile_call(stmt.value, True)
+
+        value = self.compile_expr(stmt.value)
+
+        def return_stmt(env):
+            return (value(env),)
+        return return_stmt
+
+    def visit_var_stmt(self, stmt):
+        define = self.define(stmt)
+        if stmt.initializer is None:
+            def var_nil(env):
+                define(env, None)
+            return var_nil
+
+        initializer = self.compile_expr(stmt.initializer)
+
+        def var_stmt(env):
+            define(env, initializer(env))
+        return var_stmt
+
+    def visit_while_stmt(self, stmt):
+        condition = self.compile_expr(stmt.condition)
+        body = self.compile_stmt(stmt.body)
+
+        def while_stmt(env):
+            value = condition(env)
+            while value is not None and value is not False:
+                completion = body(env)
+                if completion is not None:
+                    return completion
+                value = condition(env)
+            return None
+        return while_stmt
+
+    # Declarations either define a global in its slot of the global table
+    # or fill a local slot, with a new Cell in it when a nested function
+    # captures the local.
+
+    def define(self, stmt):
+        slot = stmt.slot
+        if slot is None:
+            define = self.interpreter.globals.define
+            global_slot = stmt.global_slot
+
+            def define_global(env, value):
+                define(global_slot, value)
+            return define_global
+
+        if stmt.cell:
+            def define_cell(env, value):
+                env.values[slot] = Cell(value)
+            return define_cell
+
+        def define_local(env, value):
+            env.values[slot] = value
+        return define_local
+
+    def assign_declared(self, stmt):
+        if stmt.slot is None:
+            assign = self.interpreter.globals.assign
+            name = stmt.name
+            global_slot = stmt.global_slot
+
+            def assign_global(env, value):
+                assign(name, global_slot, value)
+            return assign_global
+
+        if stmt.cell:
+            slot = stmt.slot
+
+            def assign_cell(env, value):
+                env.values[slot].value = value
+            return assign_cell
+        return self.define(stmt)
+
+    # Expressions
+
+    def visit_assign_expr(self, expr):
+        value = self.compile_expr(expr.value)
+        depth = expr.depth
+        slot = expr.slot
+
+        if depth is None:
+            assign = self.interpreter.globals.assign
+            name = expr.name
+
+            def assign_global(env):
+                result = value(env)
+                assign(name, slot, result)
+                return result
+            return assign_global
+
+        if expr.cell:
+            def assign_cell(env):
+                result = value(env)
+                env.getAt(depth, slot).value = result
+                return result
+            return assign_cell
+
+        if depth == 0:
+            def assign_local(env):
+                result = value(env)
+                env.values[slot] = result
+                return result
+            return assign_local
+
+        def assign_enclosing(env):
+            result = value(env)
+            env.assignAt(depth, slot, result)
+            return result
+        return assign_enclosing
+
+    def visit_binary_expr(self, expr):
+        left = self.compile_expr(expr.left)
+        right = self.compile_expr(expr.right)
+        operator = expr.operator
+        op_type = operator.tokenType
+        number_message = "Operands must be numbers"
+
+        if op_type == tt.PLUS:
+            def add(env):
+                a = left(env)
+                b = right(env)
+                if isinstance(a, float) and isinstance(b, float):
+                    return a + b
+                if isinstance(a, Rope.STRINGS) and isinstance(b, Rope.STRINGS):
+                    return Rope.concat(a, b)
+                raise RuntimeError(
+                    operator, "Operands must be two numbers or two strings.")
+            return add
+
+        if op_type == tt.MINUS:
+            def subtract(env):
+                a = left(env)
+                b = right(env)
+                if isinstance(a, float) and isinstance(b, float):
+                    return a - b
+                raise RuntimeError(operator, number_message)
+            return subtract
+
+        if op_type == tt.STAR:
+            def multiply(env):
+                a = left(env)
+                b = right(env)
+                if isinstance(a, float) and isinstance(b, float):
+                    return a * b
+                raise RuntimeError(operator, number_message)
+            return multiply
+
+        if op_type == tt.SLASH:
+            def divide(env):
+                a = left(env)
+                b = right(env)
+                if isinstance(a, float) and isinstance(b, float):
+                    return a / b
+                raise RuntimeError(operator, number_message)
+            return divide
+
+        if op_type == tt.LESS:
+            def less(env):
+                a = left(env)
+                b = right(env)
+                if isinstance(a, float) and isinstance(b, float):
+                    return a < b
+                raise RuntimeError(operator, number_message)
+            return less
+
+        if op_type == tt.LESS_EQUAL:
+            def less_equal(env):
+                a = left(env)
+                b = right(env)
+                if isinstance(a, float) and isinstance(b, float):
+                    return a <= b
+                raise RuntimeError(operator, number_message)
+            return less_equal
+
+        if op_type == tt.GREATER:
+            def greater(env):
+                a = left(env)
+                b = right(env)
+                if isinstance(a, float) and isinstance(b, float):
+                    return a > b
+                raise RuntimeError(operator, number_message)
+            return greater
+
+        if op_type == tt.GREATER_EQUAL:
+            def greater_equal(env):
+                a = left(env)
+                b = right(env)
+                if isinstance(a, float) and isinstance(b, float):
+                    return a >= b
+                raise RuntimeError(operator, number_message)
+            return greater_equal
+
+        is_equal = self.interpreter.isEqual
+        if op_type == tt.EQUAL_EQUAL:
+            def equal(env):
+                return is_equal(left(env), right(env))
+            return equal
+
+        if op_type == tt.BANG_EQUAL:
+            def not_equal(env):
+                return not is_equal(left(env), right(env))
+            return not_equal
+
+        def unknown(env):
+            left(env)
+            right(env)
+            return None
+        return unknown
+
+    def visit_call_expr(self, expr):
+        return self.compile_call(expr, False)
+
+    def compile_call(self, expr, tail):
+        # With `tail` set the closure returns a statement completion instead
+        # of a value: Lox functions are handed back to Function.invoke to
+        # run in place of the caller, anything else is called right away.
+        arguments = [self.compile_expr(argument)
+                     for argument in expr.arguments]
+        paren = expr.paren
+        count = len(arguments)
+        interpreter = self.interpreter
+
+        def call_value(function, values):
+            if function.__class__ is Class:
+                if count != function.init_arity:
+                    raise RuntimeError(
+                        paren, f"Expected {function.init_arity} arguments but got {count}.")
+                if interpreter.depth >= interpreter.max_depth:
+                    raise RuntimeError(paren, "Stack overflow.")
+                instance = Instance(function)
+                if function.initializer is not None:
+                    function.initializer.invoke(interpreter, instance, values)
+                return instance
+            if not isinstance(function, Callable):
+                raise RuntimeError(
+                    paren, "Can only call functions and classes.")
+            if count != function.arity():
+                raise RuntimeError(
+                    paren, f"Expected {function.arity()} arguments but got {count}.")
+            if interpreter.depth >= interpreter.max_depth:
+                raise RuntimeError(paren, "Stack overflow.")
+            return function.call(interpreter, values)
+
+        if tail:
+            call_function = call_value
+
+            def call_value(function, values):
+                if isinstance(function, MemoizedFunction):
+                    function = function.function
+                if isinstance(function, Function):
+                    if count != function.arity():
+                        raise RuntimeError(
+                            paren, f"Expected {function.arity()} arguments but got {count}.")
+                    return (function, function.receiver, values)
+                return (call_function(function, values),)
+
+        if isinstance(expr.callee, Expr.Get):
+            return self.method_call(expr.callee, arguments, paren, call_value, tail)
+
+        callee = self.compile_expr(expr.callee)
+
+        def call(env):
+            function = callee(env)
+            return call_value(function, [argument(env) for argument in arguments])
+        return call
+
+    def method_call(self, get, arguments, paren, call_value, tail):
+        # obj.method(args): a plain method is invoked with the receiver
+        # directly, so no bound Function is built just to be called once.
+        obj_expr = self.compile_expr(get.object)
+        read = self.property_reader(get)
+        lexeme = get.name.lexeme
+        count = len(arguments)
+        interpreter = self.interpreter
+        cached_method = interpreter.cached_method
+        field_index = interpreter.field_index
+
+        def method_call(env):
+            obj = obj_expr(env)
+            if isinstance(obj, Instance) and field_index(get, obj) is None:
+                _, method, is_getter = cached_method(get, obj.klass, lexeme)
+                if method is not None and not is_getter:
+                    values = [argument(env) for argument in arguments]
+                    if count != method.arity():
+                        raise RuntimeError(
+                            paren, f"Expected {method.arity()} arguments but got {count}.")
+                    if tail:
+                        return (method, obj, values)
+                    if interpreter.depth >= interpreter.max_depth:
+                        raise RuntimeError(paren, "Stack overflow.")
+                    return method.invoke(interpreter, obj, values)
+            function = read(obj)
+            return call_value(function, [argument(env) for argument in arguments])
+        return method_call
+
+    def visit_get_expr(self, expr):
+        obj_expr = self.compile_expr(expr.object)
+        read = self.property_reader(expr)
+
+        def get(env):
+            return read(obj_expr(env))
+        return get
+
+    def property_reader(self, expr):
+        name = expr.name
+        lexeme = name.lexeme
+        interpreter = self.interpreter
+        cached_method = interpreter.cached_method
+        field_index = interpreter.field_index
+
+        def read(obj):
+            if isinstance(obj, Instance):
+                index = field_index(expr, obj)
+                if index is not None:
+                    value = obj.values[index]
+                    if isinstance(value, Function) and value.declaration.kind == "getter":
+                        if interpreter.depth >= interpreter.max_depth:
+                            raise RuntimeError(name, "Stack overflow.")
+                        return value.call(interpreter, [])
+                    return value
+                _, method, is_getter = cached_method(expr, obj.klass, lexeme)
+                if method is None:
+                    raise obj.undefined_property(name)
+                if is_getter:
+                    if interpreter.depth >= interpreter.max_depth:
+                        raise RuntimeError(name, "Stack overflow.")
+                    return method.invoke(interpreter, obj, [])
+                return method.bind(obj)
+            raise RuntimeError(name, "Only instances have properties.")
+        return read
+
+    def visit_grouping_expr(self, expr):
+        return self.compile_expr(expr.expression)
+
+    def visit_literal_expr(self, expr):
+        value = expr.value
+
+        def literal(env):
+            return value
+        return literal
+
+    def visit_logical_expr(self, expr):
+        left = self.compile_expr(expr.left)
+        right = self.compile_expr(expr.right)
+
+        if expr.operator.tokenType == tt.OR:
+            def logical_or(env):
+                value = left(env)
+                if value is not None and value is not False:
+                    return value
+                return right(env)
+            return logical_or
+
+        def logical_and(env):
+            value = left(env)
+            if value is None or value is False:
+                return value
+            return right(env)
+        return logical_and
+
+    def visit_set_expr(self, expr):
+        obj_expr = self.compile_expr(expr.object)
+        value_expr = self.compile_expr(expr.value)
+        name = expr.name
+        set_field = self.interpreter.set_field
+
+        def set(env):
+            obj = obj_expr(env)
+            if not isinstance(obj, Instance):
+                raise RuntimeError(name, "Only instances have fields.")
+            value = value_expr(env)
+            set_field(expr, obj, value)
+            return value
+        return set
+
+    def visit_super_expr(self, expr):
+        superclass_expr = self.variable(
+            expr.keyword, expr.depth, expr.slot, expr.cell)
+        this = self.visit_this_expr(expr.this)
+        method_name = expr.method
+        cached_method = self.interpreter.cached_method
+
+        def super_expr(env):
+            superclass = superclass_expr(env)
+            obj = this(env)
+            method = cached_method(expr, superclass, method_name.lexeme)[1]
+            if method is None:
+                raise RuntimeError(
+                    method_name, f"Undefined property '{method_name.lexeme}'.")
+            return method.bind(obj)
+        return super_expr
+
+    def visit_this_expr(self, expr):
+        return self.variable(expr.keyword, expr.depth, expr.slot, expr.cell)
+
+    def visit_unary_expr(self, expr):
+        right = self.compile_expr(expr.right)
+        operator = expr.operator
+
+        if operator.tokenType == tt.MINUS:
+            def negate(env):
+                value = right(env)
+                if isinstance(value, float):
+                    return -value
+                raise RuntimeError(operator, "Operand must be a number.")
+            return negate
+
+        if operator.tokenType == tt.BANG:
+            def bang(env):
+                value = right(env)
+                return value is None or value is False
+            return bang
+
+        def unknown(env):
+            right(env)
+            return None
+        return unknown
+
+    def visit_variable_expr(self, expr):
+        return self.variable(expr.name, expr.depth, expr.slot, expr.cell)
+
+    def variable(self, name, depth, slot, cell):
+        if depth is None:
+            values = self.interpreter.globals.values
+            get = self.interpreter.globals.get
+            undefined = Globals.UNDEFINED
+
+            def global_variable(env):
+                try:
+                    value = values[slot]
+                    if value is not undefined:
+                        return value
+                except IndexError:
+                    pass
+                return get(name, slot)
+            return global_variable
+
+        if cell:
+            if depth == 0:
+                def local_cell(env):
+                    return env.values[slot].value
+                return local_cell
+
+            if depth == 1:
+                def upvalue(env):
+                    return env.enclosing.values[slot].value
+                return upvalue
+
+            def ancestor_cell(env):
+                return env.getAt(depth, slot).value
+            return ancestor_cell
+
+        if depth == 0:
+            def local(env):
+                return env.values[slot]
+            return local
+
+        if depth == 1:
+            def enclosing(env):
+                return env.enclosing.values[slot]
+            return enclosing
+
+        def ancestor(env):
+            return env.getAt(depth, slot)
+        return ancestor
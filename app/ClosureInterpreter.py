@@ -0,0 +1,27 @@
+from app.RuntimeError import RuntimeError
+from app.error import runtime_error
+from app.Interpreter import Interpreter
+from app.ClosureCompiler import ClosureCompiler
+
+
+class ClosureInterpreter(Interpreter):
+    # Runs a resolved program by compiling it to closures first. Globals,
+    # natives, stringify and equality are shared with the tree-walker so
+    # both engines print and fail the same way.
+
+    def interpret(self, statements, command):
+        compiler = ClosureCompiler(self)
+        try:
+            with self.python_stack():
+                if (command == "run"):
+                    environment = self.environment
+                    for statement in compiler.compile(statements):
+                        statement(environment)
+                elif (command == "evaluate"):
+                    value = compiler.compile_expr(statements)(self.environment)
+                    self.output.print(self.stringify(value))
+        except RuntimeError as e:
+            self.output.flush()
+            runtime_error(e)
+        finally:
+            self.output.flush()
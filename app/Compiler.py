@@ -0,0 +1,408 @@
+from app.tool import Expr, Stmt
+from app.TokensType import TokensType as tt
+from app.Token import Token
+from app.OpCode import OpCode as op
+from app.FunctionProto import FunctionProto
+
+
+class Compiler(Expr.Visitor, Stmt.Visitor):
+    # Compiles a resolved tree to bytecode for the VM. Locals live in stack
+    # slots of their function's frame; variables captured by inner functions
+    # are reached through upvalues, and everything else is a global.
+
+    class FunctionState:
+        def __init__(self, enclosing, proto, receiver):
+            self.enclosing = enclosing
+            self.proto = proto
+            # [name, scope depth, captured]; slot 0 holds the callee, or
+            # the receiver ("this") in methods.
+            self.locals = [[receiver, 0, False]]
+            self.upvalues = []
+            self.scope_depth = 0
+
+    binary_operators = {
+        tt.PLUS: op.ADD,
+        tt.MINUS: op.SUBTRACT,
+        tt.STAR: op.MULTIPLY,
+        tt.SLASH: op.DIVIDE,
+        tt.GREATER: op.GREATER,
+        tt.GREATER_EQUAL: op.GREATER_EQUAL,
+        tt.LESS: op.LESS,
+        tt.LESS_EQUAL: op.LESS_EQUAL,
+        tt.EQUAL_EQUAL: op.EQUAL,
+        tt.BANG_EQUAL: op.NOT_EQUAL,
+    }
+
+    def __init__(self):
+        self.state = None
+        self.line = 1
+
+    def compile(self, statements):
+        self.state = self.FunctionState(None, FunctionProto("script"), "")
+        for statement in statements:
+            statement.accept(self)
+        self.emit_return()
+        return self.state.proto
+
+    def compile_expression(self, expr):
+        # `evaluate` runs a single expression and prints its value.
+        self.state = self.FunctionState(None, FunctionProto("script"), "")
+        expr.accept(self)
+        self.emit(op.PRINT)
+        self.emit_return()
+        return self.state.proto
+
+    # Emitting
+
+    def emit(self, *words):
+        chunk = self.state.proto.chunk
+        for word in words:
+            chunk.write(word, self.line)
+
+    def emit_jump(self, instruction):
+        self.emit(instruction, 0)
+        return len(self.state.proto.chunk) - 1
+
+    def patch_jump(self, operand):
+        self.state.proto.chunk.code[operand] = len(self.state.proto.chunk)
+
+    def emit_return(self):
+        if self.state.proto.is_initializer:
+            self.emit(op.GET_LOCAL, 0, op.RETURN)
+        else:
+            self.emit(op.NIL, op.RETURN)
+
+    def constant(self, value):
+        return self.state.proto.chunk.add_constant(value)
+
+    def name_constant(self, token):
+        # Property names stay tokens, which is what Instance.get/set expect.
+        return self.state.proto.chunk.add_constant(token, ("name", token.lexeme))
+
+    def global_constant(self, token):
+        return self.state.proto.chunk.add_constant(token.lexeme)
+
+    # Scopes and variables
+
+    def begin_scope(self):
+        self.state.scope_depth += 1
+
+    def end_scope(self):
+        state = self.state
+        state.scope_depth -= 1
+        while state.locals and state.locals[-1][1] > state.scope_depth:
+            self.emit(op.CLOSE_UPVALUE if state.locals[-1][2] else op.POP)
+            state.locals.pop()
+
+    def is_global_scope(self):
+        return self.state.enclosing is None and self.state.scope_depth == 0
+
+    def add_local(self, name):
+        self.state.locals.append([name, self.state.scope_depth, False])
+        return len(self.state.locals) - 1
+
+    def define_variable(self, token):
+        # The value is on top of the stack: globals take it by name, locals
+        # simply keep it in the slot it already occupies.
+        if self.is_global_scope():
+            self.emit(op.DEFINE_GLOBAL, self.global_constant(token))
+        else:
+            self.add_local(token.lexeme)
+
+    def resolve_local(self, state, name):
+        for slot in range(len(state.locals) - 1, -1, -1):
+            if state.locals[slot][0] == name:
+                return slot
+        return None
+
+    def resolve_upvalue(self, state, name):
+        if state.enclosing is None:
+            return None
+        slot = self.resolve_local(state.enclosing, name)
+        if slot is not None:
+            state.enclosing.locals[slot][2] = True
+            return self.add_upvalue(state, True, slot)
+        index = self.resolve_upvalue(state.enclosing, name)
+        if index is not None:
+            return self.add_upvalue(state, False, index)
+        return None
+
+    def add_upvalue(self, state, is_local, index):
+        upvalue = (is_local, index)
+        if upvalue in state.upvalues:
+            return state.upvalues.index(upvalue)
+        state.upvalues.append(upvalue)
+        return len(state.upvalues) - 1
+
+    def get_variable(self, token):
+        self.line = token.line
+        slot = self.resolve_local(self.state, token.lexeme)
+        if slot is not None:
+            self.emit(op.GET_LOCAL, slot)
+            return
+        index = self.resolve_upvalue(self.state, token.lexeme)
+        if index is not None:
+            self.emit(op.GET_UPVALUE, index)
+            return
+        self.emit(op.GET_GLOBAL, self.global_constant(token))
+
+    def set_variable(self, token):
+        self.line = token.line
+        slot = self.resolve_local(self.state, token.lexeme)
+        if slot is not None:
+            self.emit(op.SET_LOCAL, slot)
+            return
+        index = self.resolve_upvalue(self.state, token.lexeme)
+        if index is not None:
+            self.emit(op.SET_UPVALUE, index)
+            return
+        self.emit(op.SET_GLOBAL, self.global_constant(token))
+
+    # Statements
+
+    def visit_block_stmt(self, stmt):
+        self.begin_scope()
+        for statement in stmt.statements:
+            statement.accept(self)
+        self.end_scope()
+
+    def visit_class_stmt(self, stmt):
+        self.line = stmt.name.line
+        is_global = self.is_global_scope()
+        if not is_global:
+            # Reserve the class's slot before anything else lands on the stack.
+            self.emit(op.NIL)
+            class_slot = self.add_local(stmt.name.lexeme)
+
+        if stmt.superclass is not None:
+            stmt.superclass.accept(self)
+            self.begin_scope()
+            self.add_local("super")
+            class_line = stmt.superclass.name.line
+        else:
+            class_line = stmt.name.line
+        # Method closures are pushed first so CLASS can build the class, and
+        # its flattened method table, in one step.
+        for method in stmt.methods:
+            self.function(method, method.kind, "this",
+                          method.name.lexeme == "init")
+
+        self.line = class_line
+        self.emit(op.CLASS, self.global_constant(stmt.name),
+                  1 if stmt.superclass is not None else 0, len(stmt.methods))
+        for method in stmt.methods:
+            self.emit(self.global_constant(method.name))
+
+        self.line = stmt.name.line
+        if is_global:
+            self.emit(op.DEFINE_GLOBAL, self.global_constant(stmt.name))
+        else:
+            self.emit(op.SET_LOCAL, class_slot, op.POP)
+
+        if stmt.superclass is not None:
+            self.end_scope()
+
+    def visit_expression_stmt(self, stmt):
+        stmt.expression.accept(self)
+        self.emit(op.POP)
+
+    def visit_function_stmt(self, stmt):
+        self.line = stmt.name.line
+        if self.is_global_scope():
+            self.function(stmt, stmt.kind, "")
+            self.define_variable(stmt.name)
+        else:
+            # Declared first so the body can refer to itself.
+            self.add_local(stmt.name.lexeme)
+            self.function(stmt, stmt.kind, "")
+
+    def function(self, stmt, kind, receiver, is_initializer=False):
+        proto = FunctionProto(stmt.name.lexeme, len(stmt.params), kind)
+        proto.is_initializer = is_initializer
+        proto.pure = bool(stmt.pure)
+        self.state = self.FunctionState(self.state, proto, receiver)
+        self.begin_scope()
+        for param in stmt.params:
+            self.add_local(param.lexeme)
+        for statement in stmt.body:
+            statement.accept(self)
+        self.emit_return()
+
+        state = self.state
+        self.state = state.enclosing
+        proto.upvalue_count = len(state.upvalues)
+        self.line = stmt.name.line
+        self.emit(op.CLOSURE, self.constant_proto(proto))
+        for is_local, index in state.upvalues:
+            self.emit(1 if is_local else 0, index)
+
+    def constant_proto(self, proto):
+        return self.state.proto.chunk.add_constant(proto, ("function", id(proto)))
+
+    def visit_if_stmt(self, stmt):
+        stmt.condition.accept(self)
+        then_jump = self.emit_jump(op.POP_JUMP_IF_FALSE)
+        stmt.then_branch.accept(self)
+        if stmt.else_branch is None:
+            self.patch_jump(then_jump)
+            return
+        else_jump = self.emit_jump(op.JUMP)
+        self.patch_jump(then_jump)
+        stmt.else_branch.accept(self)
+        self.patch_jump(else_jump)
+
+    def visit_print_stmt(self, stmt):
+        stmt.expression.accept(self)
+        self.emit(op.PRINT)
+
+    def visit_return_stmt(self, stmt):
+        self.line = stmt.keyword.line
+        if stmt.value is None:
+            # Even in an initializer: `return;` yields nil when init is
+            # called directly, and the VM substitutes the instance when it
+            # is run by a constructor call.
+            self.emit(op.NIL)
+        elif isinstance(stmt.value, Expr.Call):
+            # TAIL_CALL reuses this frame for a Lox function; for anything
+            # else it is a plain CALL and the RETURN below hands back the
+            # result.
+            self.call(stmt.value, op.TAIL_CALL)
+        else:
+            stmt.value.accept(self)
+        self.emit(op.RETURN)
+
+    def visit_var_stmt(self, stmt):
+        self.line = stmt.name.line
+        if stmt.initializer is not None:
+            stmt.initializer.accept(self)
+        else:
+            self.emit(op.NIL)
+        self.define_variable(stmt.name)
+
+    def visit_for_stmt(self, stmt):
+        self.begin_scope()
+        if stmt.initializer is not None:
+            stmt.initializer.accept(self)
+        loop_start = len(self.state.proto.chunk)
+        exit_jump = None
+        if stmt.condition is not None:
+            stmt.condition.accept(self)
+            exit_jump = self.emit_jump(op.POP_JUMP_IF_FALSE)
+        stmt.body.accept(self)
+        if stmt.increment is not None:
+            stmt.increment.accept(self)
+            self.emit(op.POP)
+        self.emit(op.JUMP, loop_start)
+        if exit_jump is not None:
+            self.patch_jump(exit_jump)
+        self.end_scope()
+
+    def visit_while_stmt(self, stmt):
+        loop_start = len(self.state.proto.chunk)
+        stmt.condition.accept(self)
+        exit_jump = self.emit_jump(op.POP_JUMP_IF_FALSE)
+        stmt.body.accept(self)
+        self.emit(op.JUMP, loop_start)
+        self.patch_jump(exit_jump)
+
+    # Expressions
+
+    def visit_assign_expr(self, expr):
+        expr.value.accept(self)
+        self.set_variable(expr.name)
+
+    def visit_binary_expr(self, expr):
+        expr.left.accept(self)
+        expr.right.accept(self)
+        self.line = expr.operator.line
+        self.emit(self.binary_operators[expr.operator.tokenType])
+
+    def visit_call_expr(self, expr):
+        if isinstance(expr.callee, Expr.Get):
+            # obj.method(args): GET_METHOD leaves the method and its
+            # receiver for INVOKE, so no bound method is built.
+            get = expr.callee
+            get.object.accept(self)
+            self.line = get.name.line
+            self.emit(op.GET_METHOD, self.name_constant(get.name))
+            for argument in expr.arguments:
+                argument.accept(self)
+            self.line = expr.paren.line
+            self.emit(op.INVOKE, len(expr.arguments))
+            return
+        self.call(expr, op.CALL)
+
+    def call(self, expr, instruction):
+        expr.callee.accept(self)
+        for argument in expr.arguments:
+            argument.accept(self)
+        self.line = expr.paren.line
+        self.emit(instruction, len(expr.arguments))
+
+    def visit_get_expr(self, expr):
+        expr.object.accept(self)
+        self.line = expr.name.line
+        self.emit(op.GET_PROPERTY, self.name_constant(expr.name))
+
+    def visit_grouping_expr(self, expr):
+        expr.expression.accept(self)
+
+    def visit_literal_expr(self, expr):
+        if expr.value is None:
+            self.emit(op.NIL)
+        elif expr.value is True:
+            self.emit(op.TRUE)
+        elif expr.value is False:
+            self.emit(op.FALSE)
+        else:
+            self.emit(op.CONSTANT, self.constant(expr.value))
+
+    def visit_logical_expr(self, expr):
+        expr.left.accept(self)
+        if expr.operator.tokenType == tt.OR:
+            else_jump = self.emit_jump(op.JUMP_IF_FALSE)
+            end_jump = self.emit_jump(op.JUMP)
+            self.patch_jump(else_jump)
+            self.emit(op.POP)
+            expr.right.accept(self)
+            self.patch_jump(end_jump)
+        else:
+            end_jump = self.emit_jump(op.JUMP_IF_FALSE)
+            self.emit(op.POP)
+            expr.right.accept(self)
+            self.patch_jump(end_jump)
+
+    def visit_set_expr(self, expr):
+        expr.object.accept(self)
+        name = self.name_constant(expr.name)
+        self.line = expr.name.line
+        if not isinstance(expr.object, Expr.This):
+            # The tree-walker rejects a non-instance before it evaluates
+            # the value, so any side effects of the value must not run.
+            self.emit(op.ASSERT_INSTANCE, name)
+        expr.value.accept(self)
+        self.line = expr.name.line
+        self.emit(op.SET_PROPERTY, name)
+
+    def visit_super_expr(self, expr):
+        self.get_variable(self.synthetic(expr.keyword, "this"))
+        self.get_variable(expr.keyword)
+        self.line = expr.method.line
+        self.emit(op.GET_SUPER, self.name_constant(expr.method))
+
+    def synthetic(self, token, lexeme):
+        return Token(tt.THIS, lexeme, None, token.line)
+
+    def visit_this_expr(self, expr):
+        self.get_variable(expr.keyword)
+
+    def visit_unary_expr(self, expr):
+        expr.right.accept(self)
+        self.line = expr.operator.line
+        if expr.operator.tokenType == tt.MINUS:
+            self.emit(op.NEGATE)
+        else:
+            self.emit(op.NOT)
+
+    def visit_variable_expr(self, expr):
+        self.get_variable(expr.name)
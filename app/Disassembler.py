@@ -0,0 +1,77 @@
+from app.OpCode import OpCode as op
+from app.FunctionProto import FunctionProto
+from app.Interpreter import Interpreter
+
+
+class Disassembler:
+    # Operands that index the constant pool; every other single operand is a
+    # slot, upvalue index, argument count or jump target.
+    constant_operands = {
+        op.CONSTANT, op.GET_GLOBAL, op.DEFINE_GLOBAL, op.SET_GLOBAL,
+        op.GET_PROPERTY, op.SET_PROPERTY, op.ASSERT_INSTANCE, op.GET_SUPER,
+        op.GET_METHOD,
+    }
+    number_operands = {
+        op.GET_LOCAL, op.SET_LOCAL, op.GET_UPVALUE, op.SET_UPVALUE, op.CALL,
+        op.TAIL_CALL, op.INVOKE,
+    }
+    jump_operands = {op.JUMP, op.JUMP_IF_FALSE, op.POP_JUMP_IF_FALSE}
+
+    def disassemble(self, proto):
+        # Lists `proto` and then every function nested in it.
+        lines = [f"== {proto} =="]
+        chunk = proto.chunk
+        offset = 0
+        while offset < len(chunk):
+            text, offset = self.instruction(chunk, offset)
+            lines.append(text)
+        for constant in chunk.constants:
+            if isinstance(constant, FunctionProto):
+                lines.append("")
+                lines.extend(self.disassemble(constant))
+        return lines
+
+    def instruction(self, chunk, offset):
+        code = chunk.code
+        if offset > 0 and chunk.lines[offset] == chunk.lines[offset - 1]:
+            line = "   |"
+        else:
+            line = f"{chunk.lines[offset]:4}"
+        prefix = f"{offset:04} {line} "
+        instruction = op(code[offset])
+        name = instruction.name
+
+        if instruction in self.constant_operands:
+            index = code[offset + 1]
+            return f"{prefix}{name:<16} {index:4} '{self.constant(chunk, index)}'", offset + 2
+        if instruction in self.number_operands:
+            return f"{prefix}{name:<16} {code[offset + 1]:4}", offset + 2
+        if instruction in self.jump_operands:
+            return f"{prefix}{name:<16} {offset:4} -> {code[offset + 1]}", offset + 2
+        if instruction == op.CLASS:
+            index = code[offset + 1]
+            superclass = " < super" if code[offset + 2] else ""
+            count = code[offset + 3]
+            text = [f"{prefix}{name:<16} {index:4} '{self.constant(chunk, index)}'{superclass}"]
+            offset += 4
+            for _ in range(count):
+                text.append(f"{offset:04}    |   method '{self.constant(chunk, code[offset])}'")
+                offset += 1
+            return "\n".join(text), offset
+        if instruction == op.CLOSURE:
+            index = code[offset + 1]
+            proto = chunk.constants[index]
+            text = [f"{prefix}{name:<16} {index:4} '{proto}'"]
+            offset += 2
+            for _ in range(proto.upvalue_count):
+                kind = "local" if code[offset] else "upvalue"
+                text.append(f"{offset:04}    |   {kind} {code[offset + 1]}")
+                offset += 2
+            return "\n".join(text), offset
+        return f"{prefix}{name}", offset + 1
+
+    def constant(self, chunk, index):
+        value = chunk.constants[index]
+        if hasattr(value, "lexeme"):
+            return value.lexeme
+        return Interpreter.stringify(None, value)
@@ -2,19 +2,43 @@ from app.RuntimeError import RuntimeError
 
 
 class Environment:
+    __slots__ = ("values", "enclosing")
 
-    def __init__(self, enclosing=None):
-        self.values = {}
+    # Resolved scopes pass `size` and keep their variables in a fixed-size
+    # list indexed by the slot the Resolver assigned. The global scope is
+    # never resolved, so it keeps a dict keyed by name.
+    def __init__(self, enclosing=None, size=None):
+        self.values = {} if size is None else [None] * size
         self.enclosing = enclosing
 
     def define(self, name, value):
         self.values[name] = value
 
-    def getAt(self, distance, name):
-        return self.ancestor(distance).values[name]
+    def getAt(self, distance, slot):
+        environment = self
+        while distance:
+            environment = environment.enclosing
+            distance -= 1
+        return environment.values[slot]
 
-    def assignAt(self, distance, name, value):
-        self.ancestor(distance).values[name] = value
+    def assignAt(self, distance, slot, value):
+        environment = self
+        while distance:
+            environment = environment.enclosing
+            distance -= 1
+        environment.values[slot] = value
+
+    def capture(self, upvalues):
+        # A function's flat closure: a parentless environment holding only
+        # the Cells of its free variables, each found by the (distance, slot)
+        # the Resolver recorded from the declaring scope. Functions that
+        # capture nothing share one empty closure.
+        if not upvalues:
+            return Environment.EMPTY
+        closure = Environment()
+        closure.values = [self.getAt(distance, slot)
+                          for distance, slot in upvalues]
+        return closure
 
     def ancestor(self, distance):
         environment = self
@@ -41,3 +65,6 @@ class Environment:
             return self.enclosing.get(name)
 
         raise RuntimeError(name, f"Undefined variable '{name.lexeme}'.")
+
+
+Environment.EMPTY = Environment(None, 0)
@@ -0,0 +1,41 @@
+import sys
+from contextlib import contextmanager
+from contextvars import ContextVar
+
+
+class ExecutionContext:
+    # Everything one program run changes outside its own interpreter: the
+    # error flags the scanner, parser, resolver and engines raise, the
+    # streams its output and diagnostics go to. A run activates its context
+    # for the thread it runs on, so several programs can run in one process
+    # at once. Code that runs outside any activated context, like the
+    # command line, shares DEFAULT, which writes to whatever sys.stdout and
+    # sys.stderr are at the time.
+
+    def __init__(self, stdout=None, stderr=None):
+        self.stdout = stdout
+        self.stderr = stderr
+        self.had_error = False
+        self.had_runtime_error = False
+
+    def output_stream(self):
+        return sys.stdout if self.stdout is None else self.stdout
+
+    def error_stream(self):
+        return sys.stderr if self.stderr is None else self.stderr
+
+    @contextmanager
+    def activate(self):
+        token = ExecutionContext.CURRENT.set(self)
+        try:
+            yield self
+        finally:
+            ExecutionContext.CURRENT.reset(token)
+
+    @staticmethod
+    def current():
+        return ExecutionContext.CURRENT.get(ExecutionContext.DEFAULT)
+
+
+ExecutionContext.CURRENT = ContextVar("execution_context")
+ExecutionContext.DEFAULT = ExecutionContext()
@@ -1,35 +1,61 @@
 from app.Callable import Callable
 from app.Environment import Environment
-from app.Return import Return
+from app.Cell import Cell
 
 
 class Function(Callable):
-    def __init__(self, declaration, closure, isInitializer=False, kind="method"):
+    def __init__(self, declaration, closure, isInitializer=False, kind="function", receiver=None):
         self.declaration = declaration
         self.closure = closure
         self.isIntializer = isInitializer
         self.kind = kind
+        # Methods keep "this" in slot 0 of their own environment; a bound
+        # method just remembers the receiver to put there.
+        self.isMethod = kind != "function"
+        self.receiver = receiver
 
     def arity(self):
         return len(self.declaration.params)
 
     def call(self, interpreter, arguments):
-        environment = Environment(self.closure)
-        for i in range(len(self.declaration.params)):
-            environment.define(self.declaration.params[i].lexeme, arguments[i])
+        return self.invoke(interpreter, self.receiver, arguments)
 
+    def invoke(self, interpreter, receiver, arguments):
+        # Runs the body with `receiver` as "this", without binding first. A
+        # `return f(args)` completes with (function, receiver, arguments),
+        # and that call then runs here in place of this one, so tail calls
+        # take no extra Python stack and no extra depth.
+        function = self
+        interpreter.depth += 1
         try:
-            interpreter.execute_block(self.declaration.body, environment)
-        except Return as returnValue:
-            return returnValue.value
-        if self.isIntializer:
-            return self.closure.getAt(0, "this")
-        return None
+            while True:
+                environment = Environment(
+                    function.closure, function.declaration.scope_size)
+                if function.isMethod:
+                    environment.values[0] = receiver
+                    environment.values[1:len(arguments) + 1] = arguments
+                else:
+                    environment.values[:len(arguments)] = arguments
+                if function.declaration.cells:
+                    # Parameters a nested function captures.
+                    values = environment.values
+                    for slot in function.declaration.cells:
+                        values[slot] = Cell(values[slot])
+                completion = function.run(interpreter, environment)
+                if completion is None:
+                    return receiver if function.isIntializer else None
+                if len(completion) == 1:
+                    return completion[0]
+                function, receiver, arguments = completion
+        finally:
+            interpreter.depth -= 1
+
+    def run(self, interpreter, environment):
+        # Runs the body in its new frame; returns its completion.
+        return interpreter.execute_block(self.declaration.body, environment)
 
     def bind(self, instance):
-        environment = Environment(self.closure)
-        environment.define("this", instance)
-        return Function(self.declaration, environment, self.isIntializer, self.kind)
+        return Function(self.declaration, self.closure, self.isIntializer, self.kind, instance)
 
     def __str__(self):
         return f"<fn {self.declaration.name.lexeme}>"
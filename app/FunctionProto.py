@@ -0,0 +1,21 @@
+from app.Chunk import Chunk
+
+
+class FunctionProto:
+    # Compiled form of a Lox function: its bytecode plus what the VM needs to
+    # call it. `kind` is the declaration kind ("function", "method",
+    # "getter", "static") or "script" for top-level code.
+    def __init__(self, name, arity=0, kind="script"):
+        self.name = name
+        self.arity = arity
+        self.kind = kind
+        self.chunk = Chunk()
+        self.upvalue_count = 0
+        self.is_initializer = False
+        # Set for functions the Resolver proved pure.
+        self.pure = False
+
+    def __str__(self):
+        if self.kind == "script":
+            return "<script>"
+        return f"<fn {self.name}>"
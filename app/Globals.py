@@ -0,0 +1,36 @@
+from app.RuntimeError import RuntimeError
+
+
+class Globals:
+    # The global variables, in the slots the Resolver interned their names
+    # to. Natives come first, in NATIVES order, so every program agrees on
+    # their slots. A slot that has not been defined yet holds UNDEFINED, or
+    # lies past the end of the list.
+    __slots__ = ("values",)
+
+    NATIVES = ("clock",)
+    UNDEFINED = object()
+
+    def __init__(self, natives):
+        self.values = list(natives)
+
+    def define(self, slot, value):
+        values = self.values
+        if slot >= len(values):
+            values.extend([Globals.UNDEFINED] * (slot + 1 - len(values)))
+        values[slot] = value
+
+    def get(self, name, slot):
+        try:
+            value = self.values[slot]
+        except IndexError:
+            value = Globals.UNDEFINED
+        if value is Globals.UNDEFINED:
+            raise RuntimeError(name, f"Undefined variable '{name.lexeme}'.")
+        return value
+
+    def assign(self, name, slot, value):
+        values = self.values
+        if slot >= len(values) or values[slot] is Globals.UNDEFINED:
+            raise RuntimeError(name, f"Undefined variable '{name.lexeme}'.")
+        values[slot] = value
@@ -1,23 +1,34 @@
-
-
 class Instance:
+    __slots__ = ("klass", "shape", "values")
+
+    # Fields live in `values`, at the index `shape` gives for their name.
     def __init__(self, klass):
         self.klass = klass
-        self.fields = {}
+        self.shape = klass.root_shape
+        self.values = []
 
     def __str__(self):
         return f"{self.klass.name} instance"
 
     def get(self, name):
-        if name.lexeme in self.fields.keys():
-            return self.fields[name.lexeme]
+        index = self.shape.slots.get(name.lexeme)
+        if index is not None:
+            return self.values[index]
 
         method = self.klass.find_method(name.lexeme)
         if (method is not None):
             return method.bind(self)
 
-        raise RuntimeError(
+        raise self.undefined_property(name)
+
+    def undefined_property(self, name):
+        return RuntimeError(
             self.klass.name, f"Undefined property '{name.lexeme}'.")
 
     def set(self, name, value):
-        self.fields[name.lexeme] = value
+        index = self.shape.slots.get(name.lexeme)
+        if index is None:
+            self.shape = self.shape.add(name.lexeme)
+            self.values.append(value)
+        else:
+            self.values[index] = value
@@ -1,13 +1,22 @@
+import sys
+import threading
+from contextlib import contextmanager
 from app.tool import Expr, Stmt
 from app.TokensType import TokensType as tt
 from app.RuntimeError import RuntimeError
 from app.error import runtime_error
 from app.Environment import Environment
+from app.Cell import Cell
+from app.Globals import Globals
 from app.Callable import Callable
 from app.Function import Function
-from app.Return import Return
 from app.Class import Class
 from app.Instance import Instance
+from app.Memo import Memo
+from app.MemoizedFunction import MemoizedFunction
+from app.Rope import Rope
+from app.Output import Output
+from app import quickening
 
 
 class Interpreter(Expr.Visitor, Stmt.Visitor):
@@ -17,75 +26,217 @@ class Interpreter(Expr.Visitor, Stmt.Visitor):
 
         def call(self, interpreter, arguments):
             import time
+            # Output printed before a timing read goes out first.
+            interpreter.output.flush()
             return time.time()
 
         def __str__(self):
             return "<native fn>"
 
-    def __init__(self):
-        self.globals = Environment()
-        self.globals.define("clock", self.ClockCallable())
-        self.environment = self.globals
-        self.locals = {}
+    # Lox calls nested deeper than this report "Stack overflow.".
+    MAX_DEPTH = 10000
+    # There is no explicit Lox frame stack: only tail calls run in constant
+    # Python stack, every other call recurses in Python. max_depth is capped
+    # so the recursion limit raised for it stays bounded.
+    MAX_DEPTH_LIMIT = 100000
+    # Python frames a single Lox call may take while it is being evaluated;
+    # the recursion limit is raised so max_depth calls fit.
+    PYTHON_FRAMES_PER_CALL = 50
+    # The recursion limit is process-wide, so runs on several threads share
+    # one raised limit and the last run to finish puts the old one back.
+    stack_lock = threading.Lock()
+    stack_users = 0
+    saved_limit = None
+
+    def __init__(self, max_depth=MAX_DEPTH, memo_size=None,
+                 output_size=Output.SIZE):
+        if max_depth > self.MAX_DEPTH_LIMIT:
+            raise ValueError(
+                f"max_depth must be at most {self.MAX_DEPTH_LIMIT}, got {max_depth}")
+        self.globals = Globals([self.ClockCallable()])
+        # Top-level code has no scope of its own: every variable it declares
+        # outside a block is a global.
+        self.environment = Environment.EMPTY
+        self.max_depth = max_depth
+        self.depth = 0
+        # With a memo size, calls to functions the Resolver proved pure are
+        # cached, one Memo per declaration.
+        self.memo_size = memo_size
+        self.memos = {}
+        self.output = Output(output_size)
 
     def interpret(self, statements, command):
         try:
-            if (command == "run"):
-                for statement in statements:
-                    self.execute(statement)
-            elif (command == "evaluate"):
-                value = self.evaluate(statements)
-                print(self.stringify(value))
+            with self.python_stack():
+                if (command == "run"):
+                    for statement in statements:
+                        self.execute(statement)
+                elif (command == "evaluate"):
+                    value = self.evaluate(statements)
+                    self.output.print(self.stringify(value))
         except RuntimeError as e:
+            self.output.flush()
             runtime_error(e)
+        finally:
+            self.output.flush()
+
+    @contextmanager
+    def python_stack(self):
+        # Raises the recursion limit while a program runs so that max_depth
+        # nested calls fit; max_depth decides when a program overflows.
+        with Interpreter.stack_lock:
+            limit = sys.getrecursionlimit()
+            if Interpreter.stack_users == 0:
+                Interpreter.saved_limit = limit
+            Interpreter.stack_users += 1
+            sys.setrecursionlimit(
+                max(limit, self.max_depth * self.PYTHON_FRAMES_PER_CALL))
+        try:
+            yield
+        finally:
+            with Interpreter.stack_lock:
+                Interpreter.stack_users -= 1
+                if Interpreter.stack_users == 0:
+                    sys.setrecursionlimit(Interpreter.saved_limit)
 
     def visit_expression_stmt(self, stmt):
         self.evaluate(stmt.expression)
         return None
 
     def visit_function_stmt(self, stmt):
-        function = Function(stmt, self.environment)
-        self.environment.define(stmt.name.lexeme, function)
+        if stmt.cell:
+            # Its own closure may hold the Cell, so that comes first.
+            self.declare(stmt, None)
+            self.initialize(stmt, self.function(stmt))
+        else:
+            self.declare(stmt, self.function(stmt))
         return None
 
+    def function(self, stmt):
+        return self.memoize(stmt, Function(
+            stmt, self.environment.capture(stmt.upvalues)))
+
+    def memoize(self, declaration, function):
+        if self.memo_size is None or not declaration.pure:
+            return function
+        memo = self.memos.get(declaration)
+        if memo is None:
+            memo = self.memos[declaration] = Memo(
+                declaration.name.lexeme, self.memo_size)
+        return MemoizedFunction(function, memo)
+
     def visit_if_stmt(self, stmt):
         if self.isTruthy(self.evaluate(stmt.condition)):
-            self.execute(stmt.then_branch)
+            return self.execute(stmt.then_branch)
         elif stmt.else_branch is not None:
-            self.execute(stmt.else_branch)
+            return self.execute(stmt.else_branch)
         return None
 
     def visit_print_stmt(self, stmt):
         value = self.evaluate(stmt.expression)
-        print(self.stringify(value))
+        self.output.print(self.stringify(value))
         return None
 
     def visit_return_stmt(self, stmt):
         value = None
         if stmt.value is not None:
+            if stmt.value.__class__ is Expr.Call:
+                return self.tail_call(stmt.value)
             value = self.evaluate(stmt.value)
-        raise Return(value)
+        return (value,)
+
+    def tail_call(self, expr):
+        # `return f(args)`: a Lox function is not called here but handed back
+        # as a (function, receiver, arguments) completion, which the caller's
+        # Function.invoke runs in place of the current call.
+        get = expr.callee
+        if isinstance(get, Expr.Get):
+            obj = self.evaluate(get.object)
+            if isinstance(obj, Instance) and self.field_index(get, obj) is None:
+                _, method, is_getter = self.cached_method(
+                    get, obj.klass, get.name.lexeme)
+                if method is not None and not is_getter:
+                    arguments = [self.evaluate(argument)
+                                 for argument in expr.arguments]
+                    self.check_arity(expr, method, arguments)
+                    return (method, obj, arguments)
+            callee = self.get_property(get, obj)
+        else:
+            callee = self.evaluate(expr.callee)
+        arguments = [self.evaluate(argument) for argument in expr.arguments]
+        if isinstance(callee, MemoizedFunction):
+            # Skipping the cache keeps the call a tail call; the caller's
+            # own result, cached or not, is this same value.
+            callee = callee.function
+        if isinstance(callee, Function):
+            self.check_arity(expr, callee, arguments)
+            return (callee, callee.receiver, arguments)
+        return (self.call_value(expr, callee, arguments),)
 
     def visit_var_stmt(self, stmt):
         value = None
         if stmt.initializer is not None:
             value = self.evaluate(stmt.initializer)
 
-        self.environment.define(stmt.name.lexeme, value)
+        self.declare(stmt, value)
         return None
 
+    def declare(self, stmt, value):
+        if stmt.slot is None:
+            self.globals.define(stmt.global_slot, value)
+        elif stmt.cell:
+            self.environment.values[stmt.slot] = Cell(value)
+        else:
+            self.environment.values[stmt.slot] = value
+
+    def initialize(self, stmt, value):
+        # Sets a variable `declare` has already created.
+        if stmt.slot is None:
+            self.globals.assign(stmt.name, stmt.global_slot, value)
+        elif stmt.cell:
+            self.environment.values[stmt.slot].value = value
+        else:
+            self.environment.values[stmt.slot] = value
+
     def visit_while_stmt(self, stmt):
         while self.isTruthy(self.evaluate(stmt.condition)):
-            self.execute(stmt.body)
+            completion = self.execute(stmt.body)
+            if completion is not None:
+                return completion
+        return None
+
+    def visit_for_stmt(self, stmt):
+        if not stmt.scope_size:
+            return self.for_loop(stmt)
+        previous = self.environment
+        try:
+            self.environment = Environment(previous, stmt.scope_size)
+            return self.for_loop(stmt)
+        finally:
+            self.environment = previous
+
+    def for_loop(self, stmt):
+        # One environment, or none, serves every iteration.
+        if stmt.initializer is not None:
+            self.execute(stmt.initializer)
+        condition = stmt.condition
+        increment = stmt.increment
+        while condition is None or self.isTruthy(self.evaluate(condition)):
+            completion = self.execute(stmt.body)
+            if completion is not None:
+                return completion
+            if increment is not None:
+                self.evaluate(increment)
         return None
 
     def visit_assign_expr(self, expr):
         value = self.evaluate(expr.value)
-        distance = self.locals.get(expr)
-        if distance is not None:
-            self.environment.assignAt(distance, expr.name, value)
+        if expr.depth is None:
+            self.globals.assign(expr.name, expr.slot, value)
+        elif expr.cell:
+            self.environment.getAt(expr.depth, expr.slot).value = value
         else:
-            self.globals.assign(expr.name, value)
+            self.environment.assignAt(expr.depth, expr.slot, value)
         # self.environment.assign(expr.name, value)
         return value
 
@@ -93,7 +244,13 @@ class Interpreter(Expr.Visitor, Stmt.Visitor):
         return expr.value
 
     def visit_logical_expr(self, expr):
-        left = self.evaluate(expr.left)
+        if expr.quick is not None:
+            return expr.quick(self, expr)
+        return self.logical(expr, self.evaluate(expr.left))
+
+    def logical(self, expr, left):
+        quickening.record(expr, (expr.operator.tokenType, left.__class__),
+                          quickening.LOGICAL)
         if expr.operator.tokenType == tt.OR:
             if self.isTruthy(left):
                 return left
@@ -109,14 +266,32 @@ class Interpreter(Expr.Visitor, Stmt.Visitor):
             raise RuntimeError(expr.name, "Only instances have fields.")
 
         value = self.evaluate(expr.value)
-        obj.set(expr.name, value)
+        self.set_field(expr, obj, value)
         return value
 
+    def set_field(self, expr, obj, value):
+        # Inline cache on the Set node: (shape before, shape after, index).
+        # The shapes differ when the assignment adds a new field.
+        cache = expr.cache
+        shape = obj.shape
+        if cache is None or cache[0] is not shape:
+            index = shape.slots.get(expr.name.lexeme)
+            if index is None:
+                cache = (shape, shape.add(expr.name.lexeme), len(shape.slots))
+            else:
+                cache = (shape, shape, index)
+            expr.cache = cache
+        if cache[1] is shape:
+            obj.values[cache[2]] = value
+        else:
+            obj.shape = cache[1]
+            obj.values.append(value)
+
     def visit_super_expr(self, expr):
-        distance = self.locals.get(expr)
-        superclass = self.environment.getAt(distance, "super")
-        obj = self.environment.getAt(distance - 1, "this")
-        method = superclass.find_method(expr.method.lexeme)
+        superclass = self.look_up_variable(expr.keyword, expr)
+        obj = self.look_up_variable(expr.this.keyword, expr.this)
+        method = self.cached_method(
+            expr, superclass, expr.method.lexeme)[1]
         if (method is None):
             raise RuntimeError(expr.method, f"Undefined property '{
                                expr.method.lexeme}'.")
@@ -130,8 +305,13 @@ class Interpreter(Expr.Visitor, Stmt.Visitor):
         return self.evaluate(expr.expression)
 
     def visit_unary_expr(self, expr):
-        right = self.evaluate(expr.right)
+        if expr.quick is not None:
+            return expr.quick(self, expr)
+        return self.unary(expr, self.evaluate(expr.right))
 
+    def unary(self, expr, right):
+        quickening.record(expr, (expr.operator.tokenType, right.__class__),
+                          quickening.UNARY)
         if expr.operator.tokenType == tt.MINUS:
             self.checkNumberOperand(expr.operator, right)
             return -right
@@ -145,10 +325,17 @@ class Interpreter(Expr.Visitor, Stmt.Visitor):
         # return self.environment.get(expr.name)
 
     def look_up_variable(self, name, expr):
-        distance = self.locals.get(expr)
-        if distance is not None:
-            return self.environment.getAt(distance, name.lexeme)
-        return self.globals.get(name)
+        if expr.depth is not None:
+            if expr.cell:
+                return self.environment.getAt(expr.depth, expr.slot).value
+            return self.environment.getAt(expr.depth, expr.slot)
+        return self.globals.get(name, expr.slot)
+
+    # Operators that only accept numbers; built once instead of per call.
+    NUMBER_OPERATORS = {
+        op: function for op, function in quickening.NUMBER_OPERATORS.items()
+        if op not in (tt.PLUS, tt.EQUAL_EQUAL, tt.BANG_EQUAL)
+    }
 
     def checkType(self, value, expected_type, operator, message):
         if isinstance(value, expected_type):
@@ -156,45 +343,30 @@ class Interpreter(Expr.Visitor, Stmt.Visitor):
         raise RuntimeError(operator, message)
 
     def visit_binary_expr(self, expr):
+        if expr.quick is not None:
+            return expr.quick(self, expr)
         left = self.evaluate(expr.left)
         right = self.evaluate(expr.right)
+        return self.binary(expr, left, right)
 
-        type_map = {
-            tt.MINUS: (float, "Operands must be numbers"),
-            tt.SLASH: (float, "Operands must be numbers"),
-            tt.STAR: (float, "Operands must be numbers"),
-            tt.GREATER: (float, "Operands must be numbers"),
-            tt.GREATER_EQUAL: (float, "Operands must be numbers"),
-            tt.LESS: (float, "Operands must be numbers"),
-            tt.LESS_EQUAL: (float, "Operands must be numbers"),
-        }
-
+    def binary(self, expr, left, right):
         op_type = expr.operator.tokenType
-        if op_type in type_map:
-            expected_type, message = type_map[op_type]
-            self.checkType(left, expected_type, expr.operator, message)
-            self.checkType(right, expected_type, expr.operator, message)
-
-            if op_type == tt.MINUS:
-                return left - right
-            elif op_type == tt.SLASH:
-                return left / right
-            elif op_type == tt.STAR:
-                return left * right
-            elif op_type == tt.GREATER:
-                return left > right
-            elif op_type == tt.GREATER_EQUAL:
-                return left >= right
-            elif op_type == tt.LESS:
-                return left < right
-            elif op_type == tt.LESS_EQUAL:
-                return left <= right
+        if left.__class__ is right.__class__:
+            quickening.record(expr, (op_type, left.__class__),
+                              quickening.BINARY)
+
+        if op_type in self.NUMBER_OPERATORS:
+            self.checkType(left, float, expr.operator,
+                           "Operands must be numbers")
+            self.checkType(right, float, expr.operator,
+                           "Operands must be numbers")
+            return self.NUMBER_OPERATORS[op_type](left, right)
 
         elif op_type == tt.PLUS:
             if isinstance(left, float) and isinstance(right, float):
                 return left + right
-            if isinstance(left, str) and isinstance(right, str):
-                return left + right
+            if isinstance(left, Rope.STRINGS) and isinstance(right, Rope.STRINGS):
+                return Rope.concat(left, right)
             raise RuntimeError(
                 expr.operator, "Operands must be two numbers or two strings.")
         elif op_type == tt.BANG_EQUAL:
@@ -205,25 +377,105 @@ class Interpreter(Expr.Visitor, Stmt.Visitor):
         return None
 
     def visit_call_expr(self, expr):
+        if isinstance(expr.callee, Expr.Get):
+            return self.call_get(expr, expr.callee)
         callee = self.evaluate(expr.callee)
         arguments = [self.evaluate(argument) for argument in expr.arguments]
+        return self.call_value(expr, callee, arguments)
+
+    def call_get(self, expr, get):
+        # obj.method(args): a plain method is invoked with the receiver
+        # directly, so no bound Function is built just to be called once.
+        obj = self.evaluate(get.object)
+        if isinstance(obj, Instance) and self.field_index(get, obj) is None:
+            _, method, is_getter = self.cached_method(
+                get, obj.klass, get.name.lexeme)
+            if method is not None and not is_getter:
+                arguments = [self.evaluate(argument)
+                             for argument in expr.arguments]
+                if len(arguments) != method.arity():
+                    raise RuntimeError(
+                        expr.paren, f"Expected {method.arity()} arguments but got {len(arguments)}.")
+                if self.depth >= self.max_depth:
+                    raise RuntimeError(expr.paren, "Stack overflow.")
+                return method.invoke(self, obj, arguments)
+        callee = self.get_property(get, obj)
+        arguments = [self.evaluate(argument) for argument in expr.arguments]
+        return self.call_value(expr, callee, arguments)
+
+    def call_value(self, expr, callee, arguments):
+        if callee.__class__ is Class:
+            # Constructors follow the plan the Class made when declared:
+            # the instance, then at most one frame for its initializer.
+            if len(arguments) != callee.init_arity:
+                raise RuntimeError(
+                    expr.paren, f"Expected {callee.init_arity} arguments but got {len(arguments)}.")
+            if self.depth >= self.max_depth:
+                raise RuntimeError(expr.paren, "Stack overflow.")
+            instance = Instance(callee)
+            if callee.initializer is not None:
+                callee.initializer.invoke(self, instance, arguments)
+            return instance
         if not isinstance(callee, Callable):
             raise RuntimeError(
                 expr.paren, "Can only call functions and classes.")
         if len(arguments) != callee.arity():
             raise RuntimeError(
                 expr.paren, f"Expected {callee.arity()} arguments but got {len(arguments)}.")
+        if self.depth >= self.max_depth:
+            raise RuntimeError(expr.paren, "Stack overflow.")
         return callee.call(self, arguments)
 
+    def check_arity(self, expr, callee, arguments):
+        if len(arguments) != callee.arity():
+            raise RuntimeError(
+                expr.paren, f"Expected {callee.arity()} arguments but got {len(arguments)}.")
+
     def visit_get_expr(self, expr):
-        obj = self.evaluate(expr.object)
+        return self.get_property(expr, self.evaluate(expr.object))
+
+    def get_property(self, expr, obj):
         if isinstance(obj, Instance):
-            value = obj.get(expr.name)
-            if isinstance(value, Function) and value.declaration.kind == "getter":
-                return value.call(self, [])
-            return value
+            index = self.field_index(expr, obj)
+            if index is not None:
+                value = obj.values[index]
+                if isinstance(value, Function) and value.declaration.kind == "getter":
+                    if self.depth >= self.max_depth:
+                        raise RuntimeError(expr.name, "Stack overflow.")
+                    return value.call(self, [])
+                return value
+
+            _, method, is_getter = self.cached_method(
+                expr, obj.klass, expr.name.lexeme)
+            if method is None:
+                raise obj.undefined_property(expr.name)
+            if is_getter:
+                if self.depth >= self.max_depth:
+                    raise RuntimeError(expr.name, "Stack overflow.")
+                return method.invoke(self, obj, [])
+            return method.bind(obj)
         raise RuntimeError(expr.name, "Only instances have properties.")
 
+    def field_index(self, expr, obj):
+        # Inline cache on the Get node: (shape, index of the field or None)
+        # for the last shape seen there.
+        cache = expr.shape_cache
+        if cache is None or cache[0] is not obj.shape:
+            cache = (obj.shape, obj.shape.slots.get(expr.name.lexeme))
+            expr.shape_cache = cache
+        return cache[1]
+
+    def cached_method(self, expr, klass, name):
+        # Monomorphic inline cache on the Get/Super node: (class, method,
+        # is_getter), refilled whenever a different class shows up.
+        cache = expr.cache
+        if cache is None or cache[0] is not klass:
+            method = klass.find_method(name)
+            cache = (klass, method, method is not None and
+                     method.declaration.kind == "getter")
+            expr.cache = cache
+        return cache
+
     def isEqual(self, a, b):
         if a is None and b is None:
             return True
@@ -238,11 +490,16 @@ class Interpreter(Expr.Visitor, Stmt.Visitor):
     def execute(self, stmt):
         return stmt.accept(self)
 
-    def resolve(self, expr, depth):
-        self.locals[expr] = depth
-
     def visit_block_stmt(self, stmt):
-        self.execute_block(stmt.statements, Environment(self.environment))
+        if stmt.scope_size:
+            return self.execute_block(stmt.statements, Environment(
+                self.environment, stmt.scope_size))
+        # The Resolver gave its locals, if any, slots in the enclosing
+        # environment.
+        for statement in stmt.statements:
+            completion = statement.accept(self)
+            if completion is not None:
+                return completion
         return None
 
     def visit_class_stmt(self, stmt):
@@ -252,14 +509,15 @@ class Interpreter(Expr.Visitor, Stmt.Visitor):
             if (not isinstance(superclass, Class)):
                 raise RuntimeError(stmt.superclass.name,
                                    "Superclass must be a class.")
-        self.environment.define(stmt.name.lexeme, None)
+        self.declare(stmt, None)
         if (stmt.superclass is not None):
-            self.environment = Environment(self.environment)
-            self.environment.define("super", superclass)
+            # Only methods read "super", so it always sits in a Cell.
+            self.environment = Environment(self.environment, 1)
+            self.environment.values[0] = Cell(superclass)
         methods = {}
         static_methods = {}
         for method in stmt.methods:
-            function = Function(method, self.environment,
+            function = Function(method, self.environment.capture(method.upvalues),
                                 method.name.lexeme == "init", method.kind)
             if method.kind == "static":
                 static_methods[method.name.lexeme] = function
@@ -268,15 +526,21 @@ class Interpreter(Expr.Visitor, Stmt.Visitor):
         klass = Class(stmt.name.lexeme, superclass, methods, static_methods)
         if (superclass is not None):
             self.environment = self.environment.enclosing
-        self.environment.assign(stmt.name, klass)
+        self.initialize(stmt, klass)
         return None
 
+    # Statements return their completion: None when control falls through,
+    # or a 1-tuple holding the value of a `return`, which every enclosing
+    # statement hands straight back up to the function call.
     def execute_block(self, statements, environment):
         previous = self.environment
         try:
             self.environment = environment
             for statement in statements:
-                self.execute(statement)
+                completion = statement.accept(self)
+                if completion is not None:
+                    return completion
+            return None
         finally:
             self.environment = previous
 
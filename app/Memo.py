@@ -0,0 +1,31 @@
+from collections import OrderedDict
+
+
+class Memo:
+    # Bounded LRU cache of one pure function's results, keyed on its
+    # argument values, with hit and miss counts for the exit report.
+    def __init__(self, name, size):
+        self.name = name
+        self.size = size
+        self.entries = OrderedDict()
+        self.hits = 0
+        self.misses = 0
+
+    def call(self, function, interpreter, arguments):
+        # The class is part of the key: Python treats true and 1 as equal.
+        key = tuple((value.__class__, value) for value in arguments)
+        entries = self.entries
+        if key in entries:
+            self.hits += 1
+            entries.move_to_end(key)
+            return entries[key]
+        self.misses += 1
+        value = function.call(interpreter, arguments)
+        entries[key] = value
+        if len(entries) > self.size:
+            entries.popitem(last=False)
+        return value
+
+    def __str__(self):
+        return (f"memo {self.name}: {self.hits} hits, {self.misses} misses, "
+                f"{len(self.entries)} cached")
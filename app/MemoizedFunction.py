@@ -0,0 +1,18 @@
+from app.Callable import Callable
+
+
+class MemoizedFunction(Callable):
+    # A pure function whose calls go through its declaration's Memo. A tail
+    # call goes straight to `function` instead, so it stays a tail call.
+    def __init__(self, function, memo):
+        self.function = function
+        self.memo = memo
+
+    def arity(self):
+        return self.function.arity()
+
+    def call(self, interpreter, arguments):
+        return self.memo.call(self.function, interpreter, arguments)
+
+    def __str__(self):
+        return str(self.function)
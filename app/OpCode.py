@@ -0,0 +1,44 @@
+from enum import IntEnum
+
+
+class OpCode(IntEnum):
+    CONSTANT = 0
+    NIL = 1
+    TRUE = 2
+    FALSE = 3
+    POP = 4
+    GET_LOCAL = 5
+    SET_LOCAL = 6
+    GET_GLOBAL = 7
+    DEFINE_GLOBAL = 8
+    SET_GLOBAL = 9
+    GET_UPVALUE = 10
+    SET_UPVALUE = 11
+    GET_PROPERTY = 12
+    SET_PROPERTY = 13
+    ASSERT_INSTANCE = 14
+    GET_SUPER = 15
+    EQUAL = 16
+    NOT_EQUAL = 17
+    GREATER = 18
+    GREATER_EQUAL = 19
+    LESS = 20
+    LESS_EQUAL = 21
+    ADD = 22
+    SUBTRACT = 23
+    MULTIPLY = 24
+    DIVIDE = 25
+    NOT = 26
+    NEGATE = 27
+    PRINT = 28
+    JUMP = 29
+    JUMP_IF_FALSE = 30
+    CALL = 31
+    CLOSURE = 32
+    CLOSE_UPVALUE = 33
+    RETURN = 34
+    CLASS = 35
+    TAIL_CALL = 36
+    POP_JUMP_IF_FALSE = 37
+    GET_METHOD = 38
+    INVOKE = 39
@@ -0,0 +1,202 @@
+from app.tool import Expr, Stmt
+from app.TokensType import TokensType as tt
+from app.Interpreter import Interpreter
+
+
+class Optimizer(Expr.Visitor, Stmt.Visitor):
+    # Rewrites a resolved tree before it runs: folds operators whose operands
+    # are literals, short-circuits `and`/`or` on a literal left operand,
+    # drops `if` branches and `while` loops whose condition is a literal, and
+    # unwraps groupings. An operation that would fail at runtime (`-"str"`,
+    # `1 / 0`, `"a" < 1`) is left in place so it still fails there. Nodes
+    # are updated in place; only folded expressions become new Literals.
+
+    isTruthy = Interpreter.isTruthy
+    isEqual = Interpreter.isEqual
+
+    arithmetic = {
+        tt.MINUS: lambda a, b: a - b,
+        tt.STAR: lambda a, b: a * b,
+        tt.GREATER: lambda a, b: a > b,
+        tt.GREATER_EQUAL: lambda a, b: a >= b,
+        tt.LESS: lambda a, b: a < b,
+        tt.LESS_EQUAL: lambda a, b: a <= b,
+    }
+
+    def optimize(self, statements):
+        return self.statements(statements)
+
+    def optimize_expr(self, expr):
+        return expr.accept(self)
+
+    def statements(self, statements):
+        optimized = []
+        for statement in statements:
+            statement = statement.accept(self)
+            if statement is not None:
+                optimized.append(statement)
+        return optimized
+
+    def branch(self, stmt):
+        # A removed statement still has to fill an `if` or loop body slot.
+        stmt = stmt.accept(self)
+        return self.empty() if stmt is None else stmt
+
+    def empty(self):
+        block = Stmt.Block([])
+        block.scope_size = 0
+        return block
+
+    # Statements return their replacement, or None to be removed.
+
+    def visit_block_stmt(self, stmt):
+        stmt.statements = self.statements(stmt.statements)
+        return stmt
+
+    def visit_class_stmt(self, stmt):
+        for method in stmt.methods:
+            method.accept(self)
+        return stmt
+
+    def visit_expression_stmt(self, stmt):
+        stmt.expression = stmt.expression.accept(self)
+        if isinstance(stmt.expression, Expr.Literal):
+            return None
+        return stmt
+
+    def visit_for_stmt(self, stmt):
+        if stmt.initializer is not None:
+            stmt.initializer = stmt.initializer.accept(self)
+        if stmt.condition is not None:
+            condition = stmt.condition.accept(self)
+            if isinstance(condition, Expr.Literal):
+                if not self.isTruthy(condition.value):
+                    if stmt.initializer is None:
+                        return None
+                    # Only the initializer runs.
+                    stmt.condition = condition
+                    stmt.increment = None
+                    stmt.body = self.empty()
+                    return stmt
+                condition = None
+            stmt.condition = condition
+        if stmt.increment is not None:
+            stmt.increment = stmt.increment.accept(self)
+        stmt.body = self.branch(stmt.body)
+        return stmt
+
+    def visit_function_stmt(self, stmt):
+        stmt.body = self.statements(stmt.body)
+        return stmt
+
+    def visit_if_stmt(self, stmt):
+        condition = stmt.condition.accept(self)
+        if isinstance(condition, Expr.Literal):
+            if self.isTruthy(condition.value):
+                return stmt.then_branch.accept(self)
+            if stmt.else_branch is not None:
+                return stmt.else_branch.accept(self)
+            return None
+        stmt.condition = condition
+        stmt.then_branch = self.branch(stmt.then_branch)
+        if stmt.else_branch is not None:
+            stmt.else_branch = stmt.else_branch.accept(self)
+        return stmt
+
+    def visit_print_stmt(self, stmt):
+        stmt.expression = stmt.expression.accept(self)
+        return stmt
+
+    def visit_return_stmt(self, stmt):
+        if stmt.value is not None:
+            stmt.value = stmt.value.accept(self)
+        return stmt
+
+    def visit_var_stmt(self, stmt):
+        if stmt.initializer is not None:
+            stmt.initializer = stmt.initializer.accept(self)
+        return stmt
+
+    def visit_while_stmt(self, stmt):
+        condition = stmt.condition.accept(self)
+        if isinstance(condition, Expr.Literal) and not self.isTruthy(condition.value):
+            return None
+        stmt.condition = condition
+        stmt.body = self.branch(stmt.body)
+        return stmt
+
+    # Expressions return their replacement.
+
+    def visit_assign_expr(self, expr):
+        expr.value = expr.value.accept(self)
+        return expr
+
+    def visit_binary_expr(self, expr):
+        left = expr.left = expr.left.accept(self)
+        right = expr.right = expr.right.accept(self)
+        if not (isinstance(left, Expr.Literal) and isinstance(right, Expr.Literal)):
+            return expr
+        a = left.value
+        b = right.value
+        op_type = expr.operator.tokenType
+        if op_type == tt.EQUAL_EQUAL:
+            return Expr.Literal(self.isEqual(a, b))
+        if op_type == tt.BANG_EQUAL:
+            return Expr.Literal(not self.isEqual(a, b))
+        if op_type == tt.PLUS and a.__class__ is b.__class__ and a.__class__ in (float, str):
+            return Expr.Literal(a + b)
+        if a.__class__ is float and b.__class__ is float:
+            if op_type in self.arithmetic:
+                return Expr.Literal(self.arithmetic[op_type](a, b))
+            if op_type == tt.SLASH and b != 0:
+                return Expr.Literal(a / b)
+        return expr
+
+    def visit_call_expr(self, expr):
+        expr.callee = expr.callee.accept(self)
+        expr.arguments = [argument.accept(self) for argument in expr.arguments]
+        return expr
+
+    def visit_get_expr(self, expr):
+        expr.object = expr.object.accept(self)
+        return expr
+
+    def visit_grouping_expr(self, expr):
+        return expr.expression.accept(self)
+
+    def visit_literal_expr(self, expr):
+        return expr
+
+    def visit_logical_expr(self, expr):
+        left = expr.left.accept(self)
+        if isinstance(left, Expr.Literal):
+            # The literal decides: it is the result, or it is skipped.
+            if self.isTruthy(left.value) == (expr.operator.tokenType == tt.OR):
+                return left
+            return expr.right.accept(self)
+        expr.left = left
+        expr.right = expr.right.accept(self)
+        return expr
+
+    def visit_set_expr(self, expr):
+        expr.object = expr.object.accept(self)
+        expr.value = expr.value.accept(self)
+        return expr
+
+    def visit_super_expr(self, expr):
+        return expr
+
+    def visit_this_expr(self, expr):
+        return expr
+
+    def visit_unary_expr(self, expr):
+        right = expr.right = expr.right.accept(self)
+        if isinstance(right, Expr.Literal):
+            if expr.operator.tokenType == tt.BANG:
+                return Expr.Literal(not self.isTruthy(right.value))
+            if expr.operator.tokenType == tt.MINUS and right.value.__class__ is float:
+                return Expr.Literal(-right.value)
+        return expr
+
+    def visit_variable_expr(self, expr):
+        return expr
@@ -0,0 +1,37 @@
+from app.ExecutionContext import ExecutionContext
+
+
+class Output:
+    # Write buffer for `print`. Lines collect here and go to stdout in one
+    # write once `size` characters are pending; a size of None writes each
+    # line through as it is printed. The engines flush when a run ends,
+    # before reporting a runtime error and when the program reads `clock`,
+    # so stdout stays in order with stderr and timed output is already out.
+    SIZE = 1 << 16
+
+    def __init__(self, size=SIZE):
+        self.size = size
+        self.lines = []
+        self.pending = 0
+
+    def print(self, text):
+        if self.size is None:
+            print(text, file=ExecutionContext.current().output_stream())
+            return
+        self.lines.append(text)
+        self.pending += len(text) + 1
+        if self.pending >= self.size:
+            self.flush()
+
+    def flush(self):
+        # The stream is looked up here rather than kept: it is the running
+        # program's context's, and a redirected sys.stdout receives whatever
+        # is printed while it is in place.
+        stream = ExecutionContext.current().output_stream()
+        lines = self.lines
+        if lines:
+            lines.append("")
+            stream.write("\n".join(lines))
+            self.lines = []
+            self.pending = 0
+        stream.flush()
@@ -11,6 +11,10 @@ class Parser:
     def __init__(self, tokens):
         self.tokens = tokens
         self.current = 0
+        # Buffers that store token types in a column answer type checks
+        # directly, without building a token view for every lookahead.
+        self.type_at = getattr(tokens, "type_at", None) or (
+            lambda index: tokens[index].tokenType)
 
     def parse(self, command):
         try:
@@ -145,15 +149,7 @@ class Parser:
 
         body = self.statement()
 
-        if increment is not None:
-            body = Stmt.Block([body, Stmt.Expression(increment)])
-        if condition is None:
-            condition = Expr.Literal(True)
-        body = Stmt.While(condition, body)
-        if initializer is not None:
-            body = Stmt.Block([initializer, body])
-
-        return body
+        return Stmt.For(initializer, condition, increment, body)
 
     def while_statement(self):
         self.consume(tt.LEFT_PAREN, "Expect '(' after 'while'.")
@@ -242,7 +238,7 @@ class Parser:
     def match(self, *types):
         for type in types:
             if self.check(type):
-                self.advance()
+                self.current += 1
                 return True
 
         return False
@@ -255,9 +251,10 @@ class Parser:
         raise self.error(self.peek(), message)
 
     def check(self, type):
-        if self.is_at_end():
+        token_type = self.type_at(self.current)
+        if token_type == tt.EOF:
             return False
-        return self.peek().tokenType == type
+        return token_type == type
 
     def advance(self):
         if not self.is_at_end():
@@ -265,7 +262,7 @@ class Parser:
         return self.previous()
 
     def is_at_end(self):
-        return self.peek().tokenType == tt.EOF
+        return self.type_at(self.current) == tt.EOF
 
     def peek(self):
         return self.tokens[self.current]
@@ -0,0 +1,136 @@
+from app.TokensType import TokensType as tt
+from app.tool import Expr
+from app.Parser import Parser
+
+
+class PrattParser(Parser):
+    # Expression parser driven by a binding-power table instead of one
+    # method per precedence level. Statements are parsed by Parser; only
+    # the expression grammar is replaced, and it builds the same Expr trees
+    # and reports the same errors.
+
+    # Left binding power of each infix operator; all of them are
+    # left-associative, so the right operand is parsed at power + 1.
+    binding_powers = {
+        tt.OR: 1,
+        tt.AND: 2,
+        tt.BANG_EQUAL: 3,
+        tt.EQUAL_EQUAL: 3,
+        tt.GREATER: 4,
+        tt.GREATER_EQUAL: 4,
+        tt.LESS: 4,
+        tt.LESS_EQUAL: 4,
+        tt.MINUS: 5,
+        tt.PLUS: 5,
+        tt.SLASH: 6,
+        tt.STAR: 6,
+    }
+
+    logical_operators = {tt.OR, tt.AND}
+
+    literals = {
+        tt.FALSE: False,
+        tt.TRUE: True,
+        tt.NIL: None,
+    }
+
+    def expression(self):
+        return self.assignment()
+
+    def assignment(self):
+        expr = self.infix(1)
+
+        if self.type_at(self.current) == tt.EQUAL:
+            self.current += 1
+            equals = self.previous()
+            value = self.assignment()
+
+            if isinstance(expr, Expr.Variable):
+                name = expr.name
+                return Expr.Assign(name, value)
+            elif isinstance(expr, Expr.Get):
+                return Expr.Set(expr.object, expr.name, value)
+
+            self.error(equals, "Invalid assignment target.")
+
+        return expr
+
+    def infix(self, min_power):
+        expr = self.unary()
+        binding_powers = self.binding_powers
+
+        while True:
+            token_type = self.type_at(self.current)
+            power = binding_powers.get(token_type)
+            if power is None or power < min_power:
+                return expr
+
+            self.current += 1
+            operator = self.previous()
+            right = self.infix(power + 1)
+            if token_type in self.logical_operators:
+                expr = Expr.Logical(expr, operator, right)
+            else:
+                expr = Expr.Binary(expr, operator, right)
+
+    def unary(self):
+        operators = []
+        while self.type_at(self.current) in (tt.BANG, tt.MINUS):
+            self.current += 1
+            operators.append(self.previous())
+
+        expr = self.call()
+        for operator in reversed(operators):
+            expr = Expr.Unary(operator, expr)
+        return expr
+
+    def call(self):
+        expr = self.primary()
+
+        while True:
+            token_type = self.type_at(self.current)
+            if token_type == tt.LEFT_PAREN:
+                self.current += 1
+                expr = self.finish_call(expr)
+            elif token_type == tt.DOT:
+                self.current += 1
+                name = self.consume(
+                    tt.IDENTIFIER, "Expect property name after '.'.")
+                expr = Expr.Get(expr, name)
+            else:
+                return expr
+
+    def primary(self):
+        token_type = self.type_at(self.current)
+
+        if token_type in self.literals:
+            self.current += 1
+            return Expr.Literal(self.literals[token_type])
+
+        if token_type == tt.IDENTIFIER:
+            self.current += 1
+            return Expr.Variable(self.previous())
+
+        if token_type == tt.NUMBER or token_type == tt.STRING:
+            self.current += 1
+            return Expr.Literal(self.previous().literal)
+
+        if token_type == tt.THIS:
+            self.current += 1
+            return Expr.This(self.previous())
+
+        if token_type == tt.SUPER:
+            self.current += 1
+            keyword = self.previous()
+            self.consume(tt.DOT, "Expect '.' after 'super'.")
+            method = self.consume(
+                tt.IDENTIFIER, "Expect superclass method name.")
+            return Expr.Super(keyword, method)
+
+        if token_type == tt.LEFT_PAREN:
+            self.current += 1
+            expr = self.expression()
+            self.consume(tt.RIGHT_PAREN, "Expect ')' after expression.")
+            return Expr.Grouping(expr)
+
+        raise self.error(self.peek(), "Expect expression.")
@@ -0,0 +1,192 @@
+import gc
+import hashlib
+import os
+import pickle
+import stat
+import sys
+import tempfile
+from contextlib import contextmanager
+from app.Token import Token
+from app.TokensType import TokensType
+from app.tool import Expr, Stmt
+
+
+class ProgramCache:
+    # On-disk cache of resolved programs. An entry holds the statement list
+    # together with the Resolver's results, so an unchanged script can go
+    # straight to the Interpreter. Entries are keyed by a hash of the source
+    # and of the interpreter build, and the directory is kept under a size
+    # budget by evicting the least recently used entries. Only a directory
+    # and entries that belong to the current user and that nobody else can
+    # write are trusted, and an entry can only rebuild syntax tree nodes and
+    # tokens, never name arbitrary code to run.
+
+    suffix = ".loxc"
+
+    def __init__(self, directory=None, max_bytes=None, pause_gc=False):
+        # pause_gc is for a process that runs one program and exits, like
+        # the CLI: the collector is switched off while entries are
+        # (un)pickled and a loaded tree is frozen for good, which would
+        # leak in a long-lived process and is process-wide, so not
+        # thread-safe.
+        self.pause_gc = pause_gc
+        self.directory = directory or os.environ.get("LOX_CACHE_DIR") or os.path.join(
+            os.environ.get("XDG_CACHE_HOME") or os.path.expanduser("~/.cache"), "lox")
+        self.max_bytes = max_bytes if max_bytes is not None else int(
+            os.environ.get("LOX_CACHE_MAX_BYTES", 64 * 1024 * 1024))
+
+    def key(self, source, command, *options):
+        # `options` names the settings that change the stored tree.
+        digest = hashlib.sha256()
+        digest.update(interpreter_version().encode())
+        for part in (command, *options):
+            digest.update(part.encode())
+            digest.update(b"\0")
+        digest.update(source.encode("utf-8", "surrogatepass"))
+        return digest.hexdigest()
+
+    def path(self, key):
+        return os.path.join(self.directory, key + self.suffix)
+
+    def load(self, key):
+        path = self.path(key)
+        if not self.trusted(self.directory):
+            return None
+        try:
+            with self.gc_paused(), open(path, "rb") as file:
+                if os.fstat(file.fileno()).st_uid != os.getuid():
+                    return None
+                entry = TreeUnpickler(file).load()
+        except FileNotFoundError:
+            return None
+        except Exception:
+            # Truncated or stale entry: drop it and fall back to a cold run.
+            self.discard(path)
+            return None
+        if self.pause_gc:
+            # The tree lives until the process exits; later collections
+            # need not walk it again.
+            gc.freeze()
+
+        try:
+            os.utime(path)
+        except OSError:
+            pass
+        return entry
+
+    def store(self, key, entry):
+        try:
+            with self.gc_paused():
+                data = pickle.dumps(entry, pickle.HIGHEST_PROTOCOL)
+        except (RecursionError, pickle.PicklingError, TypeError, AttributeError):
+            return False
+
+        try:
+            os.makedirs(self.directory, mode=0o700, exist_ok=True)
+            if not self.trusted(self.directory):
+                return False
+            fd, temp_path = tempfile.mkstemp(
+                dir=self.directory, suffix=".tmp")
+            with os.fdopen(fd, "wb") as file:
+                file.write(data)
+            os.replace(temp_path, self.path(key))
+        except OSError:
+            return False
+
+        self.evict()
+        return True
+
+    @staticmethod
+    def trusted(directory):
+        # Anyone who can write to the directory could plant an entry under
+        # a key they can predict from the source.
+        try:
+            status = os.stat(directory)
+        except OSError:
+            return False
+        return (status.st_uid == os.getuid()
+                and not status.st_mode & (stat.S_IWGRP | stat.S_IWOTH))
+
+    @contextmanager
+    def gc_paused(self):
+        # (Un)pickling a large tree allocates hundreds of thousands of
+        # long-lived objects; collecting while it runs only re-walks them.
+        if not self.pause_gc or not gc.isenabled():
+            yield
+            return
+        gc.disable()
+        try:
+            yield
+        finally:
+            gc.enable()
+
+    def evict(self):
+        entries = []
+        total = 0
+        try:
+            with os.scandir(self.directory) as it:
+                for entry in it:
+                    if entry.name.endswith(self.suffix):
+                        stat = entry.stat()
+                        entries.append((stat.st_mtime_ns, stat.st_size, entry.path))
+                        total += stat.st_size
+        except OSError:
+            return
+
+        entries.sort()
+        for _, size, path in entries:
+            if total <= self.max_bytes:
+                break
+            self.discard(path)
+            total -= size
+
+    def discard(self, path):
+        try:
+            os.remove(path)
+        except OSError:
+            pass
+
+
+class TreeUnpickler(pickle.Unpickler):
+    # An entry only holds syntax tree nodes, tokens and plain values, so
+    # those are the only classes it may name. Any other global is refused
+    # instead of being imported and called.
+
+    classes = {
+        (cls.__module__, cls.__name__): cls
+        for module, base in ((Expr, Expr.Expr), (Stmt, Stmt.Stmt))
+        for cls in vars(module).values()
+        if isinstance(cls, type) and issubclass(cls, base) and cls is not base
+    }
+    classes[Token.__module__, Token.__name__] = Token
+    classes[TokensType.__module__, TokensType.__name__] = TokensType
+
+    def find_class(self, module, name):
+        try:
+            return self.classes[module, name]
+        except KeyError:
+            raise pickle.UnpicklingError(
+                f"{module}.{name} is not allowed in a cache entry") from None
+
+
+_interpreter_version = None
+
+
+def interpreter_version():
+    # Fingerprint of the Python runtime and of every loaded app module, so
+    # any change to the interpreter's code invalidates cached programs.
+    global _interpreter_version
+    if _interpreter_version is None:
+        parts = [sys.version]
+        for name in sorted(sys.modules):
+            module = sys.modules[name]
+            path = getattr(module, "__file__", None)
+            if (name == "app" or name.startswith("app.")) and path:
+                try:
+                    stat = os.stat(path)
+                except OSError:
+                    continue
+                parts.append(f"{name}:{stat.st_size}:{stat.st_mtime_ns}")
+        _interpreter_version = hashlib.sha256(
+            "\n".join(parts).encode()).hexdigest()
+    return _interpreter_version
@@ -1,30 +1,90 @@
+from collections import Counter
 import app.tool.Expr as Expr
 import app.tool.Stmt as Stmt
 import app.error as error
 from app.FunctionsType import FunctionsType as ft
 from app.ClassType import ClassType as ct
+from app.Token import Token
+from app.TokensType import TokensType as tt
+from app.Globals import Globals
 
 
 class Resolver(Expr.Visitor, Stmt.Visitor):
-    interpreter = None
-    # stack of dictionaries
-    scopes = []
-    current_function = ft.NONE
-    current_class = ct.NONE
+    class Purity:
+        # What the purity analysis knows about one function declaration:
+        # the scope its own locals start at, whether its body did anything
+        # impure, and the global names it reads.
+        __slots__ = ("function", "scope", "impure", "globals")
+
+        def __init__(self, function, scope):
+            self.function = function
+            self.scope = scope
+            self.impure = False
+            self.globals = set()
+
+    class Closure:
+        # A function whose body is being resolved: the scope its own locals
+        # start at, and its free variables in upvalue order. Each upvalue is
+        # the (distance, slot) of a Cell seen from the scope the function is
+        # declared in, and `indexes` maps (scope, name) to its position.
+        __slots__ = ("scope", "upvalues", "indexes")
+
+        def __init__(self, scope):
+            self.scope = scope
+            self.upvalues = []
+            self.indexes = {}
 
     def __init__(self, interpreter):
         self.interpreter = interpreter
+        # stack of dictionaries
+        self.scopes = []
+        # parallel stack mapping each declared name to its slot in the scope
+        self.slots = []
+        self.current_function = ft.NONE
+        self.current_class = ct.NONE
+        # Functions whose bodies are being resolved, innermost last, and
+        # every function seen so far.
+        self.purity = []
+        self.functions = []
+        self.global_declarations = Counter()
+        self.assigned_globals = set()
+        # Global names, interned to their slot in the global table.
+        self.global_slots = {name: slot for slot, name in enumerate(Globals.NATIVES)}
+        # Parallel to `scopes`: the nodes that read, write or declare each
+        # local from its own function, and the locals a nested function
+        # captures. Those nodes are marked to go through a Cell once the
+        # scope ends.
+        self.uses = []
+        self.captured = []
+        self.closures = []
+        # Also parallel to `scopes`: how many environments a scope sits in,
+        # counting its own. Only functions, "super" and outermost blocks get
+        # an environment; other blocks keep their locals in the enclosing
+        # one. `frames` holds [next slot, size] for each scope
+        # that has an environment, and `starts` where each block's slots
+        # began, so its siblings can reuse them.
+        self.levels = []
+        self.frames = []
+        self.starts = []
+
+    DECLARATIONS = (Stmt.Var, Stmt.Function, Stmt.Class)
 
     def visit_block_stmt(self, stmt):
-        self.begin_scope()
+        # A block needs an environment of its own only outside any other
+        # environment, where the enclosing scope is the global dict, and
+        # only when it declares something.
+        self.begin_scope(not self.frames and any(
+            statement.__class__ in self.DECLARATIONS
+            for statement in stmt.statements))
         self.resolve(stmt.statements)
-        self.end_scope()
+        stmt.scope_size = self.end_scope()
         return None
 
     def visit_class_stmt(self, stmt):
+        self.impure()
         enclosing_class = self.current_class
         self.current_class = ct.CLASS
-        self.declare(stmt.name)
+        stmt.slot = self.declare(stmt.name, stmt)
         if (stmt.superclass is not None):
             if (stmt.name.lexeme == stmt.superclass.name.lexeme):
                 error.token_error(
@@ -34,10 +94,7 @@ class Resolver(Expr.Visitor, Stmt.Visitor):
 
         if (stmt.superclass is not None):
             self.begin_scope()
-            self.scopes[-1]["super"] = True
-
-        self.begin_scope()
-        self.scopes[-1]["this"] = True
+            self.declare_internal("super")
 
         for method in stmt.methods:
             declaration = ft.METHOD
@@ -48,8 +105,6 @@ class Resolver(Expr.Visitor, Stmt.Visitor):
             elif method.kind == "getter":
                 declaration = ft.GETTER
             self.resolve_function(method, declaration)
-        self.define(stmt.name)
-        self.end_scope()
 
         if (stmt.superclass is not None):
             self.end_scope()
@@ -57,8 +112,11 @@ class Resolver(Expr.Visitor, Stmt.Visitor):
         return None
 
     def resolve(self, statements):
+        program = not self.scopes
         for statement in statements:
             self.resolve_statement(statement)
+        if program:
+            self.mark_pure_functions()
 
     def resolve_statement(self, statement):
         statement.accept(self)
@@ -66,27 +124,78 @@ class Resolver(Expr.Visitor, Stmt.Visitor):
     def resolve_expr(self, expr):
         expr.accept(self)
 
-    def begin_scope(self):
+    def begin_scope(self, environment=True):
+        level = self.levels[-1] if self.levels else 0
+        if environment:
+            self.levels.append(level + 1)
+            self.frames.append([0, 0])
+            self.starts.append(None)
+        else:
+            self.levels.append(level)
+            self.starts.append(self.frames[-1][0] if self.frames else 0)
         self.scopes.append({})
+        self.slots.append({})
+        self.uses.append({})
+        self.captured.append(set())
 
     def end_scope(self):
+        # Returns how many slots the scope's environment needs, or 0 when it
+        # has none and runs in the enclosing one.
+        uses = self.uses.pop()
+        for name in self.captured.pop():
+            for node in uses[name]:
+                node.cell = True
         self.scopes.pop()
+        self.slots.pop()
+        self.levels.pop()
+        start = self.starts.pop()
+        if start is None:
+            return self.frames.pop()[1]
+        if self.frames:
+            self.frames[-1][0] = start
+        return 0
 
     def visit_var_stmt(self, stmt):
-        self.declare(stmt.name)
+        stmt.slot = self.declare(stmt.name, stmt)
         if stmt.initializer is not None:
             self.resolve_expr(stmt.initializer)
         self.define(stmt.name)
         return None
 
-    def declare(self, name):
+    def declare(self, name, node=None):
+        # Returns the slot of the new local, or None for a global. `node` is
+        # the statement that stores the local's first value.
         if not self.scopes:
-            return
+            self.global_declarations[name.lexeme] += 1
+            node.global_slot = self.global_slot(name.lexeme)
+            return None
         scope = self.scopes[-1]  # get the current scope
         if name.lexeme in scope:
             error.token_error(
                 name, "Variable with this name already declared in this scope.")
         scope[name.lexeme] = False
+        self.uses[-1][name.lexeme] = [] if node is None else [node]
+        return self.slot_for(name.lexeme)
+
+    def global_slot(self, name):
+        if name not in self.global_slots:
+            self.global_slots[name] = len(self.global_slots)
+        return self.global_slots[name]
+
+    def declare_internal(self, name):
+        # "this" and "super" live in scopes of their own, already defined.
+        self.scopes[-1][name] = True
+        self.uses[-1][name] = []
+        return self.slot_for(name)
+
+    def slot_for(self, name):
+        slots = self.slots[-1]
+        if name not in slots:
+            frame = self.frames[-1]
+            slots[name] = frame[0]
+            frame[0] += 1
+            frame[1] = max(frame[1], frame[0])
+        return slots[name]
 
     def define(self, name):
         # checking scopes is not empty
@@ -100,25 +209,120 @@ class Resolver(Expr.Visitor, Stmt.Visitor):
         if self.scopes and self.scopes[-1].get(expr.name.lexeme) is False:
             error.token_error(
                 expr.name, "Cannot read local variable in its own initializer.")
-        self.resolve_local(expr, expr.name)
+        scope = self.resolve_local(expr, expr.name)
+        if scope is None:
+            expr.slot = self.global_slot(expr.name.lexeme)
+        self.read(expr, scope)
         return None
 
     def resolve_local(self, expr, name):
+        # Returns the index of the scope that declares `name`, or None when
+        # it is not found and so is assumed to be global.
         # iterate from the current scope to the global scope
         for i in range(len(self.scopes) - 1, -1, -1):
             if name.lexeme in self.scopes[i]:
-                self.interpreter.resolve(expr, len(self.scopes) - 1 - i)
-                return
-        # Not found. Assume it is global.
+                self.resolve_scope(expr, name.lexeme, i)
+                return i
+        return None
+
+    def resolve_scope(self, expr, name, scope):
+        # A local of the current function is found by (depth, slot) through
+        # its environments. A local of an enclosing function is one of this
+        # function's upvalues instead: its depth reaches the flat closure
+        # just outside the function's own scope, and its slot is the index.
+        closures = self.closures
+        if not closures or closures[-1].scope <= scope:
+            expr.depth = self.levels[-1] - self.levels[scope]
+            expr.slot = self.slots[scope][name]
+            self.uses[scope][name].append(expr)
+        else:
+            expr.depth = self.levels[-1] - self.levels[closures[-1].scope] + 1
+            expr.slot = self.upvalue(len(closures) - 1, name, scope)
+            expr.cell = True
+
+    def upvalue(self, index, name, scope):
+        # Index of the local `name` of `scope` among the upvalues of the
+        # function closures[index], adding it to every function in between.
+        closure = self.closures[index]
+        key = (scope, name)
+        if key not in closure.indexes:
+            declared_in = self.levels[closure.scope - 1]
+            if index == 0 or self.closures[index - 1].scope <= scope:
+                self.captured[scope].add(name)
+                source = (declared_in - self.levels[scope],
+                          self.slots[scope][name])
+            else:
+                outer = self.closures[index - 1]
+                source = (declared_in - self.levels[outer.scope] + 1,
+                          self.upvalue(index - 1, name, scope))
+            closure.indexes[key] = len(closure.upvalues)
+            closure.upvalues.append(source)
+        return closure.indexes[key]
 
     def visit_assign_expr(self, expr):
         # resolve the value if it is an expression e.g. a = b + c
         self.resolve_expr(expr.value)
-        self.resolve_local(expr, expr.name)
+        scope = self.resolve_local(expr, expr.name)
+        if scope is None:
+            expr.slot = self.global_slot(expr.name.lexeme)
+            self.assigned_globals.add(expr.name.lexeme)
+        if not self.is_own_local(scope):
+            self.impure()
         return None
 
+    # Purity analysis. A plain function is pure when it only reads its own
+    # parameters and locals and global functions that are themselves pure,
+    # and writes no variables outside itself, no fields and no output. Such
+    # a call always gives the same result for the same arguments.
+
+    def impure(self):
+        if self.purity:
+            self.purity[-1].impure = True
+
+    def is_own_local(self, scope):
+        # Whether a variable declared in `scope` (None for a global) belongs
+        # to the innermost function.
+        if not self.purity:
+            return True
+        if scope is None:
+            return False
+        return scope >= self.purity[-1].scope
+
+    def read(self, expr, scope):
+        if not self.purity:
+            return
+        if scope is None:
+            self.purity[-1].globals.add(expr.name.lexeme)
+        elif not self.is_own_local(scope):
+            self.impure()
+
+    def mark_pure_functions(self):
+        # Global functions declared once and never assigned always hold the
+        # same function; anything else a body reads from outside makes it
+        # impure. Purity is then the largest set closed under those reads,
+        # so recursive functions can be pure.
+        candidates = {}
+        for purity in self.functions:
+            name = purity.function.name.lexeme
+            if (purity.function.slot is None
+                    and self.global_declarations[name] == 1
+                    and name not in self.assigned_globals):
+                candidates[name] = purity
+        pure = {purity for purity in self.functions if not purity.impure}
+        changed = True
+        while changed:
+            changed = False
+            for purity in list(pure):
+                if any(candidates.get(name) not in pure
+                       for name in purity.globals):
+                    pure.discard(purity)
+                    changed = True
+        for purity in self.functions:
+            purity.function.pure = purity in pure
+
     def visit_function_stmt(self, stmt):
-        self.declare(stmt.name)
+        self.impure()
+        stmt.slot = self.declare(stmt.name, stmt)
         self.define(stmt.name)
         self.resolve_function(stmt, ft.FUNCTION)
         return None
@@ -127,11 +331,29 @@ class Resolver(Expr.Visitor, Stmt.Visitor):
         enclosing_function = self.current_function
         self.current_function = type
         self.begin_scope()
+        closure = self.Closure(len(self.scopes) - 1)
+        self.closures.append(closure)
+        if type == ft.FUNCTION:
+            purity = self.Purity(stmt, len(self.scopes) - 1)
+            self.purity.append(purity)
+            self.functions.append(purity)
+        else:
+            # Methods get their receiver in slot 0 of their own scope, so a
+            # call needs no separate environment just to hold "this".
+            self.declare_internal("this")
         for param in stmt.params:
             self.declare(param)
             self.define(param)
         self.resolve(stmt.body)
-        self.end_scope()
+        # Captured parameters and "this" are boxed by the call itself.
+        arguments = {"this"} | {param.lexeme for param in stmt.params}
+        stmt.cells = tuple(self.slots[-1][name]
+                           for name in self.captured[-1] if name in arguments)
+        stmt.upvalues = tuple(closure.upvalues)
+        self.closures.pop()
+        stmt.scope_size = self.end_scope()
+        if type == ft.FUNCTION:
+            self.purity.pop()
         self.current_function = enclosing_function
 
     def visit_expression_stmt(self, stmt):
@@ -146,6 +368,7 @@ class Resolver(Expr.Visitor, Stmt.Visitor):
         return None
 
     def visit_print_stmt(self, stmt):
+        self.impure()
         self.resolve_expr(stmt.expression)
         return None
 
@@ -160,6 +383,20 @@ class Resolver(Expr.Visitor, Stmt.Visitor):
             self.resolve_expr(stmt.value)
         return None
 
+    def visit_for_stmt(self, stmt):
+        # The loop variable is one local for the whole loop, in a scope
+        # placed like a block's.
+        self.begin_scope(not self.frames and stmt.initializer.__class__ is Stmt.Var)
+        if stmt.initializer is not None:
+            self.resolve_statement(stmt.initializer)
+        if stmt.condition is not None:
+            self.resolve_expr(stmt.condition)
+        if stmt.increment is not None:
+            self.resolve_expr(stmt.increment)
+        self.resolve_statement(stmt.body)
+        stmt.scope_size = self.end_scope()
+        return None
+
     def visit_while_stmt(self, stmt):
         self.resolve_expr(stmt.condition)
         self.resolve_statement(stmt.body)
@@ -172,11 +409,17 @@ class Resolver(Expr.Visitor, Stmt.Visitor):
 
     def visit_call_expr(self, expr):
         self.resolve_expr(expr.callee)
+        # Only calls straight to a named global function can stay pure; the
+        # global itself is checked with the other reads.
+        if not (isinstance(expr.callee, Expr.Variable)
+                and expr.callee.depth is None):
+            self.impure()
         for argument in expr.arguments:
             self.resolve_expr(argument)
         return None
 
     def visit_get_expr(self, expr):
+        self.impure()
         self.resolve_expr(expr.object)
         return None
 
@@ -193,11 +436,13 @@ class Resolver(Expr.Visitor, Stmt.Visitor):
         return None
 
     def visit_set_expr(self, expr):
+        self.impure()
         self.resolve_expr(expr.value)
         self.resolve_expr(expr.object)
         return None
 
     def visit_super_expr(self, expr):
+        self.impure()
         if (self.current_class == ct.NONE):
             error.token_error(
                 expr.keyword, "Cannot use 'super' outside of a class.")
@@ -206,9 +451,13 @@ class Resolver(Expr.Visitor, Stmt.Visitor):
                 expr.keyword, "Cannot use 'super' in a class with no superclass.")
 
         self.resolve_local(expr, expr.keyword)
+        # The receiver a super call binds to, resolved like a `this`.
+        expr.this = Expr.This(Token(tt.THIS, "this", None, expr.keyword.line))
+        self.resolve_local(expr.this, expr.this.keyword)
         return None
 
     def visit_this_expr(self, expr):
+        self.impure()
         if self.current_class == ct.NONE:
             error.token_error(
                 expr.keyword, "Cannot use 'this' outside of a class.")
@@ -0,0 +1,64 @@
+class Rope:
+    __slots__ = ("left", "right", "length", "text")
+
+    # A lazy string concatenation. `+` on strings links the two operands in
+    # a Rope instead of copying them, so a loop doing `s = s + piece` does
+    # constant work per step. The text is only joined when the value is
+    # observed (printed, compared, hashed), in one pass over the pieces,
+    # and kept so later reads are plain str reads. Short results stay str:
+    # copying them is cheaper than the node.
+    MIN_LENGTH = 256
+
+    def __init__(self, left, right, length):
+        self.left = left
+        self.right = right
+        self.length = length
+        self.text = None
+
+    @staticmethod
+    def concat(left, right):
+        length = len(left) + len(right)
+        if length < Rope.MIN_LENGTH:
+            return left + right
+        return Rope(left, right, length)
+
+    def flatten(self):
+        text = self.text
+        if text is None:
+            # Iterative walk: the `s = s + piece` tree is as deep as the loop
+            # that built it.
+            parts = []
+            stack = [self]
+            while stack:
+                node = stack.pop()
+                if node.__class__ is str:
+                    parts.append(node)
+                elif node.text is not None:
+                    parts.append(node.text)
+                else:
+                    stack.append(node.right)
+                    stack.append(node.left)
+            text = self.text = "".join(parts)
+            self.left = self.right = None
+        return text
+
+    def __len__(self):
+        return self.length
+
+    def __str__(self):
+        return self.flatten()
+
+    def __eq__(self, other):
+        if other.__class__ is Rope:
+            return self.length == other.length and \
+                self.flatten() == other.flatten()
+        if other.__class__ is str:
+            return self.length == len(other) and self.flatten() == other
+        return NotImplemented
+
+    def __hash__(self):
+        return hash(self.flatten())
+
+
+# The classes a Lox string value can have.
+Rope.STRINGS = (str, Rope)
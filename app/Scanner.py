@@ -1,6 +1,7 @@
-# import TokensType as tt
+import re
 from app.TokensType import TokensType as tt
 from app.Token import Token
+from app.TokenBuffer import TokenBuffer
 from app.error import error
 
 
@@ -24,28 +25,165 @@ class Scanner:
         "while": tt.WHILE
     }
 
+    punctuation = {
+        "(": tt.LEFT_PAREN,
+        ")": tt.RIGHT_PAREN,
+        "{": tt.LEFT_BRACE,
+        "}": tt.RIGHT_BRACE,
+        ",": tt.COMMA,
+        ".": tt.DOT,
+        "-": tt.MINUS,
+        "+": tt.PLUS,
+        ";": tt.SEMICOLON,
+        "*": tt.STAR,
+        "/": tt.SLASH,
+        "!": tt.BANG,
+        "!=": tt.BANG_EQUAL,
+        "=": tt.EQUAL,
+        "==": tt.EQUAL_EQUAL,
+        "<": tt.LESS,
+        "<=": tt.LESS_EQUAL,
+        ">": tt.GREATER,
+        ">=": tt.GREATER_EQUAL
+    }
+
+    # One alternative per token class, each matching a whole run at once and
+    # swallowing the blanks in front of it. Only ASCII is handled here; any
+    # other character is caught by `other` and handed to the per-character
+    # fallback so str.isalpha()/isdigit()/isspace() semantics are kept.
+    pattern = re.compile(r"""
+        [\t\x0b\x0c\r\x1c-\x1f ]*
+        (?:
+            (?P<identifier>[A-Za-z_][A-Za-z0-9_]*)
+          | (?P<punctuation>[!=<>]=?|[(){},.\-+;*])
+          | (?P<newline>\n[\t\n\x0b\x0c\r\x1c-\x1f ]*)
+          | (?P<number>[0-9]+(?:\.[0-9]+)?)
+          | (?P<comment>//[^\n]*)
+          | (?P<slash>/)
+          | (?P<string>"[^"]*")
+          | (?P<unterminated>")
+          | (?P<other>.)
+          | \Z
+        )
+    """, re.VERBOSE | re.DOTALL)
+
     def __init__(self, source):
         self.source = source
-        self.tokens = []
+        self.tokens = None
         self.start = 0
         self.current = 0
         self.line = 1
 
+    # Fills a compact TokenBuffer; lexemes and literals are only sliced out
+    # of the source when a token view asks for them. The command line does
+    # not come through here: it parses from stream_tokens(), which never
+    # holds more than the parser's window of tokens.
     def scan_tokens(self):
-        while not self.__is_at_end():
-            self.start = self.current
-            self.__scan_token()
-
-        self.tokens.append(Token(tt.EOF, "", None, self.line))
+        self.tokens = TokenBuffer(self.source)
+        append = self.tokens.append
+        for token_type, start, end, line in self.__scan():
+            append(token_type, start, end, line)
         return self.tokens
 
-    # Character handling methods
-    def __advance(self):
-        self.current += 1
-        return self.source[self.current - 1]
+    # Yields tokens one at a time as the source is scanned, so callers that
+    # consume them in order never need the whole token list in memory.
+    def stream_tokens(self):
+        source = self.source
+        number = tt.NUMBER
+        string = tt.STRING
+        for token_type, start, end, line in self.__scan():
+            text = source[start:end]
+            if token_type is number:
+                literal = float(text)
+            elif token_type is string:
+                literal = text[1:-1]
+            else:
+                literal = None
+            yield Token(token_type, text, literal, line)
+
+    # Yields (type, start, end, line) for every token, ending with EOF.
+    def __scan(self):
+        while self.current < len(self.source):
+            self.current = yield from self.__scan_run(self.current)
+
+        yield tt.EOF, self.current, self.current, self.line
+
+    # Scans with the master pattern from `position` until the end of the
+    # source or until a run needs the fallback; returns where it stopped.
+    def __scan_run(self, position):
+        source = self.source
+        length = len(source)
+        keywords = self.keywords
+        punctuation = self.punctuation
+        identifier = tt.IDENTIFIER
+        line = self.line
+
+        for m in self.pattern.finditer(source, position):
+            kind = m.lastgroup
+            if kind == "identifier":
+                start, end = m.span(kind)
+                if end < length and source[end] > "\x7f":
+                    return (yield from self.__resume(self.__identifier, start, end, line))
+                yield keywords.get(source[start:end], identifier), start, end, line
+            elif kind == "punctuation" or kind == "slash":
+                start, end = m.span(kind)
+                yield punctuation[source[start:end]], start, end, line
+            elif kind == "newline":
+                line += m.group(kind).count("\n")
+            elif kind == "number":
+                start, end = m.span(kind)
+                if self.__number_continues(end):
+                    return (yield from self.__resume(self.__number, start, end, line))
+                yield tt.NUMBER, start, end, line
+            elif kind == "string":
+                start, end = m.span(kind)
+                line += source.count("\n", start, end)
+                yield tt.STRING, start, end, line
+            elif kind == "unterminated":
+                line += source.count("\n", m.end())
+                error(line, "Unterminated string.")
+                break
+            elif kind == "other":
+                start, end = m.span(kind)
+                return (yield from self.__resume(self.__scan_fallback, start, end, line))
+
+        self.line = line
+        return length
+
+    def __resume(self, scan, start, current, line):
+        self.start = start
+        self.current = current
+        self.line = line
+        token_type = scan()
+        if token_type is not None:
+            yield token_type, self.start, self.current, self.line
+        return self.current
+
+    # Fallback for characters the pattern does not cover (non-ASCII text and
+    # stray symbols). Mirrors the original character-at-a-time rules.
+    def __scan_fallback(self):
+        current = self.source[self.start]
+        if current.isspace():
+            if current == '\n':
+                self.line += 1
+        elif current.isdigit():
+            return self.__number()
+        elif self.__is_alpha(current):
+            return self.__identifier()
+        else:
+            error(self.line, f"Unexpected character: {current}")
+        return None
+
+    def __number_continues(self, end):
+        source = self.source
+        if end >= len(source):
+            return False
+        if source[end] > "\x7f":
+            return True
+        return source[end] == "." and end + 1 < len(source) and source[end + 1] > "\x7f"
 
     def __peek(self):
-        if self.__is_at_end():
+        if self.current >= len(self.source):
             return '\0'
         return self.source[self.current]
 
@@ -54,93 +192,25 @@ class Scanner:
             return '\0'
         return self.source[self.current + 1]
 
-    def __match(self, expected):
-        if self.__is_at_end() or self.source[self.current] != expected:
-            return False
-
-        self.current += 1
-        return True
-
-    def __is_at_end(self):
-        return self.current >= len(self.source)
-
-    # Token scanning methods
-    def __scan_token(self):
-        current = self.__advance()
-        match current:
-            case '(': self.__add_token(tt.LEFT_PAREN)
-            case ')': self.__add_token(tt.RIGHT_PAREN)
-            case '{': self.__add_token(tt.LEFT_BRACE)
-            case '}': self.__add_token(tt.RIGHT_BRACE)
-            case ',': self.__add_token(tt.COMMA)
-            case '.': self.__add_token(tt.DOT)
-            case '-': self.__add_token(tt.MINUS)
-            case '+': self.__add_token(tt.PLUS)
-            case ';': self.__add_token(tt.SEMICOLON)
-            case '*': self.__add_token(tt.STAR)
-            case '!': self.__add_token(tt.BANG_EQUAL if self.__match('=') else tt.BANG)
-            case '=': self.__add_token(tt.EQUAL_EQUAL if self.__match('=') else tt.EQUAL)
-            case '<': self.__add_token(tt.LESS_EQUAL if self.__match('=') else tt.LESS)
-            case '>': self.__add_token(tt.GREATER_EQUAL if self.__match('=') else tt.GREATER)
-            case '/':
-                if self.__match('/'):
-                    self.__skip_comment()
-                else:
-                    self.__add_token(tt.SLASH)
-            case _ if current.isspace():
-                self.__handle_whitespace(current)
-            case '"':
-                self.__string()
-            case _:
-                if current.isdigit():
-                    self.__number()
-                elif self.__is_alpha(current):
-                    self.__identifier()
-                else:
-                    error(self.line, f"Unexpected character: {current}")
-
-    # Specific token handling methods
-    def __skip_comment(self):
-        while self.__peek() != '\n' and not self.__is_at_end():
-            self.__advance()
-
-    def __handle_whitespace(self, current):
-        if current == '\n':
-            self.line += 1
-
-    def __string(self):
-        while self.__peek() != '"' and not self.__is_at_end():
-            if self.__peek() == '\n':
-                self.line += 1
-            self.__advance()
-
-        if self.__is_at_end():
-            error(self.line, "Unterminated string.")
-            return
-
-        self.__advance()
-        value = self.source[self.start + 1:self.current - 1]
-        self.__add_token(tt.STRING, value)
-
     def __number(self):
         while self.__peek().isdigit():
-            self.__advance()
+            self.current += 1
 
         if self.__peek() == '.' and self.__peek_next().isdigit():
-            self.__advance()
+            self.current += 1
 
             while self.__peek().isdigit():
-                self.__advance()
+                self.current += 1
 
-        self.__add_token(tt.NUMBER, float(
-            self.source[self.start:self.current]))
+        # Convert now so a malformed run fails at scan time, as it always has.
+        float(self.source[self.start:self.current])
+        return tt.NUMBER
 
     def __identifier(self):
         while self.__is_alpha_numeric(self.__peek()):
-            self.__advance()
+            self.current += 1
         text = self.source[self.start:self.current]
-        token_type = self.keywords.get(text, tt.IDENTIFIER)
-        self.__add_token(token_type)
+        return self.keywords.get(text, tt.IDENTIFIER)
 
     # Utility methods
     def __is_alpha(self, c):
@@ -149,6 +219,3 @@ class Scanner:
     def __is_alpha_numeric(self, c):
         return self.__is_alpha(c) or c.isdigit()
 
-    def __add_token(self, token_type, literal=None):
-        text = self.source[self.start:self.current]
-        self.tokens.append(Token(token_type, text, literal, self.line))
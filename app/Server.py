@@ -0,0 +1,106 @@
+import contextlib
+import errno
+import io
+import json
+import os
+import socket
+import socketserver
+import stat
+import sys
+import traceback
+
+
+class Server(socketserver.ForkingMixIn, socketserver.UnixStreamServer):
+    # Warm daemon behind the `serve` command. It listens on a Unix socket
+    # for command lines sent by app/client.py and runs each one with
+    # `program` (which reads sys.argv and exits the way main.py does) in a
+    # child forked from this already imported process. The fork gives every
+    # request fresh interpreter, resolver and error state, and the child's
+    # exit throws it away. The reply carries the script's stdout, stderr and
+    # exit code. Requests run as the server's user, so only that user may
+    # connect: the socket is created with mode 0600.
+
+    class Handler(socketserver.StreamRequestHandler):
+        def handle(self):
+            line = self.rfile.readline()
+            if not line:
+                # A connection closed without a request, such as another
+                # server checking whether this one is alive.
+                return
+            try:
+                request = json.loads(line)
+                argv = request["argv"]
+                cwd = request["cwd"]
+                if not (isinstance(argv, list) and isinstance(cwd, str)
+                        and all(isinstance(arg, str) for arg in argv)):
+                    raise ValueError("argv must be a list of strings and cwd a string")
+            except (ValueError, TypeError, KeyError) as e:
+                response = {"stdout": "", "stderr": f"Error: malformed request: {e}\n",
+                            "code": 1}
+            else:
+                response = self.server.run(argv, cwd)
+            self.wfile.write(json.dumps(response).encode() + b"\n")
+
+    def __init__(self, path, program):
+        # A socket left behind by a server that did not shut down cleanly
+        # would make bind() fail, but one that still answers belongs to a
+        # live server whose clients would lose it.
+        with contextlib.suppress(FileNotFoundError):
+            if stat.S_ISSOCK(os.stat(path).st_mode):
+                if Server.answers(path):
+                    raise OSError(errno.EADDRINUSE,
+                                  "a server is already listening on", path)
+                os.unlink(path)
+        directory = os.path.dirname(path)
+        if directory:
+            os.makedirs(directory, mode=0o700, exist_ok=True)
+        self.path = path
+        self.program = program
+        super().__init__(path, Server.Handler)
+
+    @staticmethod
+    def answers(path):
+        with socket.socket(socket.AF_UNIX, socket.SOCK_STREAM) as probe:
+            try:
+                probe.connect(path)
+            except ConnectionRefusedError:
+                return False
+        return True
+
+    def server_bind(self):
+        # Bind under a umask that leaves the socket private from the start
+        # rather than briefly open to the group.
+        umask = os.umask(0o177)
+        try:
+            super().server_bind()
+        finally:
+            os.umask(umask)
+        os.chmod(self.path, 0o600)
+
+    def run(self, argv, cwd):
+        stdout = io.StringIO()
+        stderr = io.StringIO()
+        sys.argv = [sys.argv[0], *argv]
+        code = 0
+        with contextlib.redirect_stdout(stdout), contextlib.redirect_stderr(stderr):
+            try:
+                os.chdir(cwd)
+                self.program()
+            except SystemExit as e:
+                code = e.code or 0
+            except BaseException:
+                # Anything else would kill the handler before it replies.
+                traceback.print_exc()
+                code = 70
+        return {"stdout": stdout.getvalue(), "stderr": stderr.getvalue(),
+                "code": code}
+
+    def serve(self):
+        try:
+            self.serve_forever()
+        except KeyboardInterrupt:
+            pass
+        finally:
+            self.server_close()
+            with contextlib.suppress(FileNotFoundError):
+                os.unlink(self.path)
@@ -0,0 +1,20 @@
+class Shape:
+    # A hidden class: the field names an instance has, in the order they
+    # were added, mapped to their index in the instance's value list.
+    # Instances of a class that gain the same fields in the same order
+    # share a Shape, found by following `transitions` from the class's
+    # empty root. Each class owns its tree, so property names seen in one
+    # run never reach another and the tree is freed with the class.
+    __slots__ = ("slots", "transitions")
+
+    def __init__(self, slots):
+        self.slots = slots
+        self.transitions = {}
+
+    def add(self, name):
+        shape = self.transitions.get(name)
+        if shape is None:
+            slots = dict(self.slots)
+            slots[name] = len(slots)
+            shape = self.transitions[name] = Shape(slots)
+        return shape
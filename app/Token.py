@@ -1,4 +1,5 @@
 class Token:
+    __slots__ = ("tokenType", "lexeme", "literal", "line")
 
     def __init__(self, tokenType, lexeme, literal, line):
         self.tokenType = tokenType
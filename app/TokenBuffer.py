@@ -0,0 +1,94 @@
+from array import array
+from app.TokensType import TokensType as tt
+from app.Token import Token
+
+
+TOKEN_TYPES = tuple(tt)
+TYPE_CODES = {token_type: code for code, token_type in enumerate(TOKEN_TYPES)}
+
+
+class TokenBuffer:
+    # Struct-of-arrays token storage: one array column per token field and
+    # offsets into the source instead of copied lexemes. Indexing returns a
+    # TokenView that slices its lexeme and literal out of the source lazily.
+
+    def __init__(self, source):
+        self.source = source
+        self.types = array("B")
+        self.starts = array("I")
+        self.ends = array("I")
+        self.lines = array("I")
+
+    def append(self, token_type, start, end, line):
+        self.types.append(TYPE_CODES[token_type])
+        self.starts.append(start)
+        self.ends.append(end)
+        self.lines.append(line)
+
+    def __len__(self):
+        return len(self.types)
+
+    def __getitem__(self, index):
+        if index < 0:
+            index += len(self.types)
+        if not 0 <= index < len(self.types):
+            raise IndexError("token index out of range")
+        return TokenView(self, index)
+
+    def __iter__(self):
+        for index in range(len(self.types)):
+            yield TokenView(self, index)
+
+    def type_at(self, index):
+        return TOKEN_TYPES[self.types[index]]
+
+    def lexeme_at(self, index):
+        return self.source[self.starts[index]:self.ends[index]]
+
+    def literal_at(self, index):
+        token_type = TOKEN_TYPES[self.types[index]]
+        if token_type == tt.NUMBER:
+            return float(self.lexeme_at(index))
+        if token_type == tt.STRING:
+            return self.source[self.starts[index] + 1:self.ends[index] - 1]
+        return None
+
+
+class TokenView:
+    # Read-only Token look-alike over one TokenBuffer row. The lexeme is
+    # materialised on first use and then kept, since the Resolver and
+    # Interpreter read `name.lexeme` over and over.
+    __slots__ = ("buffer", "index", "_lexeme")
+
+    def __init__(self, buffer, index):
+        self.buffer = buffer
+        self.index = index
+        self._lexeme = None
+
+    @property
+    def tokenType(self):
+        return TOKEN_TYPES[self.buffer.types[self.index]]
+
+    @property
+    def lexeme(self):
+        if self._lexeme is None:
+            self._lexeme = self.buffer.lexeme_at(self.index)
+        return self._lexeme
+
+    @property
+    def literal(self):
+        return self.buffer.literal_at(self.index)
+
+    @property
+    def line(self):
+        return self.buffer.lines[self.index]
+
+    def to_token(self):
+        return Token(self.tokenType, self.lexeme, self.literal, self.line)
+
+    # Pickle (for the program cache) as a standalone Token rather than
+    # dragging the whole buffer along.
+    def __reduce__(self):
+        return (Token, (self.tokenType, self.lexeme, self.literal, self.line))
+
+    __str__ = Token.__str__
@@ -0,0 +1,42 @@
+from collections import deque
+
+
+class TokenStream:
+    # Parser token source that pulls tokens from an iterator on demand.
+    # The Parser only ever looks at `previous()` and `peek()`, so just a
+    # small window around its position is kept alive instead of every token.
+
+    def __init__(self, tokens, lookbehind=1):
+        self.iterator = iter(tokens)
+        self.lookbehind = lookbehind
+        self.window = deque()
+        self.offset = 0
+
+    def __getitem__(self, index):
+        window = self.window
+        while index >= self.offset + len(window):
+            token = next(self.iterator, None)
+            if token is None:
+                # Past EOF: keep answering with the last token, like the
+                # Parser's own is_at_end() guard expects.
+                return window[-1]
+            window.append(token)
+
+        while index - self.offset > self.lookbehind:
+            window.popleft()
+            self.offset += 1
+
+        if index < self.offset:
+            raise IndexError(
+                f"token {index} already released from the stream")
+        return window[index - self.offset]
+
+    def __iter__(self):
+        yield from self.window
+        yield from self.iterator
+
+    def drain(self):
+        # Scan whatever the parser did not consume so that lexical errors
+        # later in the source are still reported.
+        for _ in self.iterator:
+            pass
@@ -0,0 +1,579 @@
+from app.OpCode import OpCode
+from app.RuntimeError import RuntimeError
+from app.error import runtime_error
+from app.Token import Token
+from app.Callable import Callable
+from app.Class import Class
+from app.Instance import Instance
+from app.Interpreter import Interpreter
+from app.Memo import Memo
+from app.MemoizedFunction import MemoizedFunction
+from app.Rope import Rope
+from app.Output import Output
+from app.Compiler import Compiler
+
+# Plain ints for the dispatch loop; comparing against IntEnum members is
+# measurably slower.
+CONSTANT = int(OpCode.CONSTANT)
+NIL = int(OpCode.NIL)
+TRUE = int(OpCode.TRUE)
+FALSE = int(OpCode.FALSE)
+POP = int(OpCode.POP)
+GET_LOCAL = int(OpCode.GET_LOCAL)
+SET_LOCAL = int(OpCode.SET_LOCAL)
+GET_GLOBAL = int(OpCode.GET_GLOBAL)
+DEFINE_GLOBAL = int(OpCode.DEFINE_GLOBAL)
+SET_GLOBAL = int(OpCode.SET_GLOBAL)
+GET_UPVALUE = int(OpCode.GET_UPVALUE)
+SET_UPVALUE = int(OpCode.SET_UPVALUE)
+GET_PROPERTY = int(OpCode.GET_PROPERTY)
+SET_PROPERTY = int(OpCode.SET_PROPERTY)
+ASSERT_INSTANCE = int(OpCode.ASSERT_INSTANCE)
+GET_SUPER = int(OpCode.GET_SUPER)
+EQUAL = int(OpCode.EQUAL)
+NOT_EQUAL = int(OpCode.NOT_EQUAL)
+GREATER = int(OpCode.GREATER)
+GREATER_EQUAL = int(OpCode.GREATER_EQUAL)
+LESS = int(OpCode.LESS)
+LESS_EQUAL = int(OpCode.LESS_EQUAL)
+ADD = int(OpCode.ADD)
+SUBTRACT = int(OpCode.SUBTRACT)
+MULTIPLY = int(OpCode.MULTIPLY)
+DIVIDE = int(OpCode.DIVIDE)
+NOT = int(OpCode.NOT)
+NEGATE = int(OpCode.NEGATE)
+PRINT = int(OpCode.PRINT)
+JUMP = int(OpCode.JUMP)
+JUMP_IF_FALSE = int(OpCode.JUMP_IF_FALSE)
+CALL = int(OpCode.CALL)
+CLOSURE = int(OpCode.CLOSURE)
+CLOSE_UPVALUE = int(OpCode.CLOSE_UPVALUE)
+RETURN = int(OpCode.RETURN)
+CLASS = int(OpCode.CLASS)
+TAIL_CALL = int(OpCode.TAIL_CALL)
+POP_JUMP_IF_FALSE = int(OpCode.POP_JUMP_IF_FALSE)
+GET_METHOD = int(OpCode.GET_METHOD)
+INVOKE = int(OpCode.INVOKE)
+
+
+class VM:
+    # Calls nested deeper than this report "Stack overflow." instead of
+    # growing without bound.
+    MAX_DEPTH = Interpreter.MAX_DEPTH
+    MAX_DEPTH_LIMIT = Interpreter.MAX_DEPTH_LIMIT
+
+    class Closure(Callable):
+        __slots__ = ("proto", "upvalues")
+
+        def __init__(self, proto, upvalues):
+            self.proto = proto
+            self.upvalues = upvalues
+
+        def arity(self):
+            return self.proto.arity
+
+        def call(self, interpreter, arguments):
+            return interpreter.call_function(self, arguments)
+
+        def bind(self, instance):
+            return VM.BoundMethod(instance, self)
+
+        def __str__(self):
+            return str(self.proto)
+
+    class BoundMethod(Callable):
+        __slots__ = ("receiver", "method")
+
+        def __init__(self, receiver, method):
+            self.receiver = receiver
+            self.method = method
+
+        def arity(self):
+            return self.method.proto.arity
+
+        def call(self, interpreter, arguments):
+            return interpreter.call_function(self, arguments)
+
+        def __str__(self):
+            return str(self.method)
+
+    class Upvalue:
+        # Points at a stack slot while the variable is live (`index`), and
+        # holds the value itself once the slot is popped (`index` is -1).
+        __slots__ = ("index", "value")
+
+        def __init__(self, index):
+            self.index = index
+            self.value = None
+
+    class CallFrame:
+        __slots__ = ("closure", "ip", "base", "constructing")
+
+        def __init__(self, closure, base, constructing):
+            self.closure = closure
+            self.ip = 0
+            self.base = base
+            # Set when the frame runs `init` for a constructor call, which
+            # always produces the new instance.
+            self.constructing = constructing
+
+    # Shared with the tree-walker so values print and compare identically.
+    stringify = Interpreter.stringify
+    isEqual = Interpreter.isEqual
+    # Memoized calls run a nested dispatch loop, so they need Python stack.
+    python_stack = Interpreter.python_stack
+    PYTHON_FRAMES_PER_CALL = 10
+
+    def __init__(self, max_depth=MAX_DEPTH, memo_size=None,
+                 output_size=Output.SIZE):
+        if max_depth > self.MAX_DEPTH_LIMIT:
+            raise ValueError(
+                f"max_depth must be at most {self.MAX_DEPTH_LIMIT}, got {max_depth}")
+        self.max_depth = max_depth
+        self.memo_size = memo_size
+        self.memos = {}
+        self.globals = {"clock": Interpreter.ClockCallable()}
+        self.stack = []
+        self.frames = []
+        self.open_upvalues = {}
+        self.output = Output(output_size)
+
+    def interpret(self, statements, command):
+        try:
+            if (command == "run"):
+                proto = Compiler().compile(statements)
+            elif (command == "evaluate"):
+                proto = Compiler().compile_expression(statements)
+            else:
+                return
+            with self.python_stack():
+                self.call_function(self.Closure(proto, []), [])
+        except RuntimeError as e:
+            self.output.flush()
+            runtime_error(e)
+            self.stack.clear()
+            self.frames.clear()
+            self.open_upvalues.clear()
+        finally:
+            self.output.flush()
+
+    def call_function(self, callee, arguments):
+        floor = len(self.frames)
+        self.stack.append(callee)
+        self.stack.extend(arguments)
+        self.call_value(callee, len(arguments))
+        return self.run(floor)
+
+    def error(self, message):
+        frame = self.frames[-1]
+        line = frame.closure.proto.chunk.lines[frame.ip - 1]
+        return RuntimeError(Token(None, "", None, line), message)
+
+    def push_frame(self, closure, argc, constructing=False):
+        # The script's own frame is not a call.
+        if len(self.frames) > self.max_depth:
+            raise self.error("Stack overflow.")
+        self.frames.append(self.CallFrame(
+            closure, len(self.stack) - argc - 1, constructing))
+
+    def call_value(self, callee, argc):
+        # The callee sits below its arguments; whatever is called leaves its
+        # result in the callee's place (natives and classes without `init`
+        # right away, Lox functions when their frame returns).
+        stack = self.stack
+        if isinstance(callee, self.Closure):
+            if argc != callee.proto.arity:
+                raise self.error(
+                    f"Expected {callee.proto.arity} arguments but got {argc}.")
+            self.push_frame(callee, argc)
+        elif isinstance(callee, self.BoundMethod):
+            if argc != callee.method.proto.arity:
+                raise self.error(
+                    f"Expected {callee.method.proto.arity} arguments but got {argc}.")
+            stack[-argc - 1] = callee.receiver
+            self.push_frame(callee.method, argc)
+        elif isinstance(callee, Class):
+            if argc != callee.init_arity:
+                raise self.error(
+                    f"Expected {callee.init_arity} arguments but got {argc}.")
+            stack[-argc - 1] = Instance(callee)
+            if callee.initializer is not None:
+                self.push_frame(callee.initializer, argc, True)
+        elif isinstance(callee, Callable):
+            if argc != callee.arity():
+                raise self.error(
+                    f"Expected {callee.arity()} arguments but got {argc}.")
+            arguments = stack[len(stack) - argc:]
+            del stack[len(stack) - argc - 1:]
+            stack.append(callee.call(self, arguments))
+        else:
+            raise self.error("Can only call functions and classes.")
+
+    def memoize(self, proto, closure):
+        memo = self.memos.get(proto)
+        if memo is None:
+            memo = self.memos[proto] = Memo(proto.name, self.memo_size)
+        return MemoizedFunction(closure, memo)
+
+    def capture_upvalue(self, index):
+        upvalue = self.open_upvalues.get(index)
+        if upvalue is None:
+            upvalue = self.open_upvalues[index] = self.Upvalue(index)
+        return upvalue
+
+    def close_upvalues(self, last):
+        stack = self.stack
+        for index in [index for index in self.open_upvalues if index >= last]:
+            upvalue = self.open_upvalues.pop(index)
+            upvalue.value = stack[index]
+            upvalue.index = -1
+
+    def run(self, floor):
+        # Runs until the frame count drops back to `floor`, then returns the
+        # value the last frame returned. Each opcode is one branch of an
+        # if/elif chain, so the opcodes that run most come first.
+        stack = self.stack
+        frames = self.frames
+        push = stack.append
+        pop = stack.pop
+        globals = self.globals
+        stringify = self.stringify
+        output = self.output
+        isEqual = self.isEqual
+        Closure = self.Closure
+        BoundMethod = self.BoundMethod
+
+        frame = frames[-1]
+        closure = frame.closure
+        code = closure.proto.chunk.code
+        constants = closure.proto.chunk.constants
+        upvalues = closure.upvalues
+        base = frame.base
+        ip = frame.ip
+
+        while True:
+            instruction = code[ip]
+            ip += 1
+
+            if instruction == GET_LOCAL:
+                push(stack[base + code[ip]])
+                ip += 1
+            elif instruction == CONSTANT:
+                push(constants[code[ip]])
+                ip += 1
+            elif instruction == GET_GLOBAL:
+                try:
+                    push(globals[constants[code[ip]]])
+                except KeyError:
+                    frame.ip = ip
+                    raise self.error(
+                        f"Undefined variable '{constants[code[ip]]}'.")
+                ip += 1
+            elif instruction == POP_JUMP_IF_FALSE:
+                value = pop()
+                if value is None or value is False:
+                    ip = code[ip]
+                else:
+                    ip += 1
+            elif instruction == ADD:
+                right = pop()
+                left = stack[-1]
+                if isinstance(left, float) and isinstance(right, float):
+                    stack[-1] = left + right
+                elif isinstance(left, Rope.STRINGS) and \
+                        isinstance(right, Rope.STRINGS):
+                    stack[-1] = Rope.concat(left, right)
+                else:
+                    frame.ip = ip
+                    raise self.error(
+                        "Operands must be two numbers or two strings.")
+            elif instruction == POP:
+                pop()
+            elif instruction == SET_LOCAL:
+                stack[base + code[ip]] = stack[-1]
+                ip += 1
+            elif instruction == JUMP:
+                ip = code[ip]
+            elif instruction == LESS:
+                right = pop()
+                left = stack[-1]
+                if not (isinstance(left, float) and isinstance(right, float)):
+                    frame.ip = ip
+                    raise self.error("Operands must be numbers")
+                stack[-1] = left < right
+            elif instruction == SET_GLOBAL:
+                name = constants[code[ip]]
+                if name not in globals:
+                    frame.ip = ip + 1
+                    raise self.error(f"Undefined variable '{name}'.")
+                globals[name] = stack[-1]
+                ip += 1
+            elif instruction == GET_PROPERTY or instruction == GET_METHOD:
+                # Looks the property up the way Instance.get does, but runs
+                # a getter in a new frame instead of binding it. GET_METHOD
+                # leaves two values for INVOKE: a plain method and its
+                # receiver, or None and the property's value.
+                obj = stack[-1]
+                token = constants[code[ip]]
+                ip += 1
+                if not isinstance(obj, Instance):
+                    frame.ip = ip
+                    raise self.error("Only instances have properties.")
+                index = obj.shape.slots.get(token.lexeme)
+                if index is not None:
+                    value = obj.values[index]
+                else:
+                    method = obj.klass.method_table.get(token.lexeme)
+                    if method is None:
+                        raise obj.undefined_property(token)
+                    if method.__class__ is Closure:
+                        if method.proto.kind == "getter":
+                            if instruction == GET_METHOD:
+                                stack[-1] = None
+                                push(obj)
+                            frame.ip = ip
+                            self.push_frame(method, 0)
+                            frame = frames[-1]
+                            closure = frame.closure
+                            code = closure.proto.chunk.code
+                            constants = closure.proto.chunk.constants
+                            upvalues = closure.upvalues
+                            base = frame.base
+                            ip = frame.ip
+                            continue
+                        if instruction == GET_METHOD:
+                            stack[-1] = method
+                            push(obj)
+                            continue
+                    value = method.bind(obj)
+                if instruction == GET_METHOD:
+                    stack[-1] = None
+                    push(value)
+                else:
+                    stack[-1] = value
+            elif instruction == INVOKE:
+                argc = code[ip]
+                frame.ip = ip + 1
+                method = stack[-argc - 2]
+                del stack[-argc - 2]
+                if method is None:
+                    self.call_value(stack[-argc - 1], argc)
+                else:
+                    # The receiver already sits in the method's slot 0.
+                    if argc != method.proto.arity:
+                        raise self.error(
+                            f"Expected {method.proto.arity} arguments but got {argc}.")
+                    self.push_frame(method, argc)
+                frame = frames[-1]
+                closure = frame.closure
+                code = closure.proto.chunk.code
+                constants = closure.proto.chunk.constants
+                upvalues = closure.upvalues
+                base = frame.base
+                ip = frame.ip
+            elif instruction == RETURN:
+                result = pop()
+                if frame.constructing:
+                    result = stack[base]
+                if self.open_upvalues:
+                    self.close_upvalues(base)
+                frames.pop()
+                del stack[base:]
+                if len(frames) == floor:
+                    return result
+                push(result)
+                frame = frames[-1]
+                closure = frame.closure
+                code = closure.proto.chunk.code
+                constants = closure.proto.chunk.constants
+                upvalues = closure.upvalues
+                base = frame.base
+                ip = frame.ip
+            elif instruction == CALL:
+                argc = code[ip]
+                frame.ip = ip + 1
+                self.call_value(stack[-argc - 1], argc)
+                frame = frames[-1]
+                closure = frame.closure
+                code = closure.proto.chunk.code
+                constants = closure.proto.chunk.constants
+                upvalues = closure.upvalues
+                base = frame.base
+                ip = frame.ip
+            elif instruction == SUBTRACT:
+                right = pop()
+                left = stack[-1]
+                if not (isinstance(left, float) and isinstance(right, float)):
+                    frame.ip = ip
+                    raise self.error("Operands must be numbers")
+                stack[-1] = left - right
+            elif instruction == SET_PROPERTY:
+                value = pop()
+                obj = stack[-1]
+                if not isinstance(obj, Instance):
+                    frame.ip = ip + 1
+                    raise self.error("Only instances have fields.")
+                obj.set(constants[code[ip]], value)
+                stack[-1] = value
+                ip += 1
+            elif instruction == GET_UPVALUE:
+                upvalue = upvalues[code[ip]]
+                push(upvalue.value if upvalue.index < 0 else stack[upvalue.index])
+                ip += 1
+            elif instruction == SET_UPVALUE:
+                upvalue = upvalues[code[ip]]
+                if upvalue.index < 0:
+                    upvalue.value = stack[-1]
+                else:
+                    stack[upvalue.index] = stack[-1]
+                ip += 1
+            elif instruction == EQUAL:
+                right = pop()
+                stack[-1] = isEqual(stack[-1], right)
+            elif instruction == GREATER:
+                right = pop()
+                left = stack[-1]
+                if not (isinstance(left, float) and isinstance(right, float)):
+                    frame.ip = ip
+                    raise self.error("Operands must be numbers")
+                stack[-1] = left > right
+            elif instruction == MULTIPLY:
+                right = pop()
+                left = stack[-1]
+                if not (isinstance(left, float) and isinstance(right, float)):
+                    frame.ip = ip
+                    raise self.error("Operands must be numbers")
+                stack[-1] = left * right
+            elif instruction == DIVIDE:
+                right = pop()
+                left = stack[-1]
+                if not (isinstance(left, float) and isinstance(right, float)):
+                    frame.ip = ip
+                    raise self.error("Operands must be numbers")
+                stack[-1] = left / right
+            elif instruction == LESS_EQUAL:
+                right = pop()
+                left = stack[-1]
+                if not (isinstance(left, float) and isinstance(right, float)):
+                    frame.ip = ip
+                    raise self.error("Operands must be numbers")
+                stack[-1] = left <= right
+            elif instruction == GREATER_EQUAL:
+                right = pop()
+                left = stack[-1]
+                if not (isinstance(left, float) and isinstance(right, float)):
+                    frame.ip = ip
+                    raise self.error("Operands must be numbers")
+                stack[-1] = left >= right
+            elif instruction == NOT:
+                value = stack[-1]
+                stack[-1] = value is None or value is False
+            elif instruction == JUMP_IF_FALSE:
+                value = stack[-1]
+                if value is None or value is False:
+                    ip = code[ip]
+                else:
+                    ip += 1
+            elif instruction == TAIL_CALL:
+                argc = code[ip]
+                frame.ip = ip + 1
+                callee = stack[-argc - 1]
+                if isinstance(callee, MemoizedFunction):
+                    callee = callee.function
+                if isinstance(callee, BoundMethod):
+                    stack[-argc - 1] = callee.receiver
+                    callee = callee.method
+                if isinstance(callee, Closure):
+                    # Replace the current frame: close what it captured, slide
+                    # the callee and its arguments down to its base and start
+                    # the new function there.
+                    if argc != callee.proto.arity:
+                        raise self.error(
+                            f"Expected {callee.proto.arity} arguments but got {argc}.")
+                    if self.open_upvalues:
+                        self.close_upvalues(base)
+                    stack[base:] = stack[len(stack) - argc - 1:]
+                    frame.closure = closure = callee
+                    frame.ip = 0
+                else:
+                    self.call_value(callee, argc)
+                    frame = frames[-1]
+                    closure = frame.closure
+                    base = frame.base
+                code = closure.proto.chunk.code
+                constants = closure.proto.chunk.constants
+                upvalues = closure.upvalues
+                ip = frame.ip
+            elif instruction == NOT_EQUAL:
+                right = pop()
+                stack[-1] = not isEqual(stack[-1], right)
+            elif instruction == NEGATE:
+                value = stack[-1]
+                if not isinstance(value, float):
+                    frame.ip = ip
+                    raise self.error("Operand must be a number.")
+                stack[-1] = -value
+            elif instruction == NIL:
+                push(None)
+            elif instruction == TRUE:
+                push(True)
+            elif instruction == FALSE:
+                push(False)
+            elif instruction == PRINT:
+                output.print(stringify(pop()))
+            elif instruction == ASSERT_INSTANCE:
+                if not isinstance(stack[-1], Instance):
+                    frame.ip = ip + 1
+                    raise self.error("Only instances have fields.")
+                ip += 1
+            elif instruction == DEFINE_GLOBAL:
+                globals[constants[code[ip]]] = pop()
+                ip += 1
+            elif instruction == CLOSURE:
+                proto = constants[code[ip]]
+                ip += 1
+                captured = []
+                for _ in range(proto.upvalue_count):
+                    if code[ip]:
+                        captured.append(self.capture_upvalue(base + code[ip + 1]))
+                    else:
+                        captured.append(upvalues[code[ip + 1]])
+                    ip += 2
+                if proto.pure and self.memo_size is not None:
+                    push(self.memoize(proto, Closure(proto, captured)))
+                else:
+                    push(Closure(proto, captured))
+            elif instruction == CLOSE_UPVALUE:
+                self.close_upvalues(len(stack) - 1)
+                pop()
+            elif instruction == GET_SUPER:
+                superclass = pop()
+                name = constants[code[ip]]
+                ip += 1
+                method = superclass.find_method(name.lexeme)
+                if method is None:
+                    frame.ip = ip
+                    raise self.error(f"Undefined property '{name.lexeme}'.")
+                stack[-1] = method.bind(stack[-1])
+            elif instruction == CLASS:
+                name = constants[code[ip]]
+                has_superclass = code[ip + 1]
+                count = code[ip + 2]
+                ip += 3
+                methods = {}
+                static_methods = {}
+                for index, method in enumerate(stack[len(stack) - count:]):
+                    table = static_methods if method.proto.kind == "static" else methods
+                    table[constants[code[ip + index]]] = method
+                del stack[len(stack) - count:]
+                ip += count
+                superclass = None
+                if has_superclass:
+                    superclass = stack[-1]
+                    if not isinstance(superclass, Class):
+                        frame.ip = ip
+                        raise self.error("Superclass must be a class.")
+                push(Class(name, superclass, methods, static_methods))
+            else:
+                frame.ip = ip
+                raise self.error(f"Unknown opcode {instruction}.")
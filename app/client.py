@@ -0,0 +1,57 @@
+import json
+import os
+import socket
+import sys
+import tempfile
+
+# Thin client for `app.main serve`: sends its command line to the running
+# server and replays the script's stdout, stderr and exit code, so
+# `python3 -m app.client run script.lox` behaves like `python3 -m app.main
+# run script.lox` without the interpreter's start-up. It imports nothing
+# from the interpreter itself.
+
+# The default socket lives in a directory private to the current user:
+# $XDG_RUNTIME_DIR, or else a lox-<uid> directory in the temp directory,
+# which the server creates with mode 0700.
+SOCKET = os.path.join(
+    os.environ.get("XDG_RUNTIME_DIR")
+    or os.path.join(tempfile.gettempdir(), f"lox-{os.getuid()}"), "lox.sock")
+
+
+def request(argv, path=None):
+    path = path or os.environ.get("LOX_SOCKET") or SOCKET
+    # A socket another user bound could read the command line and forge
+    # the reply.
+    if os.stat(path).st_uid != os.getuid():
+        raise PermissionError(f"{path} belongs to another user")
+    with socket.socket(socket.AF_UNIX, socket.SOCK_STREAM) as connection:
+        connection.connect(path)
+        message = {"argv": argv, "cwd": os.getcwd()}
+        connection.sendall(json.dumps(message).encode() + b"\n")
+        with connection.makefile("rb") as reply:
+            line = reply.readline()
+    if not line:
+        raise ValueError("the server closed the connection without replying")
+    response = json.loads(line)
+    if not isinstance(response, dict) or \
+            not {"stdout", "stderr", "code"} <= response.keys():
+        raise ValueError(f"unexpected reply {line!r}")
+    return response
+
+
+def main():
+    try:
+        response = request(sys.argv[1:])
+    except OSError as e:
+        print(f"Error: cannot reach the server: {e}", file=sys.stderr)
+        sys.exit(1)
+    except ValueError as e:
+        print(f"Error: bad reply from the server: {e}", file=sys.stderr)
+        sys.exit(70)
+    sys.stdout.write(response["stdout"])
+    sys.stderr.write(response["stderr"])
+    sys.exit(response["code"])
+
+
+if __name__ == "__main__":
+    main()
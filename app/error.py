@@ -1,9 +1,9 @@
-import sys
 from app.TokensType import TokensType as tt
 from app.Token import Token
+from app.ExecutionContext import ExecutionContext
 
-hadError = False
-hadRuntimeError = False
+# Error flags and diagnostics belong to the ExecutionContext of the program
+# being run on this thread.
 
 
 def error(line: int, message):
@@ -11,25 +11,24 @@ def error(line: int, message):
 
 
 def getHadError():
-    return hadError
+    return ExecutionContext.current().had_error
 
 
 def getHadRuntimeError():
-    return hadRuntimeError
+    return ExecutionContext.current().had_runtime_error
 
 
 def setHadError():
-    global hadError
-    hadError = True
+    ExecutionContext.current().had_error = True
 
 
 def setRuntimeError():
-    global hadRuntimeError
-    hadRuntimeError = True
+    ExecutionContext.current().had_runtime_error = True
 
 
 def report(line, where, message):
-    print(f"[line {line}] Error{where}: {message}", file=sys.stderr)
+    print(f"[line {line}] Error{where}: {message}",
+          file=ExecutionContext.current().error_stream())
     setHadError()
 
 
@@ -41,5 +40,6 @@ def token_error(token: Token, message):
 
 
 def runtime_error(error):
-    print(f"{error}\n[line {error.token.line}]", file=sys.stderr)
+    print(f"{error}\n[line {error.token.line}]",
+          file=ExecutionContext.current().error_stream())
     setRuntimeError()
@@ -1,79 +1,250 @@
 import sys
 from app.Scanner import Scanner
+from app.TokenStream import TokenStream
 from app.error import getHadError, getHadRuntimeError
 from app.Parser import Parser
+from app.PrattParser import PrattParser
 from app.AstPrinter import AstPrinter
 from app.Interpreter import Interpreter
+from app.ClosureInterpreter import ClosureInterpreter
+from app.VM import VM
+from app.Compiler import Compiler
+from app.Disassembler import Disassembler
 from app.Resolver import Resolver
+from app.ProgramCache import ProgramCache
+from app.Optimizer import Optimizer
+from app.Output import Output
+from app.Server import Server
+from app.ExecutionContext import ExecutionContext
+
+
+COMMANDS = ["tokenize", "parse", "evaluate", "run", "disassemble", "serve"]
+
+# Option name -> accepted values (the first one is the default); None marks
+# a bare flag and an int a positive number with that default.
+OPTIONS = {
+    "parser": ["pratt", "descent"],
+    "no-cache": None,
+    "engine": ["tree", "closure", "vm"],
+    "max-depth": Interpreter.MAX_DEPTH,
+    "memoize": None,
+    "memo-size": 1024,
+    "no-opt": None,
+    "dump-ast": None,
+    "output-buffer": Output.SIZE,
+    "unbuffered": None,
+}
+
+# Largest value an int option accepts, for those that have one.
+LIMITS = {
+    "max-depth": Interpreter.MAX_DEPTH_LIMIT,
+}
+
+PARSERS = {
+    "pratt": PrattParser,
+    "descent": Parser,
+}
+
+ENGINES = {
+    "tree": Interpreter,
+    "closure": ClosureInterpreter,
+    "vm": VM,
+}
 
 
 class CommandExecutor:
-    def __init__(self, command, file_contents):
+    def __init__(self, command, file_contents, options=None, single_shot=False):
         self.command = command
         self.file_contents = file_contents
+        self.options = options or {}
+        # Set when the process exits after this command, as the CLI does.
+        self.single_shot = single_shot
         self.scanner = Scanner(file_contents)
         self.tokens = None
         self.parser = None
         self.interpreter = None
+        self.cache = None
+        # Output and diagnostics go to the streams of the context this
+        # command runs in.
+        self.context = ExecutionContext.current()
+
+    def option(self, name):
+        if name in self.options:
+            return self.options[name]
+        accepted = OPTIONS[name]
+        if accepted is None:
+            return False
+        if isinstance(accepted, int):
+            return accepted
+        return accepted[0]
 
     def execute(self):
         if not self.file_contents:
-            print("EOF  null")
+            print("EOF  null", file=self.context.output_stream())
             return 0
 
-        self.tokens = self.scanner.scan_tokens()
         if self.command == "tokenize":
             return self.handle_tokenize()
 
+        self.tokens = TokenStream(self.scanner.stream_tokens())
         return self.handle_parse_and_interpret()
 
     def handle_tokenize(self):
-        for token in self.tokens:
-            print(token)
+        stdout = self.context.output_stream()
+        for token in self.scanner.stream_tokens():
+            print(token, file=stdout)
         return 65 if getHadError() else 0
 
     def handle_parse_and_interpret(self):
         try:
-            self.parser = Parser(self.tokens)
-            statements = self.parser.parse(self.command)
+            cache_key = None
+            if self.command in ["evaluate", "run"] and not self.option("no-cache"):
+                self.cache = ProgramCache(pause_gc=self.single_shot)
+                cache_key = self.cache.key(
+                    self.file_contents, self.command,
+                    *(["no-opt"] if self.option("no-opt") else []))
+                cached = self.cache.load(cache_key)
+                if cached is not None:
+                    if self.option("dump-ast"):
+                        return self.dump(cached)
+                    self.interpreter = self.engine()
+                    return self.interpret(cached)
+
+            parser_class = PARSERS[self.option("parser")]
+            self.parser = parser_class(self.tokens)
+            # `disassemble` compiles a whole program, just like `run`.
+            statements = self.parser.parse(
+                "run" if self.command == "disassemble" else self.command)
+            self.tokens.drain()
 
             if getHadError():
                 return 65
 
             if self.command == "parse":
-                print(AstPrinter().print(statements))
+                print(AstPrinter().print(statements),
+                      file=self.context.output_stream())
             elif self.command in ["evaluate", "run"]:
-                self.interpreter = Interpreter()
+                self.interpreter = self.engine()
                 self.resolver = Resolver(self.interpreter)
                 self.resolver.resolve(statements)
 
                 if getHadError():
                     return 65
 
-                self.interpreter.interpret(statements, self.command)
-                if getHadRuntimeError():
-                    return 70
+                statements = self.optimize(statements)
+                if cache_key is not None:
+                    self.cache.store(cache_key, statements)
+                if self.option("dump-ast"):
+                    return self.dump(statements)
+                return self.interpret(statements)
+            elif self.command == "disassemble":
+                Resolver(Interpreter()).resolve(statements)
+                if getHadError():
+                    return 65
+                proto = Compiler().compile(self.optimize(statements))
+                print("\n".join(Disassembler().disassemble(proto)),
+                      file=self.context.output_stream())
             return 0
         except Exception as e:
-            print(f"Error: {str(e)}", file=sys.stderr)
+            print(f"Error: {str(e)}", file=self.context.error_stream())
             return 65
 
+    def engine(self):
+        memo_size = self.option("memo-size") if self.option("memoize") else None
+        output_size = None if self.option("unbuffered") else self.option("output-buffer")
+        return ENGINES[self.option("engine")](
+            self.option("max-depth"), memo_size, output_size)
+
+    def optimize(self, statements):
+        if self.option("no-opt"):
+            return statements
+        if self.command == "evaluate":
+            return Optimizer().optimize_expr(statements)
+        return Optimizer().optimize(statements)
+
+    def dump(self, statements):
+        stdout = self.context.output_stream()
+        if self.command == "evaluate":
+            print(AstPrinter().print(statements), file=stdout)
+        else:
+            print(AstPrinter().print_program(statements), file=stdout)
+        return 0
+
+    def interpret(self, statements):
+        self.interpreter.interpret(statements, self.command)
+        if self.option("memoize"):
+            for memo in self.interpreter.memos.values():
+                print(memo, file=self.context.error_stream())
+        if getHadRuntimeError():
+            return 70
+        return 0
+
 
 def validate_arguments():
-    if len(sys.argv) < 3:
-        print("Usage: ./your_program.sh <command> <filename>", file=sys.stderr)
-        print("Commands: tokenize, parse, evaluate, run", file=sys.stderr)
+    arguments = [arg for arg in sys.argv[1:] if not arg.startswith("--")]
+    if len(arguments) < 2:
+        print("Usage: ./your_program.sh <command> <filename> [--option[=value] ...]",
+              file=sys.stderr)
+        print("Commands: " + ", ".join(COMMANDS), file=sys.stderr)
+        print("Options: " + ", ".join(describe_option(name)
+              for name in OPTIONS), file=sys.stderr)
         exit(1)
 
-    command = sys.argv[1]
-    if command not in ["tokenize", "parse", "evaluate", "run"]:
+    command = arguments[0]
+    if command not in COMMANDS:
         print(f"Unknown command: {command}", file=sys.stderr)
         exit(1)
 
-    return command, sys.argv[2]
+    options = parse_options(
+        [arg for arg in sys.argv[1:] if arg.startswith("--")])
+    return command, arguments[1], options
+
+
+def parse_options(arguments):
+    options = {}
+    for argument in arguments:
+        name, has_value, value = argument[2:].partition("=")
+        if name not in OPTIONS:
+            print(f"Unknown option: --{name}", file=sys.stderr)
+            exit(1)
+
+        accepted = OPTIONS[name]
+        if accepted is None:
+            if has_value:
+                print(f"Option --{name} does not take a value", file=sys.stderr)
+                exit(1)
+            options[name] = True
+        elif isinstance(accepted, int):
+            if not value.isdigit() or int(value) == 0:
+                print(f"Invalid value for --{name}: {value!r} (expected a positive number)",
+                      file=sys.stderr)
+                exit(1)
+            if name in LIMITS and int(value) > LIMITS[name]:
+                print(f"Invalid value for --{name}: {value!r} (expected at most {LIMITS[name]})",
+                      file=sys.stderr)
+                exit(1)
+            options[name] = int(value)
+        elif value in accepted:
+            options[name] = value
+        else:
+            print(f"Invalid value for --{name}: {value!r} (expected {describe_option(name)})",
+                  file=sys.stderr)
+            exit(1)
+    return options
+
+
+def describe_option(name):
+    accepted = OPTIONS[name]
+    if accepted is None:
+        return f"--{name}"
+    if isinstance(accepted, int):
+        return f"--{name}=N"
+    return f"--{name}={'|'.join(accepted)}"
 
 
 def process_file(filename):
+    # The scanner works on the whole source as one string; only the tokens
+    # are streamed, so the source is simply read in one go.
     try:
         with open(filename) as file:
             return file.read()
@@ -87,10 +258,33 @@ def process_file(filename):
 
 def main():
     print("Logs from your program will appear here!", file=sys.stderr)
-    command, filename = validate_arguments()
+    command, filename, options = validate_arguments()
+    if command == "serve":
+        # The file argument names the socket to listen on.
+        try:
+            server = Server(filename, serve_request)
+        except OSError as e:
+            print(f"Error: cannot serve: {e}", file=sys.stderr)
+            exit(1)
+        server.serve()
+        return
+    run(command, filename, options)
+
+
+def serve_request():
+    # A client's command line, run in a child of the `serve` process.
+    print("Logs from your program will appear here!", file=sys.stderr)
+    command, filename, options = validate_arguments()
+    if command == "serve":
+        print("Cannot serve from a client request", file=sys.stderr)
+        exit(1)
+    run(command, filename, options)
+
+
+def run(command, filename, options):
     file_contents = process_file(filename)
 
-    executor = CommandExecutor(command, file_contents)
+    executor = CommandExecutor(command, file_contents, options, single_shot=True)
     exit_code = executor.execute()
     sys.exit(exit_code)
 
@@ -0,0 +1,111 @@
+import operator
+from app.TokensType import TokensType as tt
+from app.Rope import Rope
+
+# Type-feedback quickening for Binary, Unary and Logical nodes. The generic
+# visitor path records the operand types each node sees; once a node has
+# seen the same types THRESHOLD times in a row it stores a specialized
+# evaluator in `expr.quick`. That evaluator checks its type guard and, when
+# it fails, hands the already evaluated operands back to the generic path
+# (which raises the usual runtime error) and drops the specialization.
+
+THRESHOLD = 4
+
+NUMBER_OPERATORS = {
+    tt.PLUS: operator.add,
+    tt.MINUS: operator.sub,
+    tt.STAR: operator.mul,
+    tt.SLASH: operator.truediv,
+    tt.GREATER: operator.gt,
+    tt.GREATER_EQUAL: operator.ge,
+    tt.LESS: operator.lt,
+    tt.LESS_EQUAL: operator.le,
+    tt.EQUAL_EQUAL: operator.eq,
+    tt.BANG_EQUAL: operator.ne,
+}
+
+# Strings may be Ropes, so `+` goes through Rope.concat for both kinds.
+STRING_OPERATORS = {
+    tt.PLUS: Rope.concat,
+    tt.EQUAL_EQUAL: operator.eq,
+    tt.BANG_EQUAL: operator.ne,
+}
+
+
+def specialize_binary(function, kind):
+    def evaluate(interpreter, expr):
+        left = expr.left.accept(interpreter)
+        right = expr.right.accept(interpreter)
+        if left.__class__ is kind and right.__class__ is kind:
+            return function(left, right)
+        expr.quick = None
+        return interpreter.binary(expr, left, right)
+    return evaluate
+
+
+def specialize_negate():
+    def evaluate(interpreter, expr):
+        right = expr.right.accept(interpreter)
+        if right.__class__ is float:
+            return -right
+        expr.quick = None
+        return interpreter.unary(expr, right)
+    return evaluate
+
+
+def specialize_not(kind, truthy):
+    def evaluate(interpreter, expr):
+        right = expr.right.accept(interpreter)
+        if right.__class__ is kind:
+            return not (right if truthy is None else truthy)
+        expr.quick = None
+        return interpreter.unary(expr, right)
+    return evaluate
+
+
+def specialize_logical(is_or, kind, truthy):
+    # `truthy` is fixed for nil and for non-boolean values; None means the
+    # value itself is the boolean.
+    def evaluate(interpreter, expr):
+        left = expr.left.accept(interpreter)
+        if left.__class__ is not kind:
+            expr.quick = None
+            return interpreter.logical(expr, left)
+        value = left if truthy is None else truthy
+        if value if is_or else not value:
+            return left
+        return expr.right.accept(interpreter)
+    return evaluate
+
+
+# Truthiness of each value class that a node can specialize on.
+TRUTHINESS = {bool: None, type(None): False, float: True, str: True,
+              Rope: True}
+
+BINARY = {}
+for op, function in NUMBER_OPERATORS.items():
+    BINARY[op, float] = specialize_binary(function, float)
+for op, function in STRING_OPERATORS.items():
+    for kind in Rope.STRINGS:
+        BINARY[op, kind] = specialize_binary(function, kind)
+
+UNARY = {(tt.MINUS, float): specialize_negate()}
+for kind, truthy in TRUTHINESS.items():
+    UNARY[tt.BANG, kind] = specialize_not(kind, truthy)
+
+LOGICAL = {}
+for kind, truthy in TRUTHINESS.items():
+    LOGICAL[tt.OR, kind] = specialize_logical(True, kind, truthy)
+    LOGICAL[tt.AND, kind] = specialize_logical(False, kind, truthy)
+
+
+def record(expr, key, table):
+    # Counts consecutive executions with the same operand types and quickens
+    # the node once the count reaches THRESHOLD.
+    feedback = expr.feedback
+    count = feedback[1] + 1 if feedback is not None and feedback[0] == key else 1
+    if count >= THRESHOLD and key in table:
+        expr.quick = table[key]
+        expr.feedback = None
+    else:
+        expr.feedback = (key, count)
@@ -0,0 +1,30 @@
+import io
+from concurrent.futures import ThreadPoolExecutor
+
+from app.ExecutionContext import ExecutionContext
+from app.main import CommandExecutor
+
+# Embedding API: runs Lox programs inside this process, each in its own
+# ExecutionContext, so several can run at once on different threads.
+
+
+def run_source(source, context, options=None):
+    # Runs `source` the way the `run` command does and returns its exit code
+    # (0, 65 or 70). `options` takes the command line's option names, such
+    # as {"engine": "vm"}; the program cache is off unless asked for.
+    # Output and diagnostics go to the context's streams.
+    with context.activate():
+        options = {"no-cache": True, **(options or {})}
+        return CommandExecutor("run", source, options).execute()
+
+
+def run_batch(sources, workers=8, options=None):
+    # Runs independent programs on a pool of threads and returns each one's
+    # (exit code, stdout, stderr), in the order of `sources`.
+    def run(source):
+        context = ExecutionContext(io.StringIO(), io.StringIO())
+        code = run_source(source, context, options)
+        return code, context.stdout.getvalue(), context.stderr.getvalue()
+
+    with ThreadPoolExecutor(workers) as pool:
+        return list(pool.map(run, sources))
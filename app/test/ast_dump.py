@@ -0,0 +1,12 @@
+from app.tool import Expr, Stmt
+
+
+def dump(node):
+    # Structural form of a parse result, for comparing trees by value.
+    if isinstance(node, list):
+        return [dump(item) for item in node]
+    if isinstance(node, (Expr.Expr, Stmt.Stmt)):
+        return (type(node).__name__, {key: dump(value) for key, value in vars(node).items()})
+    if hasattr(node, "tokenType"):
+        return (node.tokenType, node.lexeme, node.literal, node.line)
+    return node
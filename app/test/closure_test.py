@@ -0,0 +1,64 @@
+import contextlib
+import io
+import unittest
+
+from app.Cell import Cell
+from app.Environment import Environment
+from app.Interpreter import Interpreter
+from app.main import ENGINES
+from app.test.support import functions, resolve_program
+
+
+SOURCE = """
+fun outer(a, unused) {
+  var big = "big";
+  var kept = 1;
+  fun mid() {
+    fun inner(b) { kept = kept + b; return a + kept; }
+    return inner;
+  }
+  return mid();
+}
+var inner = outer(10, nil);
+"""
+
+
+class TestClosure(unittest.TestCase):
+    def test_resolver_records_free_variables(self):
+        found = functions(resolve_program(SOURCE))
+        # `a` is parameter 0 and `kept` local slot 3 of outer; mid captures
+        # both from outer's scope and inner takes them from mid's closure.
+        self.assertEqual(found["outer"].cells, (0,))
+        self.assertEqual(found["outer"].upvalues, ())
+        self.assertEqual(found["mid"].upvalues, ((0, 3), (0, 0)))
+        self.assertEqual(found["inner"].upvalues, ((1, 0), (1, 1)))
+        self.assertTrue(found["outer"].body[1].cell)
+        self.assertIsNone(found["outer"].body[0].cell)
+
+    def test_closure_holds_only_captured_cells(self):
+        for name, engine in ENGINES.items():
+            if name == "vm":
+                continue
+            with self.subTest(engine=name):
+                statements = resolve_program(SOURCE)
+                interpreter = engine()
+                with contextlib.redirect_stdout(io.StringIO()):
+                    interpreter.interpret(statements, "run")
+                inner = interpreter.globals.values[statements[-1].global_slot]
+                closure = inner.closure
+                self.assertIsNone(closure.enclosing)
+                self.assertEqual([cell.__class__ for cell in closure.values],
+                                 [Cell, Cell])
+                self.assertEqual(sorted(cell.value for cell in closure.values),
+                                 [1, 10])
+
+    def test_functions_without_free_variables_share_a_closure(self):
+        statements = resolve_program("fun f() { return 1; }")
+        interpreter = Interpreter()
+        interpreter.interpret(statements, "run")
+        f = interpreter.globals.values[statements[0].global_slot]
+        self.assertIs(f.closure, Environment.EMPTY)
+
+
+if __name__ == '__main__':
+    unittest.main()
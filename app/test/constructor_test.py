@@ -0,0 +1,74 @@
+import contextlib
+import io
+import unittest
+from collections import Counter
+from unittest import mock
+
+from app.test.support import counting, resolve_program
+from app.Class import Class
+from app.main import ENGINES
+from app.ExecutionContext import ExecutionContext
+
+
+SOURCE = """
+class Base {
+  init(a, b) { this.sum = a + b; }
+}
+class Derived < Base {}
+class Empty {}
+var d = Derived(1, 2);
+print d.sum;
+print Empty();
+"""
+
+
+def run(engine, source):
+    statements = resolve_program(source)
+    interpreter = ENGINES[engine]()
+    context = ExecutionContext(io.StringIO(), io.StringIO())
+    with context.activate():
+        interpreter.interpret(statements, "run")
+    return context.stdout.getvalue() + context.stderr.getvalue()
+
+
+class TestConstructor(unittest.TestCase):
+    def test_class_plans_its_initializer(self):
+        init = mock.Mock()
+        init.arity.return_value = 2
+        base = Class("Base", None, {"init": init}, {})
+        derived = Class("Derived", base, {}, {})
+        self.assertIs(derived.initializer, init)
+        self.assertEqual(derived.arity(), 2)
+        empty = Class("Empty", None, {}, {})
+        self.assertIsNone(empty.initializer)
+        self.assertEqual(empty.arity(), 0)
+
+    def test_construction_does_not_look_up_init(self):
+        for engine in ENGINES:
+            with self.subTest(engine=engine), \
+                    mock.patch.object(Class, "find_method",
+                                      side_effect=AssertionError("lookup")):
+                self.assertEqual(run(engine, SOURCE), "3\nEmpty instance\n")
+
+    def test_wrong_argument_count(self):
+        for engine in ENGINES:
+            with self.subTest(engine=engine):
+                self.assertEqual(run(engine, "class A { init(x) {} } A();"),
+                                 "Expected 1 arguments but got 0.\n[line 1]\n")
+
+    def test_allocates_only_instance_and_frame(self):
+        statements = resolve_program(SOURCE)
+        for engine in ("tree", "closure"):
+            with self.subTest(engine=engine):
+                counts = Counter()
+                with contextlib.redirect_stdout(io.StringIO()), counting(counts):
+                    ENGINES[engine]().interpret(statements, "run")
+                # Declaring Derived takes its "super" scope and declaring
+                # Base its init. Derived(1, 2) then runs that init in one
+                # Environment, and Empty() has no initializer to run.
+                self.assertEqual(counts["Environment"], 2)
+                self.assertEqual(counts["Function"], 1)
+
+
+if __name__ == '__main__':
+    unittest.main()
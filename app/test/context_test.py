@@ -0,0 +1,105 @@
+import contextlib
+import io
+import sys
+import unittest
+
+from app.ExecutionContext import ExecutionContext
+from app.Interpreter import Interpreter
+from app.Resolver import Resolver
+from app.main import ENGINES, parse_options
+from app.runner import run_batch, run_source
+
+
+# One script per index: recursion, closures, classes, string building and
+# globals, all printing values that depend on the index. Every seventh
+# fails at runtime after its output and every eleventh does not parse.
+SCRIPT = """
+fun fib(n) {{ if (n < 2) return n; return fib(n - 1) + fib(n - 2); }}
+fun counter() {{ var count = 0; fun next() {{ count = count + 1; return count; }} return next; }}
+class Box {{ init(value) {{ this.value = value; }} twice() {{ return this.value * 2; }} }}
+var id = {i};
+var next = counter();
+var total = 0;
+for (var k = 0; k < 500; k = k + 1) total = total + next();
+var text = "";
+for (var k = 0; k < {pairs}; k = k + 1) text = text + "ab";
+print id;
+print fib({n});
+print total;
+print Box(id).twice();
+print text;
+{tail}
+"""
+
+
+def fib(n):
+    return n if n < 2 else fib(n - 1) + fib(n - 2)
+
+
+def script(i):
+    if i % 11 == 0:
+        tail = "print ;"
+    elif i % 7 == 0:
+        tail = 'print "x" - id;'
+    else:
+        tail = 'print "done";'
+    return SCRIPT.format(i=i, n=i % 12, pairs=i % 5, tail=tail)
+
+
+def expected(i):
+    if i % 11 == 0:
+        return 65, "", "[line 16] Error at ';': Expect expression.\n"
+    stdout = f"{i}\n{fib(i % 12)}\n{500 * 501 // 2}\n{2 * i}\n{'ab' * (i % 5)}\n"
+    if i % 7 == 0:
+        return 70, stdout, "Operands must be numbers\n[line 16]\n"
+    return 0, stdout + "done\n", ""
+
+
+class TestExecutionContext(unittest.TestCase):
+    def test_resolvers_do_not_share_state(self):
+        first = Resolver(Interpreter())
+        second = Resolver(Interpreter())
+        self.assertIsNot(first.scopes, second.scopes)
+        self.assertIsNot(first.slots, second.slots)
+
+    def test_run_keeps_to_its_context(self):
+        context = ExecutionContext(io.StringIO(), io.StringIO())
+        self.assertEqual(run_source('print "hi";\nprint nil + 1;', context), 70)
+        self.assertEqual(context.stdout.getvalue(), "hi\n")
+        self.assertEqual(context.stderr.getvalue(),
+                         "Operands must be two numbers or two strings.\n[line 2]\n")
+        self.assertTrue(context.had_runtime_error)
+        self.assertFalse(context.had_error)
+        self.assertFalse(ExecutionContext.DEFAULT.had_runtime_error)
+        self.assertIs(ExecutionContext.current(), ExecutionContext.DEFAULT)
+
+    def test_options_reach_the_engine(self):
+        context = ExecutionContext(io.StringIO(), io.StringIO())
+        source = "fun f(n) { return 1 + f(n + 1); } print f(0);"
+        self.assertEqual(run_source(source, context, {"max-depth": 50}), 70)
+        self.assertEqual(context.stderr.getvalue(), "Stack overflow.\n[line 1]\n")
+
+    def test_max_depth_is_capped(self):
+        for name, engine in ENGINES.items():
+            with self.subTest(engine=name):
+                engine(Interpreter.MAX_DEPTH_LIMIT)
+                with self.assertRaises(ValueError):
+                    engine(Interpreter.MAX_DEPTH_LIMIT + 1)
+        errors = io.StringIO()
+        with contextlib.redirect_stderr(errors), self.assertRaises(SystemExit):
+            parse_options([f"--max-depth={Interpreter.MAX_DEPTH_LIMIT + 1}"])
+        self.assertIn("expected at most 100000", errors.getvalue())
+
+    def test_many_scripts_run_concurrently(self):
+        count = 300
+        limit = sys.getrecursionlimit()
+        for engine in ("tree", "closure", "vm"):
+            with self.subTest(engine=engine):
+                results = run_batch([script(i) for i in range(count)], workers=32,
+                                    options={"engine": engine})
+                self.assertEqual(results, [expected(i) for i in range(count)])
+        self.assertEqual(sys.getrecursionlimit(), limit)
+
+
+if __name__ == '__main__':
+    unittest.main()
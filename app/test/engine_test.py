@@ -0,0 +1,49 @@
+import os
+import subprocess
+import tempfile
+import unittest
+
+from app.test import run_test
+
+
+# Engines checked against the tree-walker, which defines expected behaviour.
+ENGINES = ["closure", "vm"]
+
+
+class TestEngineParity(unittest.TestCase):
+    def setUp(self):
+        self.project_root = os.path.dirname(os.path.dirname(
+            os.path.dirname(os.path.abspath(__file__))))
+        self.program_script = os.path.join(self.project_root, 'your_program.sh')
+        self.test_root_dir = os.path.join(self.project_root, 'app/test')
+        self.directory = tempfile.TemporaryDirectory()
+        self.addCleanup(self.directory.cleanup)
+        self.env = dict(os.environ, LOX_CACHE_DIR=os.path.join(
+            self.directory.name, "cache"))
+
+    def lox_cases(self):
+        for root, dirs, files in os.walk(self.test_root_dir):
+            if 'script.txt' in files and 'expected.txt' in files:
+                yield from run_test.TestLox.read_test_cases(
+                    os.path.join(root, 'script.txt'),
+                    os.path.join(root, 'expected.txt')).items()
+
+    def run_lox(self, script, engine):
+        path = os.path.join(self.directory.name, "test.lox")
+        with open(path, "w") as f:
+            f.write(script)
+        result = subprocess.run(
+            ['/bin/bash', self.program_script, 'run', path, f"--engine={engine}"],
+            capture_output=True, text=True, env=self.env)
+        return result.stdout, result.stderr, result.returncode
+
+    def test_engines_match_tree_walker(self):
+        for name, case in self.lox_cases():
+            expected = self.run_lox(case['script'], "tree")
+            for engine in ENGINES:
+                with self.subTest(name, engine=engine):
+                    self.assertEqual(expected, self.run_lox(case['script'], engine))
+
+
+if __name__ == '__main__':
+    unittest.main()
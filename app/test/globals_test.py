@@ -0,0 +1,39 @@
+import unittest
+
+from app.Globals import Globals
+from app.RuntimeError import RuntimeError
+from app.Token import Token
+from app.TokensType import TokensType as tt
+from app.test.support import resolve_program
+
+
+def name(lexeme):
+    return Token(tt.IDENTIFIER, lexeme, None, 1)
+
+
+class TestGlobals(unittest.TestCase):
+    def test_resolver_interns_names_after_natives(self):
+        statements = resolve_program("var a = 1; print b; a = clock; fun b() {}")
+        self.assertEqual(statements[0].global_slot, 1)
+        self.assertEqual(statements[1].expression.slot, 2)
+        self.assertEqual(statements[2].expression.value.slot, 0)
+        self.assertEqual(statements[3].global_slot, 2)
+
+    def test_undefined_slots_raise(self):
+        table = Globals(["native"])
+        table.define(3, "x")
+        self.assertEqual(table.values, ["native", Globals.UNDEFINED, Globals.UNDEFINED, "x"])
+        self.assertEqual(table.get(name("x"), 3), "x")
+        for slot in (1, 7):
+            with self.subTest(slot=slot):
+                with self.assertRaises(RuntimeError) as raised:
+                    table.get(name("y"), slot)
+                self.assertEqual(str(raised.exception), "Undefined variable 'y'.")
+                with self.assertRaises(RuntimeError):
+                    table.assign(name("y"), slot, 1)
+        table.assign(name("x"), 3, "z")
+        self.assertEqual(table.get(name("x"), 3), "z")
+
+
+if __name__ == '__main__':
+    unittest.main()
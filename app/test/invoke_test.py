@@ -0,0 +1,46 @@
+import contextlib
+import io
+import unittest
+from collections import Counter
+
+from app.test.support import counting, resolve_program
+from app.Interpreter import Interpreter
+from app.ClosureInterpreter import ClosureInterpreter
+
+
+SOURCE = """
+class Point {
+  init(x) { this.x = x; }
+  add(k) { return this.x + k; }
+}
+var p = Point(1);
+print p.add(2);
+print p.add(3);
+var bound = p.add;
+print bound(4);
+"""
+
+
+class TestInvoke(unittest.TestCase):
+    def run_counted(self, engine):
+        statements = resolve_program(SOURCE)
+        counts = Counter()
+        output = io.StringIO()
+        with contextlib.redirect_stdout(output), counting(counts):
+            engine().interpret(statements, "run")
+        return output.getvalue(), counts
+
+    def test_method_call_allocates_only_its_frame(self):
+        for engine in (Interpreter, ClosureInterpreter):
+            with self.subTest(engine.__name__):
+                output, counts = self.run_counted(engine)
+                self.assertEqual(output, "3\n4\n5\n")
+                # One Environment each for Point(1) and the three calls.
+                # The only Functions are the two declared methods and the
+                # escaping bound method.
+                self.assertEqual(counts["Environment"], 4)
+                self.assertEqual(counts["Function"], 3)
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,106 @@
+import contextlib
+import io
+import unittest
+
+from app.Memo import Memo
+from app.Interpreter import Interpreter
+from app.main import ENGINES
+from app.test.support import functions, resolve_program
+
+
+PURITY = """
+fun fib(n) { if (n < 2) return n; return fib(n - 1) + fib(n - 2); }
+fun square(x) { var y = x; { y = y * x; } return y; }
+fun viaSquare(x) { return square(x) + fib(x); }
+fun even(n) { if (n == 0) return true; return odd(n - 1); }
+fun odd(n) { if (n == 0) return false; return even(n - 1); }
+var counter = 0;
+fun readsGlobal() { return counter; }
+fun writesGlobal() { counter = counter + 1; return counter; }
+fun prints(x) { print x; return x; }
+fun readsField(p) { return p.x; }
+fun callsClock() { return clock(); }
+fun callsImpure(x) { return prints(x); }
+fun callsArgument(f) { return f(); }
+fun makesClosure() { fun inner() { return 1; } return inner; }
+fun reassigned() { return 1; }
+reassigned = nil;
+fun callsReassigned() { return reassigned(); }
+fun outer(a) {
+  fun local(b) { return b + 1; }
+  fun capturing(b) { return a + b; }
+  return local(a);
+}
+"""
+
+
+class TestPurity(unittest.TestCase):
+    def test_marks_only_pure_functions(self):
+        found = functions(resolve_program(PURITY))
+        pure = {name for name, function in found.items() if function.pure}
+        self.assertEqual(pure, {"fib", "square", "viaSquare", "even", "odd",
+                                "reassigned", "inner", "local"})
+
+
+class TestMemo(unittest.TestCase):
+    def test_lru_eviction_and_counts(self):
+        calls = []
+
+        class Double:
+            def call(self, interpreter, arguments):
+                calls.append(arguments[0])
+                return arguments[0] * 2
+
+        memo = Memo("double", 2)
+        for value in (1.0, 2.0, 1.0, 3.0, 1.0, 2.0):
+            memo.call(Double(), None, [value])
+        # 2.0 was least recently used when 3.0 came in.
+        self.assertEqual(calls, [1.0, 2.0, 3.0, 2.0])
+        self.assertEqual((memo.hits, memo.misses), (2, 4))
+        self.assertEqual(str(memo), "memo double: 2 hits, 4 misses, 2 cached")
+
+    def test_keys_distinguish_booleans_from_numbers(self):
+        memo = Memo("same", 8)
+
+        class Identity:
+            def call(self, interpreter, arguments):
+                return arguments[0]
+
+        self.assertIs(memo.call(Identity(), None, [1.0]), 1.0)
+        self.assertIs(memo.call(Identity(), None, [True]), True)
+        self.assertEqual(memo.misses, 2)
+
+
+MEMOIZED = """
+fun fib(n) { if (n < 2) return n; return fib(n - 1) + fib(n - 2); }
+fun shout(x) { print x; return x; }
+print fib(60);
+shout("once");
+shout("once");
+"""
+
+
+class TestMemoizedRun(unittest.TestCase):
+    def test_engines_memoize_pure_calls_only(self):
+        statements = resolve_program(MEMOIZED)
+        for name, engine in ENGINES.items():
+            with self.subTest(name):
+                interpreter = engine(memo_size=16)
+                output = io.StringIO()
+                with contextlib.redirect_stdout(output):
+                    interpreter.interpret(statements, "run")
+                self.assertEqual(output.getvalue(),
+                                 "1548008755920\nonce\nonce\n")
+                self.assertEqual([str(memo) for memo in interpreter.memos.values()],
+                                 ["memo fib: 58 hits, 61 misses, 16 cached"])
+
+    def test_off_by_default(self):
+        interpreter = Interpreter()
+        with contextlib.redirect_stdout(io.StringIO()):
+            interpreter.interpret(resolve_program("fun f(n) { return n; }\nprint f(1);"),
+                                  "run")
+        self.assertEqual(interpreter.memos, {})
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,44 @@
+import contextlib
+import io
+import unittest
+
+from app.Class import Class
+from app.Interpreter import Interpreter
+from app.Parser import Parser
+from app.Resolver import Resolver
+from app.Scanner import Scanner
+from app.tool import Expr
+
+
+class TestMethodTable(unittest.TestCase):
+    def test_table_follows_lookup_order(self):
+        base = Class("Base", None, {"m": "base m", "s": "base s"}, {"x": "base x"})
+        derived = Class("Derived", base, {"s": "own s"}, {"m": "own static m"})
+        self.assertEqual(derived.find_method("s"), "own s")
+        self.assertEqual(derived.find_method("m"), "own static m")
+        self.assertEqual(derived.find_method("x"), "base x")
+        self.assertIsNone(derived.find_method("missing"))
+
+    def test_get_cache_follows_receiver_class(self):
+        source = """
+class A { who() { return "A"; } }
+class B < A { who() { return "B" + super.who(); } }
+fun who(o) { return o.who(); }
+print who(A());
+print who(B());
+print who(A());
+"""
+        statements = Parser(Scanner(source).scan_tokens()).parse("run")
+        Resolver(Interpreter()).resolve(statements)
+        output = io.StringIO()
+        with contextlib.redirect_stdout(output):
+            Interpreter().interpret(statements, "run")
+        self.assertEqual(output.getvalue(), "A\nBA\nA\n")
+
+        get = statements[2].body[0].value.callee
+        self.assertIsInstance(get, Expr.Get)
+        self.assertEqual(get.cache[0].name, "A")
+
+
+if __name__ == '__main__':
+    unittest.main()
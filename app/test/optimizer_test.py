@@ -0,0 +1,93 @@
+import io
+import unittest
+
+from app.AstPrinter import AstPrinter
+from app.Optimizer import Optimizer
+from app.ProgramCache import ProgramCache
+from app.main import ENGINES
+from app.ExecutionContext import ExecutionContext
+from app.test.support import resolve_program
+
+
+def program(source, optimize=True):
+    statements = resolve_program(source)
+    return Optimizer().optimize(statements) if optimize else statements
+
+
+def optimized(source):
+    return AstPrinter().print_program(program(source))
+
+
+def run(engine, statements):
+    context = ExecutionContext(io.StringIO(), io.StringIO())
+    with context.activate():
+        ENGINES[engine]().interpret(statements, "run")
+    return context.stdout.getvalue() + context.stderr.getvalue()
+
+
+PROGRAM = """
+var a = (1 + 2) * 3 - -4;
+print a;
+print "foo" + "bar";
+print !nil == true;
+if (1 < 2) print "yes"; else print "no";
+while (false) print "never";
+print true or missing;
+print nil and missing;
+fun f(x) { if (false) { var y = 1; } return x * (2 + 3); }
+print f(a);
+print 10 / 4;
+print "a" + 1;
+"""
+
+
+class TestOptimizer(unittest.TestCase):
+    def test_folds_literal_operators(self):
+        self.assertEqual(optimized("print (1 + 2) * 3 - -4;"), "(print 13.0)")
+        self.assertEqual(optimized('print "a" + "b" == "ab";'), "(print true)")
+        self.assertEqual(optimized("print !(2 >= 3);"), "(print true)")
+        self.assertEqual(optimized("print 1 != nil;"), "(print true)")
+
+    def test_keeps_operations_that_fail_at_runtime(self):
+        for source in ['print -"str";', "print 1 / 0;", 'print "a" < 1;',
+                       'print "a" + 1;', "print -nil;"]:
+            with self.subTest(source=source):
+                self.assertEqual(optimized(source),
+                                 AstPrinter().print_program(program(source, False)))
+
+    def test_folds_around_variables(self):
+        self.assertEqual(optimized("var x = 1; print x * (2 + 3);"),
+                         "(var x 1.0)\n(print (* x 5.0))")
+
+    def test_short_circuits_literal_logical(self):
+        self.assertEqual(optimized("print true or missing;"), "(print true)")
+        self.assertEqual(optimized("print nil or missing;"), "(print missing)")
+        self.assertEqual(optimized("print 1 and (2 or missing);"), "(print 2.0)")
+
+    def test_removes_dead_branches(self):
+        self.assertEqual(optimized('if (1 < 2) print "y"; else print "n";'), "(print y)")
+        self.assertEqual(optimized('if (nil) print "y";'), "")
+        self.assertEqual(optimized('while (false) print "n"; 1 + 2;'), "")
+        self.assertEqual(optimized("var x; while (x) if (false) x = 1;"),
+                         "(var x)\n(while x (block))")
+
+    def test_folds_for_clauses(self):
+        self.assertEqual(optimized("for (var i = 0; true; i = i + (1 + 1)) print i;"),
+                         "(for (var i 0.0) nil (= i (+ i 2.0)) (print i))")
+        self.assertEqual(optimized("for (var i = 0; 1 > 2; i = i + 1) print i;"),
+                         "(for (var i 0.0) false nil (block))")
+        self.assertEqual(optimized("for (; nil;) print 1;"), "")
+
+    def test_cache_key_depends_on_optimization(self):
+        cache = ProgramCache()
+        self.assertNotEqual(cache.key(PROGRAM, "run"), cache.key(PROGRAM, "run", "no-opt"))
+
+    def test_engines_agree_with_unoptimized_program(self):
+        for engine in ENGINES:
+            with self.subTest(engine=engine):
+                self.assertEqual(run(engine, program(PROGRAM)),
+                                 run(engine, program(PROGRAM, False)))
+
+
+if __name__ == '__main__':
+    unittest.main()
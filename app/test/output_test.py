@@ -0,0 +1,79 @@
+import contextlib
+import io
+import os
+import subprocess
+import tempfile
+import time
+import unittest
+from unittest import mock
+
+from app.Output import Output
+from app.main import ENGINES
+from app.test.support import resolve_program
+
+
+class TestOutput(unittest.TestCase):
+    def setUp(self):
+        self.project_root = os.path.dirname(os.path.dirname(
+            os.path.dirname(os.path.abspath(__file__))))
+        self.directory = tempfile.TemporaryDirectory()
+        self.addCleanup(self.directory.cleanup)
+
+    def lox(self, source, *options):
+        script = os.path.join(self.directory.name, "script.lox")
+        with open(script, "w") as f:
+            f.write(source)
+        command = ['/bin/bash', os.path.join(self.project_root, 'your_program.sh'),
+                   'run', script, '--no-cache', *options]
+        # stderr shares the pipe, so the two streams must arrive in order.
+        return subprocess.run(command, stdout=subprocess.PIPE,
+                              stderr=subprocess.STDOUT, text=True)
+
+    def test_writes_once_the_buffer_fills(self):
+        output = Output(8)
+        with contextlib.redirect_stdout(io.StringIO()) as stdout:
+            output.print("abc")
+            self.assertEqual(stdout.getvalue(), "")
+            output.print("defg")
+            self.assertEqual(stdout.getvalue(), "abc\ndefg\n")
+            output.print("h")
+            output.flush()
+        self.assertEqual(stdout.getvalue(), "abc\ndefg\nh\n")
+
+    def test_unbuffered_writes_through(self):
+        output = Output(None)
+        with contextlib.redirect_stdout(io.StringIO()) as stdout:
+            output.print("abc")
+            self.assertEqual(stdout.getvalue(), "abc\n")
+
+    def test_clock_flushes_pending_output(self):
+        statements = resolve_program('print "before"; var t = clock(); print "after";')
+        for name, engine in ENGINES.items():
+            with self.subTest(engine=name):
+                seen = []
+                with contextlib.redirect_stdout(io.StringIO()) as stdout, \
+                        mock.patch.object(time, "time",
+                                          lambda: seen.append(stdout.getvalue()) or 0.0):
+                    engine().interpret(statements, "run")
+                self.assertEqual(seen, ["before\n"])
+                self.assertEqual(stdout.getvalue(), "before\nafter\n")
+
+    def test_runtime_error_follows_printed_output(self):
+        source = 'print "one";\nprint "two";\nprint -nil;\nprint "never";'
+        expected = ("Logs from your program will appear here!\none\ntwo\n"
+                    "Operand must be a number.\n[line 3]\n")
+        for engine in ENGINES:
+            for options in ([], ["--unbuffered"], ["--output-buffer=4"]):
+                with self.subTest(engine=engine, options=options):
+                    result = self.lox(source, f"--engine={engine}", *options)
+                    self.assertEqual(result.stdout, expected)
+                    self.assertEqual(result.returncode, 70)
+
+    def test_rejects_empty_buffer(self):
+        result = self.lox('print 1;', "--output-buffer=0")
+        self.assertEqual(result.returncode, 1)
+        self.assertIn("Invalid value for --output-buffer", result.stdout)
+
+
+if __name__ == '__main__':
+    unittest.main()
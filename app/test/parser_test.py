@@ -0,0 +1,98 @@
+import contextlib
+import io
+import os
+import sys
+import unittest
+
+from app.Parser import Parser
+from app.PrattParser import PrattParser
+from app.Scanner import Scanner
+from app.test.ast_dump import dump
+
+
+EXPRESSIONS = [
+    "1 + 2 * 3 - 4 / 5",
+    "1 - 2 - 3",
+    "a = b = c",
+    "a.b.c = 1 + 2",
+    "!!-x",
+    "-a * -b",
+    "a or b and c or d",
+    "a == b != c < d <= e > f >= g",
+    "(1 + 2) * (3 - (4))",
+    "f(1, g(2), h)(3).field.method(a = b)",
+    "super.method(this)",
+    "\"str\" + nil + true + false",
+    "a + b = c",
+    "(a) = 1",
+    "1 +",
+    "(1 + 2",
+    "f(1, 2",
+    "obj.",
+    "super",
+    "super.",
+    ")",
+    "",
+]
+
+PROGRAMS = [
+    "print 1 + 2 * 3;",
+    "var a = 1; a = a or 2 and 3; print a;",
+    "for (var i = 0; i < 10; i = i + 1) print i * -i;",
+    "class A < B { init(x) { this.x = x; } get { return super.get + this.x; } }",
+    "fun f(a, b) { return !(a == b) and a >= b or f(b, a); }",
+    "print 1 +;",
+    "var x = 1",
+]
+
+
+class TestPrattParser(unittest.TestCase):
+    def setUp(self):
+        self.project_root = os.path.dirname(os.path.dirname(
+            os.path.dirname(os.path.abspath(__file__))))
+
+    def parse(self, parser_class, source, command):
+        stderr = io.StringIO()
+        with contextlib.redirect_stderr(stderr):
+            try:
+                result = dump(parser_class(Scanner(source).scan_tokens()).parse(command))
+            except Exception as e:
+                result = f"{type(e).__name__}: {e}"
+        return result, stderr.getvalue()
+
+    def assert_same_parse(self, source, command):
+        self.assertEqual(self.parse(Parser, source, command),
+                         self.parse(PrattParser, source, command), repr(source))
+
+    def test_expressions(self):
+        for source in EXPRESSIONS:
+            with self.subTest(source=source):
+                self.assert_same_parse(source, "evaluate")
+
+    def test_programs(self):
+        for source in PROGRAMS:
+            with self.subTest(source=source):
+                self.assert_same_parse(source, "run")
+
+    def test_scripts(self):
+        sources = [os.path.join(self.project_root, "test.lox")]
+        test_root = os.path.join(self.project_root, "app/test")
+        for root, dirs, files in os.walk(test_root):
+            if "script.txt" in files:
+                sources.append(os.path.join(root, "script.txt"))
+        for path in sources:
+            with self.subTest(path=path):
+                with open(path) as f:
+                    self.assert_same_parse(f.read(), "run")
+
+    def test_deeper_nesting_than_descent(self):
+        depth = sys.getrecursionlimit() // 8
+        source = "(" * depth + "1" + ")" * depth
+        with self.assertRaises(RecursionError):
+            Parser(Scanner(source).scan_tokens()).parse("evaluate")
+        expr = PrattParser(Scanner(source).scan_tokens()).parse("evaluate")
+        self.assertEqual(type(expr).__name__, "Grouping")
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,144 @@
+import gc
+import os
+import pickle
+import subprocess
+import tempfile
+import time
+import unittest
+from unittest import mock
+
+from app.Interpreter import Interpreter
+from app.Parser import Parser
+from app.ProgramCache import ProgramCache
+from app.Resolver import Resolver
+from app.Scanner import Scanner
+from app.test.ast_dump import dump
+
+
+SOURCE = """
+fun make(n) {
+  var count = n;
+  fun inc() { return count + 1; }
+  return inc;
+}
+var f = make(1);
+print f();
+"""
+
+
+class TestProgramCache(unittest.TestCase):
+    def setUp(self):
+        self.project_root = os.path.dirname(os.path.dirname(
+            os.path.dirname(os.path.abspath(__file__))))
+        self.directory = tempfile.TemporaryDirectory()
+        self.addCleanup(self.directory.cleanup)
+
+    def resolve(self, source):
+        statements = Parser(Scanner(source).scan_tokens()).parse("run")
+        Resolver(Interpreter()).resolve(statements)
+        return statements
+
+    def test_round_trip(self):
+        cache = ProgramCache(self.directory.name)
+        key = cache.key(SOURCE, "run")
+        self.assertIsNone(cache.load(key))
+
+        statements = self.resolve(SOURCE)
+        self.assertTrue(cache.store(key, statements))
+        self.assertEqual(dump(statements), dump(cache.load(key)))
+
+    def test_leaves_collector_alone_unless_asked(self):
+        statements = self.resolve(SOURCE)
+        cache = ProgramCache(self.directory.name)
+        cache.store("a", statements)
+        frozen = gc.get_freeze_count()
+        self.assertIsNotNone(cache.load("a"))
+        self.assertEqual(gc.get_freeze_count(), frozen)
+        self.assertTrue(gc.isenabled())
+
+        self.addCleanup(gc.unfreeze)
+        single_shot = ProgramCache(self.directory.name, pause_gc=True)
+        self.assertIsNotNone(single_shot.load("a"))
+        self.assertGreater(gc.get_freeze_count(), frozen)
+        self.assertTrue(gc.isenabled())
+
+    def test_key_depends_on_source_and_command(self):
+        cache = ProgramCache(self.directory.name)
+        self.assertEqual(cache.key(SOURCE, "run"), cache.key(SOURCE, "run"))
+        self.assertNotEqual(cache.key(SOURCE, "run"), cache.key(SOURCE + " ", "run"))
+        self.assertNotEqual(cache.key(SOURCE, "run"), cache.key(SOURCE, "evaluate"))
+
+    def test_evicts_least_recently_used(self):
+        entry = self.resolve(SOURCE)
+        size = ProgramCache(self.directory.name, max_bytes=1 << 30)
+        size.store("probe", entry)
+        entry_size = os.path.getsize(size.path("probe"))
+        size.discard(size.path("probe"))
+
+        cache = ProgramCache(self.directory.name, max_bytes=entry_size * 2)
+        cache.store("a", entry)
+        cache.store("b", entry)
+        past = time.time() - 60
+        os.utime(cache.path("a"), (past, past))
+        os.utime(cache.path("b"), (past + 1, past + 1))
+        self.assertIsNotNone(cache.load("a"))
+        cache.store("c", entry)
+
+        self.assertTrue(os.path.exists(cache.path("a")))
+        self.assertFalse(os.path.exists(cache.path("b")))
+        self.assertTrue(os.path.exists(cache.path("c")))
+
+    def test_corrupt_entry_is_dropped(self):
+        cache = ProgramCache(self.directory.name)
+        os.makedirs(self.directory.name, exist_ok=True)
+        with open(cache.path("bad"), "wb") as f:
+            f.write(b"not a pickle")
+        self.assertIsNone(cache.load("bad"))
+        self.assertFalse(os.path.exists(cache.path("bad")))
+
+    def test_creates_private_directory(self):
+        directory = os.path.join(self.directory.name, "cache")
+        cache = ProgramCache(directory)
+        self.assertTrue(cache.store("a", self.resolve(SOURCE)))
+        self.assertEqual(os.stat(directory).st_mode & 0o777, 0o700)
+
+    def test_refuses_shared_directory(self):
+        cache = ProgramCache(self.directory.name)
+        self.assertTrue(cache.store("a", self.resolve(SOURCE)))
+        os.chmod(self.directory.name, 0o770)
+        self.assertIsNone(cache.load("a"))
+        self.assertFalse(cache.store("b", self.resolve(SOURCE)))
+
+    def test_refuses_entries_of_other_users(self):
+        cache = ProgramCache(self.directory.name)
+        self.assertTrue(cache.store("a", self.resolve(SOURCE)))
+        with mock.patch.object(os, "getuid", return_value=os.getuid() + 1):
+            self.assertIsNone(cache.load("a"))
+
+    def test_entry_cannot_name_other_code(self):
+        cache = ProgramCache(self.directory.name)
+        self.assertTrue(cache.store("a", self.resolve(SOURCE)))
+        with open(cache.path("a"), "wb") as f:
+            pickle.dump(mock.Mock, f)
+        self.assertIsNone(cache.load("a"))
+        self.assertFalse(os.path.exists(cache.path("a")))
+
+    def test_warm_run_matches_cold_run(self):
+        script = os.path.join(self.directory.name, "script.lox")
+        with open(script, "w") as f:
+            f.write(SOURCE)
+        env = dict(os.environ, LOX_CACHE_DIR=os.path.join(self.directory.name, "cache"))
+        command = ['/bin/bash', os.path.join(self.project_root, 'your_program.sh'), 'run', script]
+
+        cold = subprocess.run(command, capture_output=True, text=True, env=env)
+        self.assertEqual(len(os.listdir(env["LOX_CACHE_DIR"])), 1)
+        warm = subprocess.run(command, capture_output=True, text=True, env=env)
+        bypass = subprocess.run(command + ["--no-cache"], capture_output=True, text=True, env=env)
+
+        self.assertEqual(cold.stdout, "2\n")
+        self.assertEqual((cold.stdout, cold.returncode), (warm.stdout, warm.returncode))
+        self.assertEqual((cold.stdout, cold.returncode), (bypass.stdout, bypass.returncode))
+
+
+if __name__ == '__main__':
+    unittest.main()
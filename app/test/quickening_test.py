@@ -0,0 +1,86 @@
+import contextlib
+import io
+import unittest
+
+from app import quickening
+from app.Interpreter import Interpreter
+from app.tool import Expr, Stmt
+from app.test.support import resolve_program
+
+
+def run(statements):
+    output = io.StringIO()
+    with contextlib.redirect_stdout(output), contextlib.redirect_stderr(output):
+        Interpreter().interpret(statements, "run")
+    return output.getvalue()
+
+
+# Finds the first expression node of `kind` in a function's body.
+def find(node, kind):
+    if isinstance(node, kind):
+        return node
+    children = node if isinstance(node, list) else vars(node).values()
+    for child in children:
+        if isinstance(child, (list, Expr.Expr, Stmt.Stmt)):
+            found = find(child, kind)
+            if found is not None:
+                return found
+    return None
+
+
+SOURCE = """
+fun op(a, b) { return a + b; }
+fun neg(a) { return -a; }
+fun either(a, b) { return a or b; }
+"""
+
+
+class TestQuickening(unittest.TestCase):
+    def node(self, statements, index, kind):
+        return find(statements[index].body, kind)
+
+    def calls(self, *lines):
+        return resolve_program(SOURCE + "\n".join(lines))
+
+    def test_numbers_specialize_after_threshold(self):
+        statements = self.calls(*["print op(1, 2);"] * quickening.THRESHOLD)
+        output = run(statements)
+        self.assertEqual(output, "3\n" * quickening.THRESHOLD)
+        binary = self.node(statements, 0, Expr.Binary)
+        self.assertIs(binary.quick, quickening.BINARY[binary.operator.tokenType, float])
+
+    def test_strings_specialize(self):
+        statements = self.calls(*['print op("a", "b");'] * 5)
+        self.assertEqual(run(statements), "ab\n" * 5)
+        binary = self.node(statements, 0, Expr.Binary)
+        self.assertIs(binary.quick, quickening.BINARY[binary.operator.tokenType, str])
+
+    def test_guard_failure_falls_back_with_runtime_error(self):
+        statements = self.calls(*["print op(1, 2);"] * 5, 'print op(1, "x");')
+        self.assertEqual(
+            run(statements),
+            "3\n" * 5 + "Operands must be two numbers or two strings.\n[line 2]\n")
+        self.assertIsNone(self.node(statements, 0, Expr.Binary).quick)
+
+    def test_guard_failure_switches_type(self):
+        statements = self.calls(*["print op(1, 2);"] * 5,
+                                *['print op("a", "b");'] * 5)
+        self.assertEqual(run(statements), "3\n" * 5 + "ab\n" * 5)
+        binary = self.node(statements, 0, Expr.Binary)
+        self.assertIs(binary.quick, quickening.BINARY[binary.operator.tokenType, str])
+
+    def test_unary_and_logical_fall_back(self):
+        statements = self.calls(*["print neg(2);"] * 5,
+                                *["print either(nil, 1);"] * 5,
+                                "print either(false, 2);",
+                                'print either("s", 3);',
+                                'print neg("s");')
+        self.assertEqual(run(statements),
+                         "-2\n" * 5 + "1\n" * 5 + "2\ns\n"
+                         "Operand must be a number.\n[line 3]\n")
+        self.assertIsNone(self.node(statements, 1, Expr.Unary).quick)
+        self.assertIsNone(self.node(statements, 2, Expr.Logical).quick)
+
+
+if __name__ == '__main__':
+    unittest.main()
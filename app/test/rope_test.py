@@ -0,0 +1,63 @@
+import contextlib
+import io
+import unittest
+
+from app.Rope import Rope
+from app.main import ENGINES
+from app.test.support import resolve_program
+
+
+PIECE = "x" * 100
+
+SOURCE = """
+var s = "";
+for (var i = 0; i < 5; i = i + 1) s = s + "{piece}";
+var t = "{piece}{piece}" + "{piece}{piece}" + "{piece}";
+print s == t;
+print s != t;
+print s == "{piece}";
+print s + "!";
+""".replace("{piece}", PIECE)
+
+
+class TestRope(unittest.TestCase):
+    def test_short_results_stay_strings(self):
+        self.assertEqual(Rope.concat("ab", "cd"), "abcd")
+        self.assertIs(Rope.concat("ab", "cd").__class__, str)
+        self.assertIs(Rope.concat(PIECE, PIECE + PIECE).__class__, Rope)
+
+    def test_flattens_once_when_observed(self):
+        rope = Rope.concat(Rope.concat(PIECE, PIECE), Rope.concat(PIECE, "y"))
+        self.assertEqual(len(rope), 301)
+        self.assertIsNone(rope.text)
+        self.assertEqual(str(rope), PIECE * 3 + "y")
+        self.assertIsNone(rope.left)
+        self.assertIs(str(rope), rope.text)
+
+    def test_compares_and_hashes_like_the_string(self):
+        rope = Rope.concat(PIECE * 2, PIECE)
+        text = PIECE * 3
+        self.assertTrue(rope == text and text == rope)
+        self.assertTrue(rope == Rope.concat(PIECE, PIECE * 2))
+        self.assertTrue(rope != PIECE)
+        self.assertFalse(rope == 300.0)
+        self.assertEqual(hash(rope), hash(text))
+        self.assertEqual({text: 1}[rope], 1)
+
+    def test_deep_ropes_flatten_without_recursion(self):
+        rope = PIECE * 3
+        for _ in range(100000):
+            rope = Rope.concat(rope, "ab")
+        self.assertEqual(str(rope), PIECE * 3 + "ab" * 100000)
+
+    def test_engines_observe_ropes_as_strings(self):
+        expected = f"true\nfalse\nfalse\n{PIECE * 5}!\n"
+        for name, engine in ENGINES.items():
+            with self.subTest(engine=name):
+                with contextlib.redirect_stdout(io.StringIO()) as output:
+                    engine().interpret(resolve_program(SOURCE), "run")
+                self.assertEqual(output.getvalue(), expected)
+
+
+if __name__ == '__main__':
+    unittest.main()
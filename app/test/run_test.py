@@ -1,4 +1,5 @@
 import subprocess
+import tempfile
 import unittest
 import os
 
@@ -14,7 +15,14 @@ class TestLox(unittest.TestCase):
         # Test root directory
         self.test_root_dir = os.path.join(self.project_root, 'app/test')
 
-    def read_test_cases(self, script_file, expected_file):
+        # Keep the program cache out of the developer's home directory.
+        self.directory = tempfile.TemporaryDirectory()
+        self.addCleanup(self.directory.cleanup)
+        self.env = dict(os.environ, LOX_CACHE_DIR=os.path.join(
+            self.directory.name, "cache"))
+
+    @staticmethod
+    def read_test_cases(script_file, expected_file):
         """Read test cases from script.txt and expected.txt"""
         test_cases = {}
 
@@ -74,7 +82,8 @@ class TestLox(unittest.TestCase):
             result = subprocess.run(
                 ['/bin/bash', self.program_script, 'run', self.test_lox],
                 capture_output=True,
-                text=True
+                text=True,
+                env=self.env
             )
 
             output = result.stdout.strip(
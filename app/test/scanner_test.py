@@ -0,0 +1,67 @@
+import contextlib
+import io
+import os
+import unittest
+
+from app.CharScanner import CharScanner
+from app.Scanner import Scanner
+
+
+SNIPPETS = [
+    "",
+    "var a = 1;\nprint a;",
+    "(){},.-+;*/ ! != = == < <= > >=",
+    "// comment only",
+    "1 // trailing comment\n2",
+    "123 45.67 8. .9 1.2.3 007",
+    "\"hello\" \"multi\nline\nstring\" after",
+    "\"unterminated\nstring",
+    "@ # $ 1 ^ & |",
+    "and class else false for fun if nil or print return super this true var while",
+    "andy _under score_9 x1y2",
+    "café naïve 日本 x²",
+    "4.٣ ٣٤ 5٣",
+    "\t\x0b\x0c\r\n\x1c\xa0  end",
+    "a/b//c\n/d",
+    "\"\"",
+    "!==>=<==",
+]
+
+
+class TestScanner(unittest.TestCase):
+    def setUp(self):
+        self.project_root = os.path.dirname(os.path.dirname(
+            os.path.dirname(os.path.abspath(__file__))))
+
+    def scan(self, scan, source):
+        stderr = io.StringIO()
+        with contextlib.redirect_stderr(stderr):
+            tokens = list(scan(source))
+        return [(t.tokenType, t.lexeme, t.literal, t.line) for t in tokens], stderr.getvalue()
+
+    def assert_same_tokens(self, source):
+        expected = self.scan(lambda s: CharScanner(s).scan_tokens(), source)
+        self.assertEqual(expected, self.scan(
+            lambda s: Scanner(s).scan_tokens(), source), repr(source))
+        self.assertEqual(expected, self.scan(
+            lambda s: Scanner(s).stream_tokens(), source), repr(source))
+
+    def test_snippets(self):
+        for source in SNIPPETS:
+            with self.subTest(source=source):
+                self.assert_same_tokens(source)
+
+    def test_scripts(self):
+        sources = [os.path.join(self.project_root, "test.lox")]
+        test_root = os.path.join(self.project_root, "app/test")
+        for root, dirs, files in os.walk(test_root):
+            if "script.txt" in files:
+                sources.append(os.path.join(root, "script.txt"))
+        for path in sources:
+            with self.subTest(path=path):
+                with open(path) as f:
+                    self.assert_same_tokens(f.read())
+
+
+if __name__ == '__main__':
+    unittest.main()
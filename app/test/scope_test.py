@@ -0,0 +1,61 @@
+import contextlib
+import io
+import unittest
+from collections import Counter
+
+from app.main import ENGINES
+from app.test.support import counting, functions, resolve_program
+
+
+SOURCE = """
+fun f(n) {
+  var total = 0;
+  for (var i = 0; i < n; i = i + 1) {
+    var square = i * i;
+    if (square > 2) { var half = square / 2; total = total + half; }
+    else { total = total + square; }
+  }
+  { var a = 1; var b = 2; total = total + a + b; }
+  return total;
+}
+print f(5);
+{ var top = 1; { var nested = top + 1; print nested; } }
+{ print "none"; }
+"""
+
+
+class TestScopes(unittest.TestCase):
+    def test_blocks_share_the_function_environment(self):
+        statements = resolve_program(SOURCE)
+        f = functions(statements)["f"]
+        # n and total, the for loop's i, square and half, while the last
+        # block's a and b reuse the slots freed by the loop.
+        self.assertEqual(f.scope_size, 5)
+        loop = f.body[1]
+        self.assertEqual(loop.scope_size, 0)
+        self.assertEqual(f.body[2].scope_size, 0)
+        self.assertEqual([stmt.slot for stmt in f.body[2].statements[:2]], [2, 3])
+
+    def test_only_outermost_declaring_blocks_get_environments(self):
+        statements = resolve_program(SOURCE)
+        outer = statements[2]
+        self.assertEqual(outer.scope_size, 2)
+        self.assertEqual(outer.statements[1].scope_size, 0)
+        self.assertEqual(statements[3].scope_size, 0)
+
+    def test_loops_allocate_no_environments(self):
+        # The VM keeps locals on its stack and has no Environments.
+        for name in ("tree", "closure"):
+            with self.subTest(engine=name):
+                statements = resolve_program(SOURCE)
+                counts = Counter()
+                with contextlib.redirect_stdout(io.StringIO()) as output, \
+                        counting(counts):
+                    ENGINES[name]().interpret(statements, "run")
+                self.assertEqual(output.getvalue(), "18.5\n2\nnone\n")
+                # The call to f and the outermost block.
+                self.assertEqual(counts["Environment"], 2)
+
+
+if __name__ == '__main__':
+    unittest.main()
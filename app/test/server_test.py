@@ -0,0 +1,193 @@
+import contextlib
+import io
+import json
+import os
+import socket
+import subprocess
+import sys
+import tempfile
+import threading
+import time
+import unittest
+from unittest import mock
+
+from app import client
+from app.Server import Server
+
+
+class TestServer(unittest.TestCase):
+    @classmethod
+    def setUpClass(cls):
+        cls.project_root = os.path.dirname(os.path.dirname(
+            os.path.dirname(os.path.abspath(__file__))))
+        cls.directory = tempfile.TemporaryDirectory()
+        cls.socket = os.path.join(cls.directory.name, "lox.sock")
+        env = dict(os.environ, LOX_CACHE_DIR=os.path.join(cls.directory.name, "cache"))
+        cls.server = subprocess.Popen(
+            [sys.executable, "-m", "app.main", "serve", cls.socket],
+            cwd=cls.project_root, env=env, stderr=subprocess.DEVNULL)
+        deadline = time.monotonic() + 10
+        while not os.path.exists(cls.socket):
+            if time.monotonic() > deadline or cls.server.poll() is not None:
+                raise RuntimeError("server did not start")
+            time.sleep(0.01)
+
+    @classmethod
+    def tearDownClass(cls):
+        cls.server.terminate()
+        cls.server.wait()
+        cls.directory.cleanup()
+
+    def script(self, name, source):
+        path = os.path.join(self.directory.name, name)
+        with open(path, "w") as f:
+            f.write(source)
+        return path
+
+    def request(self, *argv):
+        return client.request(list(argv), self.socket)
+
+    def test_matches_a_cold_run(self):
+        path = self.script("fib.lox", """
+fun fib(n) { if (n < 2) return n; return fib(n - 1) + fib(n - 2); }
+print fib(15);
+print -"oops";
+""")
+        for engine in ("tree", "closure", "vm"):
+            with self.subTest(engine=engine):
+                argv = ["run", path, "--no-cache", f"--engine={engine}"]
+                cold = subprocess.run(
+                    ['/bin/bash', os.path.join(self.project_root, 'your_program.sh'), *argv],
+                    capture_output=True, text=True)
+                warm = self.request(*argv)
+                self.assertEqual(warm, {"stdout": cold.stdout, "stderr": cold.stderr,
+                                        "code": cold.returncode})
+                self.assertEqual(warm["code"], 70)
+
+    def test_second_server_is_refused(self):
+        second = subprocess.run(
+            [sys.executable, "-m", "app.main", "serve", self.socket],
+            cwd=self.project_root, capture_output=True, text=True, timeout=10)
+        self.assertEqual(second.returncode, 1)
+        self.assertIn("already listening", second.stderr)
+        self.assertEqual(self.request("run", self.script("ok.lox", "print 1;"))["code"], 0)
+
+    def test_exit_codes(self):
+        self.assertEqual(self.request("run", self.script("ok.lox", "print 1;"))["code"], 0)
+        self.assertEqual(self.request("run", self.script("bad.lox", "print ;"))["code"], 65)
+        missing = self.request("run", os.path.join(self.directory.name, "missing.lox"))
+        self.assertEqual(missing["code"], 1)
+        self.assertIn("not found", missing["stderr"])
+        self.assertEqual(self.request("serve", self.socket)["code"], 1)
+
+    def test_requests_do_not_share_state(self):
+        failing = self.script("fail.lox", "var leaked = 1; print nil + 1;")
+        reader = self.script("read.lox", "print leaked;")
+        clean = self.script("clean.lox", 'print "clean";')
+        self.assertEqual(self.request("run", failing)["code"], 70)
+        self.assertEqual(self.request("run", clean),
+                         {"stdout": "clean\n", "code": 0,
+                          "stderr": "Logs from your program will appear here!\n"})
+        response = self.request("run", reader)
+        self.assertEqual(response["code"], 70)
+        self.assertIn("Undefined variable 'leaked'.", response["stderr"])
+
+    def test_paths_are_relative_to_the_client(self):
+        self.script("relative.lox", 'print "found";')
+        cwd = os.getcwd()
+        os.chdir(self.directory.name)
+        try:
+            response = self.request("run", "relative.lox")
+        finally:
+            os.chdir(cwd)
+        self.assertEqual(response["stdout"], "found\n")
+
+    def test_rejects_malformed_requests(self):
+        for message in (b"not json\n", b"[]\n", b'{"argv": "run"}\n',
+                        b'{"argv": [1], "cwd": "/"}\n'):
+            with self.subTest(message=message), \
+                    socket.socket(socket.AF_UNIX, socket.SOCK_STREAM) as connection:
+                connection.connect(self.socket)
+                connection.sendall(message)
+                with connection.makefile("rb") as reply:
+                    response = json.loads(reply.readline())
+                self.assertEqual(response["code"], 1)
+                self.assertIn("malformed request", response["stderr"])
+        self.assertEqual(self.request("run", self.script("ok.lox", "print 1;"))["code"], 0)
+
+
+class TestServerErrors(unittest.TestCase):
+    def setUp(self):
+        self.directory = tempfile.TemporaryDirectory()
+        self.addCleanup(self.directory.cleanup)
+        self.socket = os.path.join(self.directory.name, "lox.sock")
+
+    def test_unexpected_exception_is_replied(self):
+        def program():
+            raise KeyboardInterrupt
+
+        server = Server(self.socket, program)
+        self.addCleanup(server.server_close)
+        argv, cwd = sys.argv, os.getcwd()
+        try:
+            response = server.run(["run", "x.lox"], self.directory.name)
+        finally:
+            sys.argv = argv
+            os.chdir(cwd)
+        self.assertEqual(response["code"], 70)
+        self.assertIn("KeyboardInterrupt", response["stderr"])
+
+    def test_socket_is_private(self):
+        self.socket = os.path.join(self.directory.name, "run", "lox.sock")
+        umask = os.umask(0o002)
+        try:
+            server = Server(self.socket, lambda: None)
+        finally:
+            os.umask(umask)
+        self.addCleanup(server.server_close)
+        self.assertEqual(os.stat(self.socket).st_mode & 0o777, 0o600)
+        self.assertEqual(os.stat(os.path.dirname(self.socket)).st_mode & 0o777, 0o700)
+
+    def test_client_refuses_socket_of_other_user(self):
+        server = Server(self.socket, lambda: None)
+        self.addCleanup(server.server_close)
+        with mock.patch.object(os, "getuid", return_value=os.getuid() + 1), \
+                self.assertRaises(PermissionError):
+            client.request(["run", "x.lox"], self.socket)
+
+    def test_replaces_stale_socket(self):
+        with socket.socket(socket.AF_UNIX, socket.SOCK_STREAM) as stale:
+            stale.bind(self.socket)
+        server = Server(self.socket, lambda: None)
+        self.addCleanup(server.server_close)
+        self.assertTrue(Server.answers(self.socket))
+
+    def test_client_reports_missing_reply(self):
+        with socket.socket(socket.AF_UNIX, socket.SOCK_STREAM) as listener:
+            listener.bind(self.socket)
+            listener.listen()
+
+            def hang_up():
+                connection, _ = listener.accept()
+                connection.recv(4096)
+                connection.close()
+
+            thread = threading.Thread(target=hang_up)
+            thread.start()
+            stderr = io.StringIO()
+            argv = sys.argv
+            sys.argv = ["client", "run", "x.lox"]
+            try:
+                with contextlib.redirect_stderr(stderr), \
+                        mock.patch.dict(os.environ, LOX_SOCKET=self.socket), \
+                        self.assertRaises(SystemExit) as exit:
+                    client.main()
+            finally:
+                sys.argv = argv
+                thread.join()
+        self.assertEqual(exit.exception.code, 70)
+        self.assertIn("closed the connection without replying", stderr.getvalue())
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,62 @@
+import unittest
+
+from app.Class import Class
+from app.Instance import Instance
+from app.Token import Token
+from app.TokensType import TokensType as tt
+
+
+def name(lexeme):
+    return Token(tt.IDENTIFIER, lexeme, None, 1)
+
+
+class TestShape(unittest.TestCase):
+    def setUp(self):
+        self.klass = Class("Point", None, {}, {})
+
+    def instance(self, *fields):
+        instance = Instance(self.klass)
+        for field in fields:
+            instance.set(name(field), field.upper())
+        return instance
+
+    def test_same_field_order_shares_shape(self):
+        a = self.instance("x", "y")
+        b = self.instance("x", "y")
+        self.assertIs(a.shape, b.shape)
+        self.assertEqual(a.shape.slots, {"x": 0, "y": 1})
+        self.assertEqual(a.values, ["X", "Y"])
+
+    def test_different_order_gets_different_shape(self):
+        a = self.instance("x", "y")
+        b = self.instance("y", "x")
+        self.assertIsNot(a.shape, b.shape)
+        self.assertEqual(b.get(name("x")), "X")
+        self.assertEqual(b.get(name("y")), "Y")
+
+    def test_overwriting_keeps_shape(self):
+        a = self.instance("x")
+        shape = a.shape
+        a.set(name("x"), 3)
+        self.assertIs(a.shape, shape)
+        self.assertEqual(a.get(name("x")), 3)
+        self.assertIs(self.klass.root_shape.add("x"), shape)
+
+    def test_classes_do_not_share_shapes(self):
+        a = self.instance("x", "y")
+        other = Class("Point", None, {}, {})
+        b = Instance(other)
+        b.set(name("x"), 1)
+        self.assertIsNot(b.shape, a.shape)
+        self.assertEqual(list(other.root_shape.transitions), ["x"])
+        self.assertEqual(list(Class("Fresh", None, {}, {}).root_shape.transitions), [])
+
+    def test_missing_field_raises(self):
+        with self.assertRaises(RuntimeError) as raised:
+            self.instance("x").get(name("y"))
+        self.assertEqual(raised.exception.args,
+                         ("Point", "Undefined property 'y'."))
+
+
+if __name__ == '__main__':
+    unittest.main()
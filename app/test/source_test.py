@@ -0,0 +1,46 @@
+import os
+import subprocess
+import tempfile
+import unittest
+
+from app.main import process_file
+
+
+class TestProcessFile(unittest.TestCase):
+    def setUp(self):
+        self.project_root = os.path.dirname(os.path.dirname(
+            os.path.dirname(os.path.abspath(__file__))))
+        self.directory = tempfile.TemporaryDirectory()
+        self.addCleanup(self.directory.cleanup)
+
+    def write(self, data):
+        path = os.path.join(self.directory.name, "script.lox")
+        with open(path, "wb") as f:
+            f.write(data)
+        return path
+
+    def test_reads_regular_file(self):
+        self.assertEqual(process_file(self.write(b"print 1;\r\nprint 2;\r")),
+                         "print 1;\nprint 2;\n")
+
+    def test_reads_empty_file(self):
+        self.assertEqual(process_file(self.write(b"")), "")
+
+    def test_reads_fifo(self):
+        path = os.path.join(self.directory.name, "fifo")
+        os.mkfifo(path)
+        writer = subprocess.Popen(["/bin/sh", "-c", f"printf 'print 1;' > '{path}'"])
+        self.addCleanup(writer.wait)
+        self.assertEqual(process_file(path), "print 1;")
+
+    def test_runs_script_from_pipe(self):
+        command = ['/bin/bash', os.path.join(self.project_root, 'your_program.sh'),
+                   'run', '/dev/stdin', '--no-cache']
+        result = subprocess.run(command, input="print 1 + 2;\n",
+                                capture_output=True, text=True)
+        self.assertEqual(result.stdout, "3\n")
+        self.assertEqual(result.returncode, 0)
+
+
+if __name__ == '__main__':
+    unittest.main()
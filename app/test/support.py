@@ -0,0 +1,53 @@
+import contextlib
+
+from app.Environment import Environment
+from app.Function import Function
+from app.PrattParser import PrattParser
+from app.Resolver import Resolver
+from app.Scanner import Scanner
+from app.Interpreter import Interpreter
+from app.tool import Stmt
+
+
+def resolve_program(source):
+    # Scans, parses and resolves a whole program, ready for any engine.
+    statements = PrattParser(Scanner(source).scan_tokens()).parse("run")
+    Resolver(Interpreter()).resolve(statements)
+    return statements
+
+
+def functions(statements):
+    # Every function declaration in the program, by name.
+    found = {}
+
+    def walk(node):
+        if isinstance(node, list):
+            for child in node:
+                walk(child)
+        elif isinstance(node, Stmt.Stmt):
+            if isinstance(node, Stmt.Function):
+                found[node.name.lexeme] = node
+            for child in vars(node).values():
+                walk(child)
+    walk(statements)
+    return found
+
+
+@contextlib.contextmanager
+def counting(counts):
+    # Counts constructor calls of the two objects a call may allocate.
+    originals = {cls: cls.__init__ for cls in (Environment, Function)}
+
+    def wrap(cls, original):
+        def init(self, *args, **kwargs):
+            counts[cls.__name__] += 1
+            original(self, *args, **kwargs)
+        return init
+
+    for cls, original in originals.items():
+        cls.__init__ = wrap(cls, original)
+    try:
+        yield counts
+    finally:
+        for cls, original in originals.items():
+            cls.__init__ = original
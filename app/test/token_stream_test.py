@@ -0,0 +1,53 @@
+import unittest
+
+from app.Parser import Parser
+from app.Scanner import Scanner
+from app.TokenStream import TokenStream
+from app.test.ast_dump import dump
+
+
+SOURCE = """
+class Counter {
+  init(start) { this.count = start; }
+  next() { this.count = this.count + 1; return this.count; }
+}
+var counter = Counter(0);
+for (var i = 0; i < 3; i = i + 1) {
+  if (i == 1 or !false) print counter.next(); else print "skip";
+}
+"""
+
+
+class RecordingTokenStream(TokenStream):
+    def __init__(self, tokens):
+        super().__init__(tokens)
+        self.max_window = 0
+
+    def __getitem__(self, index):
+        token = super().__getitem__(index)
+        self.max_window = max(self.max_window, len(self.window))
+        return token
+
+
+class TestTokenStream(unittest.TestCase):
+    def test_same_tree_as_token_list(self):
+        source = SOURCE * 50
+        expected = Parser(Scanner(source).scan_tokens()).parse("run")
+        stream = RecordingTokenStream(Scanner(source).stream_tokens())
+        actual = Parser(stream).parse("run")
+        self.assertEqual(dump(expected), dump(actual))
+
+    def test_window_stays_bounded(self):
+        stream = RecordingTokenStream(Scanner(SOURCE * 200).stream_tokens())
+        Parser(stream).parse("run")
+        self.assertLessEqual(stream.max_window, 3)
+
+    def test_released_tokens_are_not_kept(self):
+        stream = TokenStream(Scanner("1 + 2 + 3").stream_tokens())
+        stream[4]
+        with self.assertRaises(IndexError):
+            stream[0]
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,115 @@
+import contextlib
+import io
+import unittest
+from array import array
+
+from app.Chunk import Chunk
+from app.Compiler import Compiler
+from app.Disassembler import Disassembler
+from app.Interpreter import Interpreter
+from app.Parser import Parser
+from app.Resolver import Resolver
+from app.Scanner import Scanner
+from app.VM import VM
+
+
+SOURCE = """
+fun outer() {
+  var x = 1;
+  fun inner() { x = x + 1; return x; }
+  return inner;
+}
+print outer()();
+"""
+
+
+class TestVM(unittest.TestCase):
+    def compile(self, source):
+        statements = Parser(Scanner(source).scan_tokens()).parse("run")
+        Resolver(Interpreter()).resolve(statements)
+        return statements, Compiler().compile(statements)
+
+    def test_chunk_is_array_backed(self):
+        _, proto = self.compile(SOURCE)
+        self.assertIsInstance(proto.chunk.code, array)
+        self.assertIsInstance(proto.chunk.lines, array)
+        self.assertEqual(len(proto.chunk.code), len(proto.chunk.lines))
+
+    def test_pools_signed_zeros_apart(self):
+        chunk = Chunk()
+        negative = chunk.add_constant(-0.0)
+        positive = chunk.add_constant(0.0)
+        self.assertNotEqual(negative, positive)
+        self.assertEqual(chunk.add_constant(0.0), positive)
+        self.assertEqual(str(chunk.constants[negative]), "-0.0")
+
+    def test_disassembler_lists_nested_functions(self):
+        _, proto = self.compile(SOURCE)
+        listing = "\n".join(Disassembler().disassemble(proto))
+        self.assertIn("== <script> ==", listing)
+        self.assertIn("== <fn outer> ==", listing)
+        self.assertIn("== <fn inner> ==", listing)
+        self.assertIn("GET_UPVALUE", listing)
+        self.assertIn("|   local 1", listing)
+
+    def test_runs_closures(self):
+        statements, _ = self.compile(SOURCE)
+        output = io.StringIO()
+        with contextlib.redirect_stdout(output):
+            VM().interpret(statements, "run")
+        self.assertEqual(output.getvalue(), "2\n")
+
+    def test_deep_recursion_reports_stack_overflow(self):
+        statements, _ = self.compile(
+            "fun f(n) { return 1 + f(n + 1); }\nf(0);")
+        errors = io.StringIO()
+        with contextlib.redirect_stderr(errors):
+            VM().interpret(statements, "run")
+        self.assertEqual(errors.getvalue(), "Stack overflow.\n[line 1]\n")
+
+    def test_tail_call_reuses_frame(self):
+        statements, proto = self.compile(
+            "fun f(n) { if (n == 0) return \"done\"; return f(n - 1); }\n"
+            "print f(50000);")
+        self.assertIn("TAIL_CALL", "\n".join(Disassembler().disassemble(proto)))
+        output = io.StringIO()
+        with contextlib.redirect_stdout(output):
+            VM(max_depth=10).interpret(statements, "run")
+        self.assertEqual(output.getvalue(), "done\n")
+
+
+    def test_invoke_matches_tree_engine(self):
+        # Method calls skip the bound method, but fields, getters, static
+        # methods and errors must behave as on the tree engine.
+        source = """
+fun twice(x) { return x * 2; }
+class A {
+  init() { this.f = twice; }
+  m(x) { this.m = "field"; return x + 1; }
+  g { return twice; }
+  class s(x) { return x - 1; }
+}
+var a = A();
+print a.m(1);
+print a.f(2);
+print a.g(3);
+print A.s(4);
+print a.m;
+print a.m(1, 2);
+"""
+        results = []
+        for engine in (Interpreter, VM):
+            statements, _ = self.compile(source)
+            output = io.StringIO()
+            errors = io.StringIO()
+            with contextlib.redirect_stdout(output), contextlib.redirect_stderr(errors):
+                engine().interpret(statements, "run")
+            results.append((output.getvalue(), errors.getvalue()))
+        self.assertEqual(results[0], results[1])
+        self.assertEqual(results[1][0], "2\n4\n6\n3\nfield\n")
+        _, proto = self.compile(source)
+        self.assertIn("INVOKE", "\n".join(Disassembler().disassemble(proto)))
+
+
+if __name__ == '__main__':
+    unittest.main()
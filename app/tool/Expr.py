@@ -44,6 +44,9 @@ class Assign(Expr):
     def __init__(self, name, value):
         self.name = name
         self.value = value
+        self.depth = None
+        self.slot = None
+        self.cell = None
     def accept(self, visitor):
         return visitor.visit_assign_expr(self)
 class Binary(Expr):
@@ -51,6 +54,8 @@ class Binary(Expr):
         self.left = left
         self.operator = operator
         self.right = right
+        self.quick = None
+        self.feedback = None
     def accept(self, visitor):
         return visitor.visit_binary_expr(self)
 class Call(Expr):
@@ -64,6 +69,8 @@ class Get(Expr):
     def __init__(self, object, name):
         self.object = object
         self.name = name
+        self.cache = None
+        self.shape_cache = None
     def accept(self, visitor):
         return visitor.visit_get_expr(self)
 class Grouping(Expr):
@@ -81,6 +88,8 @@ class Logical(Expr):
         self.left = left
         self.operator = operator
         self.right = right
+        self.quick = None
+        self.feedback = None
     def accept(self, visitor):
         return visitor.visit_logical_expr(self)
 class Set(Expr):
@@ -88,27 +97,41 @@ class Set(Expr):
         self.object = object
         self.name = name
         self.value = value
+        self.cache = None
     def accept(self, visitor):
         return visitor.visit_set_expr(self)
 class Super(Expr):
     def __init__(self, keyword, method):
         self.keyword = keyword
         self.method = method
+        self.depth = None
+        self.slot = None
+        self.cell = None
+        self.this = None
+        self.cache = None
     def accept(self, visitor):
         return visitor.visit_super_expr(self)
 class This(Expr):
     def __init__(self, keyword):
         self.keyword = keyword
+        self.depth = None
+        self.slot = None
+        self.cell = None
     def accept(self, visitor):
         return visitor.visit_this_expr(self)
 class Unary(Expr):
     def __init__(self, operator, right):
         self.operator = operator
         self.right = right
+        self.quick = None
+        self.feedback = None
     def accept(self, visitor):
         return visitor.visit_unary_expr(self)
 class Variable(Expr):
     def __init__(self, name):
         self.name = name
+        self.depth = None
+        self.slot = None
+        self.cell = None
     def accept(self, visitor):
         return visitor.visit_variable_expr(self)
\ No newline at end of file
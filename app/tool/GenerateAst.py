@@ -6,30 +6,34 @@ def main():
         print("Usage: generate_ast <output_directory>", file=sys.stderr)
         exit(64)
     output_dir = sys.argv[1]
+    # Fields after "|" are filled in by the Resolver, or by the interpreter
+    # as an inline cache, not the Parser; they start out as None. A variable
+    # with no depth is a global, and its slot indexes the global table.
     define_ast(output_dir, "Expr", [
-        "Assign   : name, value",
-        "Binary   : left, operator, right",
+        "Assign   : name, value | depth, slot, cell",
+        "Binary   : left, operator, right | quick, feedback",
         "Call     : callee, paren, arguments",
-        "Get      : object, name",
+        "Get      : object, name | cache, shape_cache",
         "Grouping : expression",
         "Literal  : value",
-        "Logical  : left, operator, right",
-        "Set      : object, name, value",
-        "Super    : keyword, method",
-        "This     : keyword",
-        "Unary    : operator, right",
-        "Variable : name"
+        "Logical  : left, operator, right | quick, feedback",
+        "Set      : object, name, value | cache",
+        "Super    : keyword, method | depth, slot, cell, this, cache",
+        "This     : keyword | depth, slot, cell",
+        "Unary    : operator, right | quick, feedback",
+        "Variable : name | depth, slot, cell"
     ])
 
     define_ast(output_dir, "Stmt", [
-        "Block      : statements",
-        "Class      : name, superclass, methods",
+        "Block      : statements | scope_size",
+        "Class      : name, superclass, methods | slot, cell, global_slot",
         "Expression : expression",
-        "Function   : name, params, body, kind",
+        "For        : initializer, condition, increment, body | scope_size",
+        "Function   : name, params, body, kind | slot, scope_size, pure, cell, cells, upvalues, global_slot",
         "If         : condition, then_branch, else_branch",
         "Print      : expression",
         "Return     : keyword, value",
-        "Var        : name, initializer",
+        "Var        : name, initializer | slot, cell, global_slot",
         "While      : condition, body"
     ])
 
@@ -45,8 +49,9 @@ def define_ast(output_dir,  base_name, types):
         define_visitor(file, base_name, types)
         for type in types:
             class_name = type.split(":")[0].strip()
-            fields = type.split(":")[1].strip()
-            define_type(file, base_name, class_name, fields)
+            fields, _, annotations = type.split(":")[1].partition("|")
+            define_type(file, base_name, class_name,
+                        fields.strip(), annotations.strip())
 
 
 def define_visitor(file, base_name, types):
@@ -59,7 +64,7 @@ def define_visitor(file, base_name, types):
         file.write("\n        pass")
 
 
-def define_type(file, base_name, class_name, fields):
+def define_type(file, base_name, class_name, fields, annotations=""):
     file.write("\nclass " + class_name + "(" + base_name + "):")
 
     # Define constructor
@@ -70,6 +75,9 @@ def define_type(file, base_name, class_name, fields):
     for field in fields_list:
         name = field.strip()
         file.write("\n        self." + name + " = " + name)
+    if annotations:
+        for annotation in annotations.split(", "):
+            file.write("\n        self." + annotation.strip() + " = None")
 
     # Implement accept method
     file.write("\n    def accept(self, visitor):")
@@ -14,6 +14,9 @@ class Visitor(ABC):
     def visit_expression_stmt(self, stmt):
         pass
     @abstractmethod
+    def visit_for_stmt(self, stmt):
+        pass
+    @abstractmethod
     def visit_function_stmt(self, stmt):
         pass
     @abstractmethod
@@ -34,6 +37,7 @@ class Visitor(ABC):
 class Block(Stmt):
     def __init__(self, statements):
         self.statements = statements
+        self.scope_size = None
     def accept(self, visitor):
         return visitor.visit_block_stmt(self)
 class Class(Stmt):
@@ -41,6 +45,9 @@ class Class(Stmt):
         self.name = name
         self.superclass = superclass
         self.methods = methods
+        self.slot = None
+        self.cell = None
+        self.global_slot = None
     def accept(self, visitor):
         return visitor.visit_class_stmt(self)
 class Expression(Stmt):
@@ -48,12 +55,28 @@ class Expression(Stmt):
         self.expression = expression
     def accept(self, visitor):
         return visitor.visit_expression_stmt(self)
+class For(Stmt):
+    def __init__(self, initializer, condition, increment, body):
+        self.initializer = initializer
+        self.condition = condition
+        self.increment = increment
+        self.body = body
+        self.scope_size = None
+    def accept(self, visitor):
+        return visitor.visit_for_stmt(self)
 class Function(Stmt):
     def __init__(self, name, params, body, kind):
         self.name = name
         self.params = params
         self.body = body
         self.kind = kind
+        self.slot = None
+        self.scope_size = None
+        self.pure = None
+        self.cell = None
+        self.cells = None
+        self.upvalues = None
+        self.global_slot = None
     def accept(self, visitor):
         return visitor.visit_function_stmt(self)
 class If(Stmt):
@@ -78,6 +101,9 @@ class Var(Stmt):
     def __init__(self, name, initializer):
         self.name = name
         self.initializer = initializer
+        self.slot = None
+        self.cell = None
+        self.global_slot = None
     def accept(self, visitor):
         return visitor.visit_var_stmt(self)
 class While(Stmt):
@@ -0,0 +1,63 @@
+import os
+import statistics
+import subprocess
+import sys
+import tempfile
+import time
+
+
+CHUNK = """class Shape{n} {{
+  init(w, h) {{ this.w = w; this.h = h; }}
+  area {{ return this.w * this.h + {n}; }}
+  scale(k) {{ return Shape{n}(this.w * k, this.h * k); }}
+}}
+fun describe{n}(shape) {{
+  if (shape.area > {n} and !(shape.w == nil)) {{
+    return "big" + " shape";
+  }} else {{
+    return "small" + " shape";
+  }}
+}}
+"""
+
+
+def run(script, cache_dir, extra=()):
+    env = dict(os.environ, LOX_CACHE_DIR=cache_dir)
+    start = time.perf_counter()
+    result = subprocess.run([sys.executable, "-m", "app.main", "run", script, *extra],
+                            capture_output=True, text=True, env=env)
+    elapsed = time.perf_counter() - start
+    if result.returncode != 0:
+        raise SystemExit(result.stderr)
+    return elapsed
+
+
+def main():
+    count = int(sys.argv[1]) if len(sys.argv) > 1 else 2000
+    repeat = int(sys.argv[2]) if len(sys.argv) > 2 else 5
+
+    with tempfile.TemporaryDirectory() as directory:
+        script = os.path.join(directory, "program.lox")
+        with open(script, "w") as f:
+            f.write("".join(CHUNK.format(n=n) for n in range(count)))
+            f.write('print describe0(Shape0(2, 3).scale(2));\n')
+        size = os.path.getsize(script)
+
+        uncached = [run(script, os.path.join(directory, "unused"), ["--no-cache"])
+                    for _ in range(repeat)]
+        cold = []
+        warm = []
+        for i in range(repeat):
+            cache_dir = os.path.join(directory, f"cache{i}")
+            cold.append(run(script, cache_dir))
+            warm.append(run(script, cache_dir))
+
+    print(f"script: {size / 1000:.0f} KB, median of {repeat} runs")
+    print(f"--no-cache  {statistics.median(uncached):8.3f}s")
+    print(f"cold cache  {statistics.median(cold):8.3f}s")
+    print(f"warm cache  {statistics.median(warm):8.3f}s")
+    print(f"warm speedup: {statistics.median(uncached) / statistics.median(warm):.2f}x")
+
+
+if __name__ == "__main__":
+    main()
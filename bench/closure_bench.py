@@ -0,0 +1,73 @@
+import contextlib
+import gc
+import io
+import sys
+import time
+import tracemalloc
+
+from app.main import ENGINES
+from bench.support import resolve_program
+
+
+# Closure factory: each call builds a few large locals in nested scopes and
+# returns a small callback that only reads `step`. The callbacks are kept
+# alive in a linked list and then all called.
+SOURCE = """
+class Node {
+  init(callback, next) {
+    this.callback = callback;
+    this.next = next;
+  }
+}
+fun makeAdder(step) {
+  var header = "header" + "-" + "line";
+  var footer = header + header + header + header;
+  {
+    var body = footer + footer + footer + footer;
+    var copy = body + body;
+    fun add(x) { return x + step; }
+    return add;
+  }
+}
+var list = nil;
+var i = 0;
+while (i < {count}) {
+  list = Node(makeAdder(i), list);
+  i = i + 1;
+}
+var total = 0;
+var node = list;
+while (node != nil) {
+  total = node.callback(total);
+  node = node.next;
+}
+print total;
+"""
+
+
+def main():
+    count = int(sys.argv[1]) if len(sys.argv) > 1 else 20000
+    source = SOURCE.replace("{count}", str(count))
+    statements = resolve_program(source)
+    expected = f"{count * (count - 1) // 2}\n"
+
+    print(f"{count:,} live closures")
+    for name, engine in ENGINES.items():
+        interpreter = engine()
+        gc.collect()
+        tracemalloc.start()
+        before = tracemalloc.get_traced_memory()[0]
+        with contextlib.redirect_stdout(io.StringIO()) as output:
+            start = time.perf_counter()
+            interpreter.interpret(statements, "run")
+            elapsed = time.perf_counter() - start
+        gc.collect()
+        retained = tracemalloc.get_traced_memory()[0] - before
+        tracemalloc.stop()
+        if output.getvalue() != expected:
+            raise SystemExit(f"{name}: unexpected output {output.getvalue()!r}")
+        print(f"{name:<8} {retained / count:7.1f} bytes/closure  {elapsed:7.3f}s (traced)")
+
+
+if __name__ == "__main__":
+    main()
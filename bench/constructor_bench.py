@@ -0,0 +1,51 @@
+import sys
+
+from app.main import ENGINES
+from bench.support import best_of
+
+
+# Allocation-heavy code: a linked list built one node at a time, then
+# binary trees built and dropped, so most of the time goes to constructor
+# calls.
+SOURCE = """
+class Node {
+  init(value, next) {
+    this.value = value;
+    this.next = next;
+  }
+}
+class Tree {
+  init(left, right) {
+    this.left = left;
+    this.right = right;
+  }
+}
+class Leaf {}
+fun build(depth) {
+  if (depth == 0) return Leaf();
+  return Tree(build(depth - 1), build(depth - 1));
+}
+var list = nil;
+for (var i = 0; i < {n}; i = i + 1) list = Node(i, list);
+for (var j = 0; j < 4; j = j + 1) build({depth});
+print list.value;
+"""
+
+
+def main():
+    n = int(sys.argv[1]) if len(sys.argv) > 1 else 20000
+    depth = int(sys.argv[2]) if len(sys.argv) > 2 else 12
+    repeat = int(sys.argv[3]) if len(sys.argv) > 3 else 3
+    source = SOURCE.replace("{n}", str(n)).replace("{depth}", str(depth))
+    instances = n + 4 * (2 ** (depth + 1) - 1)
+
+    print(f"{instances:,} instances, best of {repeat}")
+    for name, engine in ENGINES.items():
+        best, output = best_of(engine, source, repeat)
+        if output != f"{n - 1}\n":
+            raise SystemExit(f"{name}: unexpected output {output!r}")
+        print(f"{name:<8} {best:7.3f}s  {best / instances * 1e9:6.0f} ns/instance")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,65 @@
+import sys
+
+from app.main import ENGINES
+from bench.support import best_of
+
+
+PROGRAMS = {
+    "fib": """
+fun fib(n) {
+  if (n < 2) return n;
+  return fib(n - 2) + fib(n - 1);
+}
+print fib({n});
+""",
+    "loop": """
+var sum = 0;
+for (var i = 0; i < {n} * 2000; i = i + 1) {
+  if (i / 2 > 10 and !(i == 7)) sum = sum + i; else sum = sum - 1;
+}
+print sum;
+""",
+    "methods": """
+class Counter {
+  init() { this.count = 0; }
+  add(n) { this.count = this.count + n; return this; }
+  total { return this.count; }
+}
+var counter = Counter();
+var i = 0;
+while (i < {n} * 500) {
+  counter.add(i).add(1);
+  i = i + 1;
+}
+print counter.total;
+""",
+}
+
+
+def main():
+    n = int(sys.argv[1]) if len(sys.argv) > 1 else 20
+    repeat = int(sys.argv[2]) if len(sys.argv) > 2 else 3
+
+    print(f"n = {n}, best of {repeat}")
+    for name, template in PROGRAMS.items():
+        source = template.replace("{n}", str(n))
+
+        results = {}
+        outputs = set()
+        for engine_name, engine in ENGINES.items():
+            elapsed, output = best_of(engine, source, repeat)
+            results[engine_name] = elapsed
+            outputs.add(output)
+        if len(outputs) != 1:
+            raise SystemExit(f"{name}: engines disagree: {outputs}")
+
+        timings = "  ".join(f"{engine_name} {elapsed:7.3f}s"
+                            for engine_name, elapsed in results.items())
+        speedups = "  ".join(f"{engine_name} {results['tree'] / elapsed:5.2f}x"
+                             for engine_name, elapsed in results.items()
+                             if engine_name != "tree")
+        print(f"{name:<8} {timings}   speedup: {speedups}")
+
+
+if __name__ == "__main__":
+    main()
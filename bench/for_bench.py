@@ -0,0 +1,41 @@
+import sys
+
+from app.main import ENGINES
+from bench.support import best_of
+
+
+# Counted loops: a nested pair inside a function and a single loop at the
+# top level, whose loop variable lives in a block environment.
+SOURCE = """
+fun grid(n) {
+  var total = 0;
+  for (var i = 0; i < n; i = i + 1) {
+    for (var j = 0; j < 100; j = j + 1) total = total + j;
+  }
+  return total;
+}
+print grid({n});
+var sum = 0;
+for (var k = 0; k < {n} * 100; k = k + 1) sum = sum + k;
+print sum;
+"""
+
+
+def main():
+    n = int(sys.argv[1]) if len(sys.argv) > 1 else 300
+    repeat = int(sys.argv[2]) if len(sys.argv) > 2 else 3
+    source = SOURCE.replace("{n}", str(n))
+
+    print(f"{2 * n * 100:,} loop iterations, best of {repeat}")
+    expected = None
+    for name, engine in ENGINES.items():
+        best, output = best_of(engine, source, repeat)
+        if expected is None:
+            expected = output
+        elif output != expected:
+            raise SystemExit(f"{name}: unexpected output {output!r}")
+        print(f"{name:<8} {best:7.3f}s")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,38 @@
+import sys
+
+from app.main import ENGINES
+from bench.support import best_of
+
+
+# Global-heavy script: a top-level loop that reads and writes only globals,
+# and calls a global function that does the same.
+SOURCE = """
+var count = 0;
+var total = 0;
+var step = 3;
+fun bump() { total = total + step; count = count + 1; }
+var i = 0;
+while (i < {n}) {
+  bump();
+  total = total - count + count;
+  i = i + 1;
+}
+print total;
+"""
+
+
+def main():
+    n = int(sys.argv[1]) if len(sys.argv) > 1 else 30000
+    repeat = int(sys.argv[2]) if len(sys.argv) > 2 else 3
+    source = SOURCE.replace("{n}", str(n))
+
+    print(f"{n:,} loop iterations, best of {repeat}")
+    for name, engine in ENGINES.items():
+        best, output = best_of(engine, source, repeat)
+        if output != f"{3 * n}\n":
+            raise SystemExit(f"{name}: unexpected output {output!r}")
+        print(f"{name:<8} {best:7.3f}s")
+
+
+if __name__ == "__main__":
+    main()
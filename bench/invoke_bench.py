@@ -0,0 +1,76 @@
+import contextlib
+import io
+import sys
+import time
+from collections import Counter
+
+from app.Interpreter import Interpreter
+from app.ClosureInterpreter import ClosureInterpreter
+from app.test.support import counting
+from bench.support import resolve_program
+
+
+SETUP = """
+class Point {
+  init(x) { this.x = x; }
+  add(k) { return this.x + k; }
+}
+var p = Point(1);
+var i = 0;
+var total = 0;
+"""
+
+# Each body runs {n} times; "loop" is the baseline the others are measured
+# against, so only allocations made by the call itself are counted.
+BODIES = {
+    "loop": "total = total + i;",
+    "p.add(i)": "total = total + p.add(i);",
+    "bound = p.add; bound(i)": "var bound = p.add; total = total + bound(i);",
+}
+
+ENGINES = {
+    "tree": Interpreter,
+    "closure": ClosureInterpreter,
+}
+
+
+def program(body, n):
+    return SETUP + f"while (i < {n}) {{ {body} i = i + 1; }}\nprint total;\n"
+
+
+def run(engine, statements, count_allocations=False):
+    interpreter = engine()
+    counts = Counter()
+    with contextlib.redirect_stdout(io.StringIO()):
+        if count_allocations:
+            with counting(counts):
+                interpreter.interpret(statements, "run")
+            return counts
+        start = time.perf_counter()
+        interpreter.interpret(statements, "run")
+        return time.perf_counter() - start
+
+
+def main():
+    n = int(sys.argv[1]) if len(sys.argv) > 1 else 50000
+    repeat = int(sys.argv[2]) if len(sys.argv) > 2 else 3
+
+    print(f"{n:,} calls, best of {repeat}; allocations are per call")
+    for engine_name, engine in ENGINES.items():
+        baseline = None
+        for label, body in BODIES.items():
+            statements = resolve_program(program(body, n))
+            counts = run(engine, statements, count_allocations=True)
+            elapsed = min(run(engine, statements) for _ in range(repeat))
+            if baseline is None:
+                baseline = counts, elapsed
+                continue
+            environments = (counts["Environment"] - baseline[0]["Environment"]) / n
+            functions = (counts["Function"] - baseline[0]["Function"]) / n
+            per_call = (elapsed - baseline[1]) / n * 1e9
+            print(f"{engine_name:<8} {label:<24} {environments:4.1f} Environment "
+                  f"{functions:4.1f} Function  {per_call:6.0f} ns/call")
+
+
+if __name__ == "__main__":
+    main()
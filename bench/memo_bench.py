@@ -0,0 +1,48 @@
+import contextlib
+import io
+import sys
+import time
+
+from app.main import ENGINES
+from bench.support import resolve_program
+
+
+# The naive fib from test.lox: exponentially many calls, but only n + 1
+# distinct ones, so a memoized run is linear.
+SOURCE = """
+fun fib(n) {
+  if (n < 2) return n;
+  return fib(n - 1) + fib(n - 2);
+}
+print fib({n});
+"""
+
+
+def measure(engine, statements, memo_size):
+    interpreter = engine(memo_size=memo_size)
+    with contextlib.redirect_stdout(io.StringIO()) as output:
+        start = time.perf_counter()
+        interpreter.interpret(statements, "run")
+        elapsed = time.perf_counter() - start
+    return elapsed, output.getvalue(), interpreter.memos
+
+
+def main():
+    n = int(sys.argv[1]) if len(sys.argv) > 1 else 22
+    memo_size = int(sys.argv[2]) if len(sys.argv) > 2 else 1024
+
+    source = SOURCE.replace("{n}", str(n))
+    statements = resolve_program(source)
+
+    print(f"fib({n}), memo size {memo_size}")
+    for name, engine in ENGINES.items():
+        plain, expected, _ = measure(engine, statements, None)
+        memoized, output, memos = measure(engine, statements, memo_size)
+        if output != expected:
+            raise SystemExit(f"{name}: memoized output {output!r} != {expected!r}")
+        stats = "; ".join(str(memo) for memo in memos.values())
+        print(f"{name:<8} plain {plain:7.3f}s  memoized {memoized:7.4f}s  ({stats})")
+
+
+if __name__ == "__main__":
+    main()
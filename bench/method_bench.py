@@ -0,0 +1,41 @@
+import sys
+
+from app.main import ENGINES
+from bench.support import best_of
+
+
+# A base-class method and getter called through a subclass `depth` levels
+# down. With flattened method tables the cost should not grow with depth.
+def program(depth, calls):
+    classes = ["class Level0 {\n  init() { this.n = 0; }\n"
+               "  bump(k) { this.n = this.n + k; return this; }\n"
+               "  total { return this.n; }\n}\n"]
+    for level in range(1, depth + 1):
+        classes.append(f"class Level{level} < Level{level - 1} {{\n"
+                       f"  extra{level}() {{ return {level}; }}\n}}\n")
+    return "".join(classes) + f"""
+var obj = Level{depth}();
+var i = 0;
+while (i < {calls}) {{
+  obj.bump(1).bump(2);
+  i = i + obj.total - obj.total + 1;
+}}
+print obj.total;
+"""
+
+
+def main():
+    calls = int(sys.argv[1]) if len(sys.argv) > 1 else 5000
+    repeat = int(sys.argv[2]) if len(sys.argv) > 2 else 3
+
+    print(f"{calls:,} iterations (4 method/getter lookups each), best of {repeat}")
+    print("depth  " + "  ".join(f"{name:>8}" for name in ENGINES))
+    for depth in (0, 4, 16, 64):
+        source = program(depth, calls)
+        timings = [best_of(engine, source, repeat)[0]
+                   for engine in ENGINES.values()]
+        print(f"{depth:5}  " + "  ".join(f"{elapsed:7.3f}s" for elapsed in timings))
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,38 @@
+import sys
+
+from app.main import ENGINES
+from bench.support import best_of
+
+
+# A loop whose body is mostly constant subexpressions, grouped the way
+# hand-written formulas are, plus a debug branch that is switched off.
+SOURCE = """
+var sum = 0;
+var i = 0;
+while (i < {iterations}) {
+  var scaled = i * (60 * 60 * 24) / (1000 * 1000);
+  if (false or nil) print "debug " + "trace";
+  sum = sum + scaled * (2 * 3.5 - 1) + (-(1 + 1));
+  i = i + (((1)));
+}
+print sum;
+"""
+
+
+def main():
+    iterations = int(sys.argv[1]) if len(sys.argv) > 1 else 30000
+    repeat = int(sys.argv[2]) if len(sys.argv) > 2 else 3
+    source = SOURCE.replace("{iterations}", str(iterations))
+
+    print(f"{iterations:,} loop iterations, best of {repeat}")
+    print(f"{'engine':<8} {'--no-opt':>9} {'optimized':>10}  speedup")
+    for engine, interpreter in ENGINES.items():
+        plain, plain_output = best_of(interpreter, source, repeat)
+        folded, folded_output = best_of(interpreter, source, repeat, optimize=True)
+        if plain_output != folded_output:
+            raise SystemExit(f"{engine}: optimized output differs")
+        print(f"{engine:<8} {plain:8.3f}s {folded:9.3f}s  {plain / folded:6.2f}x")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,54 @@
+import os
+import subprocess
+import sys
+import tempfile
+import time
+
+
+# Print-heavy script: one short line per loop iteration, a mix of numbers
+# and strings, written to /dev/null so only the cost of producing the output
+# is measured.
+SOURCE = """
+for (var i = 0; i < {n}; i = i + 1) {
+  print i;
+  print "line";
+}
+"""
+
+MODES = {
+    "unbuffered": ["--unbuffered"],
+    "buffered": [],
+}
+
+
+def run(script, options):
+    start = time.perf_counter()
+    result = subprocess.run([sys.executable, "-m", "app.main", "run", script,
+                             "--no-cache", *options],
+                            stdout=subprocess.DEVNULL, stderr=subprocess.PIPE,
+                            text=True)
+    elapsed = time.perf_counter() - start
+    if result.returncode != 0:
+        raise SystemExit(result.stderr)
+    return elapsed
+
+
+def main():
+    n = int(sys.argv[1]) if len(sys.argv) > 1 else 500000
+    repeat = int(sys.argv[2]) if len(sys.argv) > 2 else 3
+
+    with tempfile.TemporaryDirectory() as directory:
+        script = os.path.join(directory, "print.lox")
+        with open(script, "w") as f:
+            f.write(SOURCE.replace("{n}", str(n)))
+
+        print(f"{2 * n:,} lines to /dev/null, best of {repeat}")
+        for engine in ("tree", "closure", "vm"):
+            for mode, options in MODES.items():
+                best = min(run(script, [f"--engine={engine}", *options])
+                           for _ in range(repeat))
+                print(f"{engine:<8} {mode:<11} {best:7.3f}s")
+
+
+if __name__ == "__main__":
+    main()
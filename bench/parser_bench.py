@@ -0,0 +1,41 @@
+import sys
+import time
+
+from app.Parser import Parser
+from app.PrattParser import PrattParser
+from app.Scanner import Scanner
+
+
+CHUNK = """var x{n} = (a + b * {n} - c / 2) >= -d and !(e == f) or g(h, i.j, k * (l + m)) <= n;
+x{n} = obj.field.method(x{n} + 1, "label" + "{n}") * (1 + 2 * (3 - 4 / (5 + 6)));
+print x{n} == nil or x{n} != true and -x{n} < {n};
+"""
+
+
+def measure(parser_class, tokens, repeat):
+    best = None
+    for _ in range(repeat):
+        start = time.perf_counter()
+        parser_class(tokens).parse("run")
+        elapsed = time.perf_counter() - start
+        best = elapsed if best is None else min(best, elapsed)
+    return best
+
+
+def main():
+    count = int(sys.argv[1]) if len(sys.argv) > 1 else 5000
+    repeat = int(sys.argv[2]) if len(sys.argv) > 2 else 3
+    source = "".join(CHUNK.format(n=n) for n in range(count))
+    tokens = Scanner(source).scan_tokens()
+
+    print(f"{len(tokens):,} tokens, best of {repeat}")
+    results = {}
+    for parser_class in (Parser, PrattParser):
+        elapsed = measure(parser_class, tokens, repeat)
+        results[parser_class.__name__] = elapsed
+        print(f"{parser_class.__name__:<12} {elapsed:8.3f}s {len(tokens) / elapsed:12,.0f} tokens/s")
+    print(f"speedup: {results['Parser'] / results['PrattParser']:.2f}x")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,46 @@
+import sys
+
+from app import quickening
+from app.Interpreter import Interpreter
+from bench.support import best_of
+
+
+# Arithmetic-heavy loop: numeric binary ops, comparisons, negation, `!`,
+# `and`/`or`, and string concatenation on every iteration.
+SOURCE = """
+var sum = 0;
+var text = "";
+var i = 0;
+while (i < {iterations}) {
+  var x = i * 2.5 - i / 4 + 1;
+  if (x > 10 and !(x >= 1000000) or x <= -1) sum = sum + -x;
+  if (i - (i / 100) * 100 == 0) text = "" + "ab";
+  i = i + 1;
+}
+print sum;
+print text;
+"""
+
+
+def main():
+    iterations = int(sys.argv[1]) if len(sys.argv) > 1 else 30000
+    repeat = int(sys.argv[2]) if len(sys.argv) > 2 else 3
+
+    print(f"{iterations:,} loop iterations on the tree engine, best of {repeat}")
+    source = SOURCE.replace("{iterations}", str(iterations))
+    results = {}
+    threshold = quickening.THRESHOLD
+    for name, limit in (("generic", float("inf")), ("quickened", threshold)):
+        quickening.THRESHOLD = limit
+        try:
+            results[name] = best_of(Interpreter, source, repeat)
+        finally:
+            quickening.THRESHOLD = threshold
+        print(f"{name:<10} {results[name][0]:7.3f}s")
+    if results["generic"][1] != results["quickened"][1]:
+        raise SystemExit("quickened output differs from the generic path")
+    print(f"speedup    {results['generic'][0] / results['quickened'][0]:6.2f}x")
+
+
+if __name__ == "__main__":
+    main()
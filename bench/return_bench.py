@@ -0,0 +1,45 @@
+import sys
+
+from app.Interpreter import Interpreter
+from bench.support import best_of
+
+
+# Call-heavy programs on the tree engine. Every call ends in a `return`,
+# most of them from inside a nested block or a loop.
+PROGRAMS = {
+    "fib": """
+fun fib(n) {
+  if (n < 2) return n;
+  return fib(n - 1) + fib(n - 2);
+}
+print fib({n});
+""",
+    "nested": """
+fun pick(n) {
+  {
+    var i = 0;
+    while (true) {
+      if (i == 2) { return n + i; }
+      i = i + 1;
+    }
+  }
+}
+var total = 0;
+for (var k = 0; k < {n} * 1000; k = k + 1) total = total + pick(k);
+print total;
+""",
+}
+
+
+def main():
+    n = int(sys.argv[1]) if len(sys.argv) > 1 else 20
+    repeat = int(sys.argv[2]) if len(sys.argv) > 2 else 3
+
+    print(f"tree engine, n={n}, best of {repeat}")
+    for name, source in PROGRAMS.items():
+        source = source.replace("{n}", str(n))
+        print(f"{name:<8} {best_of(Interpreter, source, repeat)[0]:7.3f}s")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,37 @@
+import sys
+
+from app.main import ENGINES
+from bench.support import best_of
+
+
+# String building: appends a 100-character piece in a loop, then prints the
+# result once. With plain str concatenation every append copies the whole
+# string built so far; with ropes the time per piece stays flat as the
+# string grows.
+PIECE = "0123456789" * 10
+
+SOURCE = """
+var s = "";
+for (var i = 0; i < {n}; i = i + 1) s = s + "{piece}";
+print s;
+"""
+
+
+def main():
+    megabytes = int(sys.argv[1]) if len(sys.argv) > 1 else 10
+    repeat = int(sys.argv[2]) if len(sys.argv) > 2 else 1
+
+    print(f"{len(PIECE)}-character pieces, best of {repeat}")
+    for size in (megabytes / 8, megabytes / 4, megabytes / 2, megabytes):
+        n = int(size * 1_000_000) // len(PIECE)
+        source = SOURCE.replace("{n}", str(n)).replace("{piece}", PIECE)
+        for name, engine in ENGINES.items():
+            best, output = best_of(engine, source, repeat)
+            if len(output) != n * len(PIECE) + 1:
+                raise SystemExit(f"{name}: unexpected output length")
+            print(f"{size:5.2f} MB  {name:<8} {best:7.3f}s  "
+                  f"{best / n * 1e6:6.2f} us/piece")
+
+
+if __name__ == "__main__":
+    main()
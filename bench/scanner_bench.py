@@ -0,0 +1,64 @@
+import sys
+import time
+
+from app.CharScanner import CharScanner
+from app.Scanner import Scanner
+
+
+CHUNK = """// generated chunk {n}
+class Node{n} < Base {{
+  init(value) {{
+    this.value = value * 2.5 + {n};
+    this.label = "node number {n}";
+  }}
+  total {{ return this.value >= 10 and this.value != 0 or !false; }}
+}}
+fun work{n}(a, b) {{
+  var i = 0;
+  while (i <= {n}) {{ i = i + 1; a = a - b / 3; }}
+  return a;
+}}
+print work{n}(100, 7) == nil;
+"""
+
+
+def generate(size):
+    parts = []
+    total = 0
+    n = 0
+    while total < size:
+        chunk = CHUNK.format(n=n)
+        parts.append(chunk)
+        total += len(chunk)
+        n += 1
+    return "".join(parts)
+
+
+def measure(scanner_class, source, repeat):
+    best = None
+    for _ in range(repeat):
+        start = time.perf_counter()
+        tokens = scanner_class(source).scan_tokens()
+        elapsed = time.perf_counter() - start
+        best = elapsed if best is None else min(best, elapsed)
+    return best, len(tokens)
+
+
+def main():
+    size = int(sys.argv[1]) if len(sys.argv) > 1 else 4_000_000
+    repeat = int(sys.argv[2]) if len(sys.argv) > 2 else 3
+    source = generate(size)
+    megabytes = len(source) / 1_000_000
+
+    print(f"source: {megabytes:.1f} MB, best of {repeat}")
+    results = {}
+    for scanner_class in (CharScanner, Scanner):
+        elapsed, count = measure(scanner_class, source, repeat)
+        results[scanner_class.__name__] = elapsed
+        print(f"{scanner_class.__name__:<12} {elapsed:8.3f}s "
+              f"{megabytes / elapsed:8.2f} MB/s {count / elapsed:12,.0f} tokens/s")
+    print(f"speedup: {results['CharScanner'] / results['Scanner']:.2f}x")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,47 @@
+import sys
+
+from bench.invoke_bench import ENGINES, run
+from bench.support import resolve_program
+
+
+# Loop-heavy code: nested `for` loops whose bodies are blocks, an `if` with
+# block branches and a block-local temporary, all inside a function and
+# again at the top level.
+SOURCE = """
+fun work(n) {
+  var total = 0;
+  for (var i = 0; i < n; i = i + 1) {
+    for (var j = 0; j < 10; j = j + 1) {
+      var product = i * j;
+      if (product > 50) { total = total + 1; } else { total = total - 1; }
+    }
+  }
+  return total;
+}
+print work({n});
+{
+  var count = 0;
+  for (var i = 0; i < {n}; i = i + 1) {
+    while (count < i) { count = count + 1; }
+  }
+  print count;
+}
+"""
+
+
+def main():
+    n = int(sys.argv[1]) if len(sys.argv) > 1 else 5000
+    repeat = int(sys.argv[2]) if len(sys.argv) > 2 else 3
+    statements = resolve_program(SOURCE.replace("{n}", str(n)))
+    iterations = n * 11 + n
+
+    print(f"{iterations:,} loop iterations, best of {repeat}")
+    for name, engine in ENGINES.items():
+        counts = run(engine, statements, count_allocations=True)
+        elapsed = min(run(engine, statements) for _ in range(repeat))
+        print(f"{name:<8} {counts['Environment']:>9,} Environments "
+              f"({counts['Environment'] / iterations:4.2f}/iteration)  {elapsed:7.3f}s")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,69 @@
+import os
+import statistics
+import subprocess
+import sys
+import tempfile
+import time
+
+from app import client
+
+
+# Latency of one short script: a cold `app.main run` process against the
+# same command line sent to a `serve` process, both through the thin client
+# process and as a bare socket request.
+SOURCE = """
+class Point {
+  init(x, y) { this.x = x; this.y = y; }
+  sum() { return this.x + this.y; }
+}
+var total = 0;
+for (var i = 0; i < 100; i = i + 1) total = total + Point(i, 1).sum();
+print total;
+"""
+
+
+def timed(function):
+    start = time.perf_counter()
+    function()
+    return time.perf_counter() - start
+
+
+def main():
+    count = int(sys.argv[1]) if len(sys.argv) > 1 else 50
+
+    with tempfile.TemporaryDirectory() as directory:
+        script = os.path.join(directory, "point.lox")
+        with open(script, "w") as f:
+            f.write(SOURCE)
+        socket = os.path.join(directory, "lox.sock")
+        env = dict(os.environ, LOX_CACHE_DIR=os.path.join(directory, "cache"),
+                   LOX_SOCKET=socket)
+        server = subprocess.Popen([sys.executable, "-m", "app.main", "serve", socket],
+                                  env=env, stderr=subprocess.DEVNULL)
+        try:
+            while not os.path.exists(socket):
+                time.sleep(0.01)
+
+            def process(module):
+                result = subprocess.run([sys.executable, "-m", module, "run", script],
+                                        capture_output=True, text=True, env=env)
+                if result.stdout != "5050\n":
+                    raise SystemExit(f"{module}: unexpected output {result.stdout!r}")
+
+            runs = {
+                "cold start": lambda: process("app.main"),
+                "client": lambda: process("app.client"),
+                "socket": lambda: client.request(["run", script], socket),
+            }
+            print(f"{count} runs each, median and mean latency per script")
+            for name, run in runs.items():
+                times = [timed(run) for _ in range(count)]
+                print(f"{name:<11} {statistics.median(times) * 1000:7.1f}ms "
+                      f"{statistics.mean(times) * 1000:7.1f}ms")
+        finally:
+            server.terminate()
+            server.wait()
+
+
+if __name__ == "__main__":
+    main()
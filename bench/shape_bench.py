@@ -0,0 +1,59 @@
+import contextlib
+import gc
+import io
+import sys
+import time
+import tracemalloc
+
+from app.main import ENGINES
+from bench.support import resolve_program
+
+
+# Binary-trees: build one complete tree and keep it alive in a global, then
+# walk it. Every node is an instance with the same two fields.
+SOURCE = """
+class Tree {
+  init(left, right) {
+    this.left = left;
+    this.right = right;
+  }
+  check() {
+    if (this.left == nil) return 1;
+    return 1 + this.left.check() + this.right.check();
+  }
+}
+fun bottomUp(depth) {
+  if (depth > 0) return Tree(bottomUp(depth - 1), bottomUp(depth - 1));
+  return Tree(nil, nil);
+}
+var tree = bottomUp({depth});
+print tree.check();
+"""
+
+
+def main():
+    depth = int(sys.argv[1]) if len(sys.argv) > 1 else 14
+    nodes = 2 ** (depth + 1) - 1
+    source = SOURCE.replace("{depth}", str(depth))
+    statements = resolve_program(source)
+
+    print(f"binary tree of depth {depth}: {nodes:,} instances")
+    for name, engine in ENGINES.items():
+        interpreter = engine()
+        gc.collect()
+        tracemalloc.start()
+        before = tracemalloc.get_traced_memory()[0]
+        with contextlib.redirect_stdout(io.StringIO()) as output:
+            start = time.perf_counter()
+            interpreter.interpret(statements, "run")
+            elapsed = time.perf_counter() - start
+        gc.collect()
+        retained = tracemalloc.get_traced_memory()[0] - before
+        tracemalloc.stop()
+        if output.getvalue() != f"{nodes}\n":
+            raise SystemExit(f"{name}: unexpected output {output.getvalue()!r}")
+        print(f"{name:<8} {retained / nodes:6.1f} bytes/instance  {elapsed:7.3f}s (traced)")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,25 @@
+import contextlib
+import io
+import time
+
+from app.Optimizer import Optimizer
+from app.test.support import resolve_program
+
+
+def best_of(engine, source, repeat, optimize=False):
+    # Best time of `repeat` runs of `source` on fresh `engine()` instances,
+    # and the output of the last run. Each run gets a freshly parsed and
+    # resolved tree, outside the timed part: the tree engine quickens nodes
+    # in place, so a reused tree would carry that over from earlier runs.
+    best = None
+    for _ in range(repeat):
+        statements = resolve_program(source)
+        if optimize:
+            statements = Optimizer().optimize(statements)
+        interpreter = engine()
+        with contextlib.redirect_stdout(io.StringIO()) as output:
+            start = time.perf_counter()
+            interpreter.interpret(statements, "run")
+            elapsed = time.perf_counter() - start
+        best = elapsed if best is None else min(best, elapsed)
+    return best, output.getvalue()
@@ -0,0 +1,41 @@
+import contextlib
+import io
+import sys
+import time
+
+from app.Interpreter import Interpreter
+from app.main import ENGINES
+from bench.support import resolve_program
+
+
+# A recursive loop far deeper than the call depth limit: every call is in
+# tail position, so each engine runs it in a single frame.
+SOURCE = """
+fun loop(n, acc) {
+  if (n == 0) return acc;
+  return loop(n - 1, acc + 1);
+}
+print loop({n}, 0);
+"""
+
+
+def main():
+    n = int(sys.argv[1]) if len(sys.argv) > 1 else 1000000
+
+    source = SOURCE.replace("{n}", str(n))
+    statements = resolve_program(source)
+
+    print(f"{n:,} tail calls, max depth {Interpreter.MAX_DEPTH:,}")
+    for name, engine in ENGINES.items():
+        with contextlib.redirect_stdout(io.StringIO()) as output, \
+                contextlib.redirect_stderr(io.StringIO()) as errors:
+            start = time.perf_counter()
+            engine().interpret(statements, "run")
+            elapsed = time.perf_counter() - start
+        if output.getvalue() != f"{n}\n":
+            raise SystemExit(f"{name}: {(output.getvalue() + errors.getvalue())!r}")
+        print(f"{name:<8} {elapsed:7.3f}s  {elapsed / n * 1e6:5.2f} µs/call")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,64 @@
+import gc
+import sys
+import tracemalloc
+
+from app.Parser import Parser
+from app.Scanner import Scanner
+from bench.scanner_bench import generate
+
+
+class LegacyToken:
+    # The Token layout before TokenBuffer: a plain object with a __dict__
+    # and a copied lexeme for every token.
+    def __init__(self, tokenType, lexeme, literal, line):
+        self.tokenType = tokenType
+        self.lexeme = lexeme
+        self.literal = literal
+        self.line = line
+
+
+def legacy_tokens(source):
+    return [LegacyToken(t.tokenType, t.lexeme, t.literal, t.line)
+            for t in Scanner(source).stream_tokens()]
+
+
+def token_list(source):
+    return list(Scanner(source).stream_tokens())
+
+
+def token_buffer(source):
+    return Scanner(source).scan_tokens()
+
+
+def measure(build, source, parse):
+    gc.collect()
+    tracemalloc.start()
+    tokens = build(source)
+    retained, _ = tracemalloc.get_traced_memory()
+    if parse:
+        Parser(tokens).parse("run")
+    _, peak = tracemalloc.get_traced_memory()
+    tracemalloc.stop()
+    return len(tokens), retained, peak
+
+
+def main():
+    target = int(sys.argv[1]) if len(sys.argv) > 1 else 100_000
+    size = 1000
+    source = generate(size)
+    while len(Scanner(source).scan_tokens()) < target:
+        size = int(size * 1.1)
+        source = generate(size)
+
+    print(f"{'representation':<16}{'tokens':>9}{'retained':>12}{'bytes/token':>13}{'parse peak':>13}")
+    for name, build in (("legacy Token", legacy_tokens),
+                        ("slotted Token", token_list),
+                        ("TokenBuffer", token_buffer)):
+        count, retained, _ = measure(build, source, parse=False)
+        _, _, peak = measure(build, source, parse=True)
+        print(f"{name:<16}{count:>9,}{retained / 1e6:>10.2f}MB"
+              f"{retained / count:>13.1f}{peak / 1e6:>11.2f}MB")
+
+
+if __name__ == "__main__":
+    main()